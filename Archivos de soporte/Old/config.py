@@ -1,4 +1,6 @@
 # backend/config.py
+import os
+import sys
 
 # URL for downloading Melate Retro historical data
 MELATE_RETRO_URL = "https://www.loterianacional.gob.mx/Home/Historicos?ARHP=TQBlAGwAYQB0AGUALQBSAGUAdAByAG8A"
@@ -8,3 +10,20 @@ DATABASE_NAME = "lottodata.db"
 
 # CSV file path for testing
 TEST_CSV_PATH = "melate_retro.csv"
+
+# The shared scoring modules (combinatoria, tablas_frecuencia, ...) live in the parent directory
+SUPPORT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SUPPORT_DIR not in sys.path:
+    sys.path.append(SUPPORT_DIR)
+
+# Canonical frequency tables (rank-indexed .npy, see tablas_frecuencia.py)
+FREQUENCY_TABLE_PATH = os.path.join(SUPPORT_DIR, "frecuencias_omega.npy")
+
+# Precomputed universe score table (see tabla_universo.py); the same file generador_omega_paralelo writes
+UNIVERSE_TABLE_PATH = os.path.join(SUPPORT_DIR, "universo_omega.bin")
+
+# Omega membership bitmap over universe ranks (see bitmap_omega.py); also written by generador_omega_paralelo
+OMEGA_BITMAP_PATH = os.path.join(SUPPORT_DIR, "omega_bitmap.bin")
+
+# Frequency tables with the draws imported after the canonical file (never the tracked artifact)
+UPDATED_FREQUENCY_TABLE_PATH = "frecuencias_omega_actualizadas.npy"
@@ -0,0 +1,110 @@
+# backend/connection.py
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .config import DATABASE_NAME
+
+# Pragmas applied to every connection. WAL lets readers run while a writer commits;
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -65536",       # 64 MB page cache (negative = KiB)
+    "PRAGMA mmap_size = 268435456",     # 256 MB memory-mapped I/O
+    "PRAGMA temp_store = MEMORY",
+)
+BUSY_TIMEOUT_SECONDS = 30
+CACHED_STATEMENTS = 256   # Prepared statements kept per connection
+READ_POOL_SIZE = 4
+
+_local = threading.local()
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _configure(conn):
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_connection(path=None):
+    """
+    Returns this thread's read-write connection to the database, opening it
+    (in WAL mode) on first use. The connection is reused across calls so its
+    prepared statements stay cached; do not close it, use close_connections().
+    """
+    path = os.path.abspath(path or DATABASE_NAME)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS, cached_statements=CACHED_STATEMENTS)
+        conn.execute("PRAGMA journal_mode = WAL")
+        connections[path] = _configure(conn)
+    return conn
+
+class ReadOnlyPool:
+    """Fixed-size pool of read-only connections (file:...?mode=ro) shared by threads."""
+
+    def __init__(self, path, size=READ_POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_SECONDS,
+                               cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+        _configure(conn)
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._open()
+        return self._idle.get()
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+@contextmanager
+def read_connection(path=None):
+    """Borrows a read-only connection from the pool for the duration of the block."""
+    path = os.path.abspath(path or DATABASE_NAME)
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            # Make sure the database exists and is in WAL mode before read-only opens
+            get_connection(path)
+            pool = _pools[path] = ReadOnlyPool(path)
+    conn = pool.acquire()
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+def close_connections():
+    """Closes this thread's read-write connections and all idle pooled readers."""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
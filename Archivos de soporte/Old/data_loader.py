@@ -1,8 +1,9 @@
 # backend/data_loader.py
 import csv
-import sqlite3
 import requests
-from .config import DATABASE_NAME, MELATE_RETRO_URL, TEST_CSV_PATH
+from .config import MELATE_RETRO_URL, TEST_CSV_PATH
+from .connection import get_connection
+from .omega_analyzer import aplicar_sorteos_nuevos, marcar_base_frecuencias
 
 def download_csv(url: str, output_path: str):
     """Downloads a CSV file from a given URL."""
@@ -16,50 +17,101 @@ def download_csv(url: str, output_path: str):
         print(f"[ERROR] Could not download file from {url}: {e}")
         raise
 
-def load_data_from_csv(csv_path: str):
-    """Loads data from a CSV file into the database."""
-    conn = sqlite3.connect(DATABASE_NAME)
-    c = conn.cursor()
+# Real download format: NPRODUCTO,CONCURSO,F1..F7,BOLSA,FECHA (newest draw first).
+# F7 is the additional number and has no column in melate_retro.
+DOWNLOAD_COLUMNS = {"CONCURSO": "concurso", "FECHA": "fecha", "BOLSA": "bolsa_acumulada",
+                    **{f"F{i}": f"r{i}" for i in range(1, 7)}}
 
-    with open(csv_path, 'r', encoding='utf-8') as f:
+def _iso_date(fecha: str) -> str:
+    """Converts dd/mm/yyyy to yyyy-mm-dd; other formats are kept as they are."""
+    partes = fecha.strip().split("/")
+    if len(partes) == 3 and len(partes[2]) == 4:
+        return f"{partes[2]}-{int(partes[1]):02d}-{int(partes[0]):02d}"
+    return fecha.strip()
+
+def _parse_row(row: dict, download_format: bool) -> dict:
+    """Maps a CSV row to melate_retro columns; raises ValueError/KeyError on bad data."""
+    if download_format:
+        record = {column: row[header].strip() for header, column in DOWNLOAD_COLUMNS.items()}
+    else:
+        record = {header: value.strip() for header, value in row.items() if header}
+
+    record["concurso"] = int(record["concurso"])
+    record["fecha"] = _iso_date(record["fecha"])
+    numbers = [int(record[f"r{i}"]) for i in range(1, 7)]
+    if len(set(numbers)) != 6 or not all(1 <= n <= 39 for n in numbers):
+        raise ValueError(f"invalid numbers {numbers}")
+    for i, n in enumerate(numbers, 1):
+        record[f"r{i}"] = n
+    return record
+
+def load_data_from_csv(csv_path: str, update_scores: bool = True):
+    """
+    Loads the draws newer than MAX(concurso) from a CSV file into the database.
+    Accepts the real download format (NPRODUCTO,CONCURSO,F1..F7,BOLSA,FECHA) and
+    the lowercase column format (concurso, fecha, r1..r6, ...). Rows at or below
+    the high-water mark are not parsed; in a newest-first file reading stops at
+    the first of them. New rows are inserted with one executemany (INSERT OR
+    IGNORE on UNIQUE(concurso)) in a single transaction, using only the columns
+    the table has. Stored draws after the frequency mark are then folded into
+    the frequency and universe tables incrementally (see aplicar_sorteos_nuevos).
+    A database without a mark gets one first (marcar_base_frecuencias); on the
+    initial load into an empty table, or when the canonical tables do not match
+    the stored draws, the frequency tables are counted from the history instead.
+    Returns the new draws.
+    """
+    conn = get_connection()
+    table_columns = {row[1] for row in conn.execute("PRAGMA table_info(melate_retro)")}
+    high_water = conn.execute("SELECT COALESCE(MAX(concurso), 0) FROM melate_retro").fetchone()[0]
+    if high_water:
+        # Databases from before the mark existed: the canonical tables are the base only
+        # if they match the stored draws, otherwise they are counted from the history
+        marcar_base_frecuencias(high_water)
+
+    records = {}
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
         reader = csv.DictReader(f)
+        download_format = "CONCURSO" in (reader.fieldnames or [])
+        concurso_key = "CONCURSO" if download_format else "concurso"
+        previous = None
+        descending = False
+
         for row in reader:
             try:
-                concurso = int(row['concurso'])
-                # Check if the record already exists
-                c.execute("SELECT id FROM melate_retro WHERE concurso = ?", (concurso,))
-                if c.fetchone():
-                    continue
-
-                # Insert new record
-                c.execute("""
-                    INSERT INTO melate_retro (
-                        concurso, fecha, r1, r2, r3, r4, r5, r6,
-                        bolsa_inicial, gan_1er_lugar, premio_1er_lugar,
-                        gan_2do_lugar, premio_2do_lugar, gan_3er_lugar,
-                        premio_3er_lugar, gan_4to_lugar, premio_4to_lugar,
-                        gan_5to_lugar, premio_5to_lugar, gan_6to_lugar,
-                        premio_6to_lugar, gan_7mo_lugar, premio_7mo_lugar,
-                        clase_omega
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    concurso, row['fecha'], int(row['r1']), int(row['r2']),
-                    int(row['r3']), int(row['r4']), int(row['r5']), int(row['r6']),
-                    float(row['bolsa_inicial']), int(row['gan_1er_lugar']),
-                    float(row['premio_1er_lugar']), int(row['gan_2do_lugar']),
-                    float(row['premio_2do_lugar']), int(row['gan_3er_lugar']),
-                    float(row['premio_3er_lugar']), int(row['gan_4to_lugar']),
-                    float(row['premio_4to_lugar']), int(row['gan_5to_lugar']),
-                    float(row['premio_5to_lugar']), int(row['gan_6to_lugar']),
-                    float(row['premio_6to_lugar']), int(row['gan_7mo_lugar']),
-                    float(row['premio_7mo_lugar']), -1 # Default value for clase_omega
-                ))
-            except (ValueError, KeyError) as e:
+                concurso = int(row[concurso_key])
+            except (ValueError, KeyError, TypeError) as e:
                 print(f"[ERROR] Skipping row due to missing or invalid data: {row} - {e}")
                 continue
 
-    conn.commit()
-    conn.close()
+            descending = descending or (previous is not None and concurso < previous)
+            previous = concurso
+            if concurso <= high_water:
+                if descending:
+                    break  # Everything after this row is older
+                continue
+
+            try:
+                records[concurso] = _parse_row(row, download_format)
+            except (ValueError, KeyError, AttributeError) as e:
+                print(f"[ERROR] Skipping row due to missing or invalid data: {row} - {e}")
+
+    new_draws = sorted((concurso, [record[f"r{i}"] for i in range(1, 7)])
+                       for concurso, record in records.items())
+    if records:
+        columns = [column for column in next(iter(records.values())) if column in table_columns]
+        with_class = "clase_omega" in table_columns and "clase_omega" not in columns
+        names = columns + (["clase_omega"] if with_class else [])
+        values = [[record.get(column) for column in columns] + ([-1] if with_class else [])
+                  for _, record in sorted(records.items())]
+        with conn:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO melate_retro ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' * len(names))})", values)
+
+    print(f"[INFO] {len(new_draws)} new draws after concurso {high_water} loaded from {csv_path}")
+    if update_scores and new_draws:
+        aplicar_sorteos_nuevos()
+    return new_draws
 
 if __name__ == '__main__':
     # For testing purposes, we'll use the local CSV file.
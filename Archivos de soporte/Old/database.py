@@ -1,10 +1,9 @@
 # backend/database.py
-import sqlite3
-from .config import DATABASE_NAME
+from .connection import get_connection
 
 def initialize_database():
     """Initializes the database and creates the necessary tables."""
-    conn = sqlite3.connect(DATABASE_NAME)
+    conn = get_connection()
     c = conn.cursor()
 
     # Create table for Melate Retro
@@ -39,8 +38,26 @@ def initialize_database():
         )
     ''')
 
+    migrate_database(conn)
     conn.commit()
-    conn.close()
+
+# Analysis columns written by omega_analyzer (present in the live schema, missing in older databases)
+ANALYSIS_COLUMNS = (
+    ("afinidad_cuartetos", "INTEGER"),
+    ("afinidad_tercias", "INTEGER"),
+    ("afinidad_pares", "INTEGER"),
+    ("omega_score", "REAL"),
+)
+
+def migrate_database(conn):
+    """Adds the analysis columns and the metadata table if they are missing."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(melate_retro)")}
+    for name, sql_type in ANALYSIS_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE melate_retro ADD COLUMN {name} {sql_type}")
+
+    # Key/value metadata, e.g. the frequency-table version the scores were computed with
+    conn.execute("CREATE TABLE IF NOT EXISTS omega_meta (key TEXT PRIMARY KEY, value TEXT)")
 
 if __name__ == '__main__':
     initialize_database()
@@ -1,8 +1,9 @@
 # backend/main.py
 from .database import initialize_database
 from .data_loader import load_data_from_csv
-from .omega_analyzer import analizar_y_actualizar_clase_omega
+from .omega_analyzer import analizar_y_actualizar_clase_omega, aplicar_sorteos_nuevos
 from .config import TEST_CSV_PATH
+from .connection import close_connections
 
 def main():
     """Main function to run the backend processes."""
@@ -17,12 +18,18 @@ def main():
     # from data_loader import download_csv
     # download_csv(MELATE_RETRO_URL, TEST_CSV_PATH)
     print(f"[INFO] Loading data from {TEST_CSV_PATH}...")
-    load_data_from_csv(TEST_CSV_PATH)
+    new_draws = load_data_from_csv(TEST_CSV_PATH, update_scores=False)
+    applied = aplicar_sorteos_nuevos()
+    if applied:
+        print(f"[INFO] {len(new_draws)} new draws imported, {applied} draws folded into the frequency tables.")
+    else:
+        print(f"[INFO] {len(new_draws)} new draws imported, frequency tables already up to date.")
     
     # 3. Analyze and update Omega Class
     print("[INFO] Starting Omega Class analysis...")
     analizar_y_actualizar_clase_omega()
     
+    close_connections()
     print("[INFO] Backend processes finished successfully.")
 
 if __name__ == '__main__':
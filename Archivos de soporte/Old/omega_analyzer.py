@@ -1,43 +1,251 @@
 # backend/omega_analyzer.py
-import sqlite3
-from .omega_data import FREQ_PARES, FREQ_TERCIAS, FREQ_CUARTETOS
-from .config import DATABASE_NAME
+import os
+import numpy as np
+from .config import UNIVERSE_TABLE_PATH, FREQUENCY_TABLE_PATH, UPDATED_FREQUENCY_TABLE_PATH, OMEGA_BITMAP_PATH
+from .connection import get_connection, read_connection
+from .database import migrate_database
+from tablas_frecuencia import TablasFrecuencia, leer_vector, omega_score
+from frecuencias_historial import contar_subcombinaciones, tablas_desde_conteos
+from tabla_universo import TablaUniverso, construir_tabla_universo
+from actualizacion_incremental import aplicar_sorteo_nuevo
+from bitmap_omega import BitmapOmega, actualizar_bitmap, bitmap_desde_universo
+from bitmap_omega import leer_encabezado as leer_encabezado_bitmap
 
 # Omega criteria thresholds
 UMBRAL_PARES = 459
 UMBRAL_TERCIAS = 74
 UMBRAL_CUARTETOS = 10
 
+# Frequency tables, loaded on first use from the memory-mapped .npy file
+_tablas = None
+
+def _frequency_table_path():
+    """The updated tables once a draw has been folded in, the canonical file before that."""
+    return UPDATED_FREQUENCY_TABLE_PATH if os.path.exists(UPDATED_FREQUENCY_TABLE_PATH) else FREQUENCY_TABLE_PATH
+
+def _get_tablas():
+    global _tablas
+    if _tablas is None:
+        _tablas = TablasFrecuencia.desde_archivo(_frequency_table_path())
+    return _tablas
+
 def calcular_afinidad_pares(combinacion):
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            par = f"({min(combinacion[i], combinacion[j])},{max(combinacion[i], combinacion[j])})"
-            afinidad += FREQ_PARES.get(par, 0)
-    return afinidad
+    return _get_tablas().afinidad_pares(sorted(combinacion))
 
 def calcular_afinidad_tercias(combinacion):
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            for k in range(j + 1, len(combinacion)):
-                tercia = tuple(sorted((combinacion[i], combinacion[j], combinacion[k])))
-                key = str(tercia).replace(" ", "")
-                afinidad += FREQ_TERCIAS.get(key, 0)
-    return afinidad
+    return _get_tablas().afinidad_tercias(sorted(combinacion))
 
 def calcular_afinidad_cuartetos(combinacion):
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            for k in range(j + 1, len(combinacion)):
-                for l in range(k + 1, len(combinacion)):
-                    cuarteto = tuple(sorted((combinacion[i], combinacion[j], combinacion[k], combinacion[l])))
-                    key = str(cuarteto).replace(" ", "")
-                    afinidad += FREQ_CUARTETOS.get(key, 0)
-    return afinidad
+    return _get_tablas().afinidad_cuartetos(sorted(combinacion))
+
+# Precomputed universe table: None = not checked yet, False = unavailable
+_universe_table = None
+
+def _get_universe_table():
+    """Returns the universe table if it was built from these frequencies and thresholds."""
+    global _universe_table
+    if _universe_table is None:
+        _universe_table = False
+        if os.path.exists(UNIVERSE_TABLE_PATH):
+            try:
+                table = TablaUniverso(UNIVERSE_TABLE_PATH, _get_tablas())
+                if table.umbrales == (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS):
+                    _universe_table = table
+                else:
+                    print(f"[WARNING] Universe table built with other thresholds: {table.umbrales}")
+            except ValueError as e:
+                print(f"[WARNING] Ignoring universe table: {e}")
+    return _universe_table or None
+
+# Omega membership bitmap: None = not checked yet, False = unavailable
+_omega_bitmap = None
+
+def _get_omega_bitmap():
+    """Returns the Omega bitmap if it was built from these frequencies and thresholds."""
+    global _omega_bitmap
+    if _omega_bitmap is None:
+        _omega_bitmap = False
+        if os.path.exists(OMEGA_BITMAP_PATH):
+            try:
+                bitmap = BitmapOmega(OMEGA_BITMAP_PATH, _get_tablas())
+                if bitmap.umbrales == (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS):
+                    _omega_bitmap = bitmap
+                else:
+                    print(f"[WARNING] Omega bitmap built with other thresholds: {bitmap.umbrales}")
+            except ValueError as e:
+                print(f"[WARNING] Ignoring Omega bitmap: {e}")
+    return _omega_bitmap or None
+
+def build_universe_table():
+    """Scores the whole universe once and writes the table and bitmap used by es_clase_omega."""
+    global _universe_table, _omega_bitmap
+    construir_tabla_universo(_get_tablas(), UNIVERSE_TABLE_PATH, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
+    bitmap_desde_universo(TablaUniverso(UNIVERSE_TABLE_PATH), OMEGA_BITMAP_PATH)
+    _universe_table = None
+    _omega_bitmap = None
+    print(f"[INFO] Universe table written to {UNIVERSE_TABLE_PATH}, Omega bitmap to {OMEGA_BITMAP_PATH}")
+
+# omega_meta keys tracking which draws the updated frequency tables include:
+# frequency_base           'canonical' (counts start from the tracked file) or 'history' (from zero)
+# frequency_base_concurso  last concurso the base is taken to include
+# frequency_concurso       last concurso folded into the updated tables
+# frequency_digest         digest of the updated tables when frequency_concurso was written
+def _get_meta(conn, key):
+    row = conn.execute("SELECT value FROM omega_meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def _set_meta(conn, **values):
+    conn.executemany("INSERT OR REPLACE INTO omega_meta (key, value) VALUES (?, ?)",
+                     [(key, str(value)) for key, value in values.items()])
+
+def marcar_base_frecuencias(concurso):
+    """
+    Sets the frequency mark of a database that has none yet. The canonical file is
+    taken as the base only if its digest equals that of the tables counted from the
+    stored draws up to concurso; otherwise the tables are counted from the stored
+    history (reconstruir_frecuencias_historial). Draws after the mark are folded in
+    by aplicar_sorteos_nuevos.
+    """
+    conn = get_connection()
+    with conn:
+        migrate_database(conn)
+    if _get_meta(conn, 'frequency_concurso') is not None:
+        return
+
+    draws = _draws_between(conn, 0, concurso)
+    if draws:
+        historial = tablas_desde_conteos(contar_subcombinaciones([numbers for _, numbers in draws]))
+        if historial.digest() == TablasFrecuencia.desde_archivo(FREQUENCY_TABLE_PATH).digest():
+            with conn:
+                _set_meta(conn, frequency_base='canonical', frequency_base_concurso=concurso,
+                          frequency_concurso=concurso)
+                conn.execute("DELETE FROM omega_meta WHERE key = 'frequency_digest'")
+            return
+
+    print(f"[WARNING] {FREQUENCY_TABLE_PATH} does not match the {len(draws)} stored draws; "
+          f"counting the frequency tables from the history")
+    reconstruir_frecuencias_historial()
+
+def _draws_between(conn, after, up_to=None):
+    """(concurso, [r1..r6]) of the stored draws with after < concurso <= up_to, in concurso order."""
+    query = "SELECT concurso, r1, r2, r3, r4, r5, r6 FROM melate_retro WHERE concurso > ? AND r1 IS NOT NULL"
+    params = [after]
+    if up_to is not None:
+        query += " AND concurso <= ?"
+        params.append(up_to)
+    return [(row[0], list(row[1:])) for row in conn.execute(query + " ORDER BY concurso", params)]
+
+def _restore_updated_frequencies(conn):
+    """
+    Rewrites the updated tables from their base plus the draws up to the mark when
+    they no longer match it (an import interrupted after writing the tables but
+    before advancing the mark, or a deleted file).
+    """
+    stored = _get_meta(conn, 'frequency_digest')
+    current = (TablasFrecuencia.desde_archivo(UPDATED_FREQUENCY_TABLE_PATH).digest()
+               if os.path.exists(UPDATED_FREQUENCY_TABLE_PATH) else None)
+    if current == stored:
+        return
+
+    base = int(_get_meta(conn, 'frequency_base_concurso'))
+    draws = _draws_between(conn, base, int(_get_meta(conn, 'frequency_concurso')))
+    if _get_meta(conn, 'frequency_base') == 'history':
+        conteos = np.zeros(len(leer_vector(FREQUENCY_TABLE_PATH)), dtype=np.int64)
+    else:
+        conteos = np.array(leer_vector(FREQUENCY_TABLE_PATH), dtype=np.int64)
+    if draws:
+        conteos += contar_subcombinaciones([numbers for _, numbers in draws])
+    tablas = tablas_desde_conteos(conteos)
+    tablas.guardar(UPDATED_FREQUENCY_TABLE_PATH)
+    with conn:
+        _set_meta(conn, frequency_digest=tablas.digest())
+    print(f"[WARNING] Updated frequency tables did not match the applied mark; rebuilt from {len(draws)} draws")
+
+def reconstruir_frecuencias_historial():
+    """
+    Counts the frequency tables from every stored draw into the updated tables and
+    sets the mark to the last one. Used when no mark exists and the canonical file
+    does not describe the stored history (always for a fresh database). The universe
+    table and bitmap no longer match and are rebuilt on demand. Returns the number
+    of draws counted.
+    """
+    global _tablas, _universe_table, _omega_bitmap
+    conn = get_connection()
+    draws = _draws_between(conn, 0)
+    if not draws:
+        return 0
+
+    tablas = tablas_desde_conteos(contar_subcombinaciones([numbers for _, numbers in draws]))
+    tablas.guardar(UPDATED_FREQUENCY_TABLE_PATH)
+    with conn:
+        _set_meta(conn, frequency_base='history', frequency_base_concurso=0,
+                  frequency_concurso=draws[-1][0], frequency_digest=tablas.digest())
+    print(f"[INFO] Frequency tables rebuilt from {len(draws)} stored draws "
+          f"(up to concurso {draws[-1][0]}) into {UPDATED_FREQUENCY_TABLE_PATH}")
+
+    _tablas = None
+    _universe_table = None
+    _omega_bitmap = None
+    return len(draws)
+
+def aplicar_sorteos_nuevos():
+    """
+    Folds the stored draws after the frequency mark (omega_meta frequency_concurso)
+    into the updated frequency tables and patches the universe table in place for
+    the combinations each draw affects (no full rescoring). The Omega bitmap is
+    patched with the combinations that enter and leave Omega. The mark advances
+    after each draw, so an import that failed half way resumes where it stopped
+    and no draw is ever counted twice. Without a mark (fresh database) the tables
+    are rebuilt from the stored history instead. Returns the number of draws applied.
+    """
+    global _tablas, _universe_table, _omega_bitmap
+    conn = get_connection()
+    with conn:
+        migrate_database(conn)
+    mark = _get_meta(conn, 'frequency_concurso')
+    if mark is None:
+        return reconstruir_frecuencias_historial()
+
+    _restore_updated_frequencies(conn)
+    draws = _draws_between(conn, int(mark))
+    for concurso, sorteo in draws:
+        universe_path = UNIVERSE_TABLE_PATH if os.path.exists(UNIVERSE_TABLE_PATH) else None
+        source_path = _frequency_table_path()
+        previous_digest = TablasFrecuencia.desde_archivo(source_path).digest()
+        try:
+            resumen = aplicar_sorteo_nuevo(sorteo, source_path, universe_path, UPDATED_FREQUENCY_TABLE_PATH)
+        except ValueError as e:
+            # The table no longer matches the frequencies; it will be rebuilt on demand
+            print(f"[WARNING] Universe table not patched: {e}")
+            resumen = aplicar_sorteo_nuevo(sorteo, source_path, None, UPDATED_FREQUENCY_TABLE_PATH)
+        with conn:
+            _set_meta(conn, frequency_concurso=concurso, frequency_digest=resumen['digest'])
+        print(f"[INFO] Draw {concurso} {resumen['sorteo']} applied: {resumen['afectadas']} combinations "
+              f"rescored, {len(resumen['entran'])} enter and {len(resumen['salen'])} leave Omega "
+              f"({resumen['segundos'] * 1000:.0f} ms)")
+
+        if resumen['afectadas'] and os.path.exists(OMEGA_BITMAP_PATH):
+            try:
+                if leer_encabezado_bitmap(OMEGA_BITMAP_PATH)[1] == previous_digest:
+                    actualizar_bitmap(OMEGA_BITMAP_PATH, resumen['entran'], resumen['salen'], resumen['digest'])
+            except ValueError as e:
+                print(f"[WARNING] Omega bitmap not patched: {e}")
+
+    # Reload tables, universe table and bitmap on next use
+    _tablas = None
+    _universe_table = None
+    _omega_bitmap = None
+    return len(draws)
 
 def es_clase_omega(combinacion):
+    bitmap = _get_omega_bitmap()
+    if bitmap is not None:
+        return 1 if bitmap.es_omega(combinacion) else 0
+
+    table = _get_universe_table()
+    if table is not None:
+        return 1 if table.es_omega(combinacion) else 0
+
     afinidad_pares = calcular_afinidad_pares(combinacion)
     if afinidad_pares < UMBRAL_PARES:
         return 0
@@ -49,22 +257,62 @@ def es_clase_omega(combinacion):
     afinidad_cuartetos = calcular_afinidad_cuartetos(combinacion)
     return 1 if afinidad_cuartetos >= UMBRAL_CUARTETOS else 0
 
-def analizar_y_actualizar_clase_omega():
-    """Analyzes all records in the database and updates the clase_omega field."""
-    conn = sqlite3.connect(DATABASE_NAME)
-    c = conn.cursor()
-    c.execute("SELECT id, r1, r2, r3, r4, r5, r6 FROM melate_retro")
-    rows = c.fetchall()
-
-    for row in rows:
-        id, r1, r2, r3, r4, r5, r6 = row
-        combinacion = [r1, r2, r3, r4, r5, r6]
-        clase_omega = es_clase_omega(combinacion)
-        c.execute("UPDATE melate_retro SET clase_omega = ? WHERE id = ?", (clase_omega, id))
-
-    conn.commit()
-    conn.close()
-    print("[INFO] Omega Class analysis and database update complete.")
+def calcular_omega_score(pares, tercias, cuartetos, es_omega):
+    """Weighted affinity over the thresholds (0.2 pairs, 0.3 triples, 0.5 quartets) minus 1; 0 if not Omega."""
+    return omega_score(pares, tercias, cuartetos, es_omega, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
+
+def _scoring_version():
+    """Frequency-table digest plus thresholds: stored scores are stale when this changes."""
+    return f"{_get_tablas().digest()}:{UMBRAL_PARES},{UMBRAL_TERCIAS},{UMBRAL_CUARTETOS}"
+
+def analizar_y_actualizar_clase_omega(full=False):
+    """
+    Scores the draws in the database and writes clase_omega, the three affinities
+    and omega_score. Only rows without a class (NULL/-1) are scored, unless the
+    frequency tables or thresholds changed since the last run (or full=True).
+    All rows are scored as one vectorized batch and written with a single
+    executemany in one transaction.
+    """
+    conn = get_connection()
+    with conn:
+        migrate_database(conn)
+
+    version = _scoring_version()
+    with read_connection() as reader:
+        stored = reader.execute("SELECT value FROM omega_meta WHERE key = 'scoring_version'").fetchone()
+        rescore_all = full or stored is None or stored[0] != version
+
+        query = "SELECT id, r1, r2, r3, r4, r5, r6 FROM melate_retro WHERE r1 IS NOT NULL"
+        if not rescore_all:
+            query += " AND (clase_omega IS NULL OR clase_omega = -1)"
+        rows = reader.execute(query).fetchall()
+
+    updates = []
+    if rows:
+        data = np.array(rows, dtype=np.int64)
+        combinaciones = np.sort(data[:, 1:], axis=1).astype(np.uint8)
+        tablas = _get_tablas()
+        pares = tablas.afinidad_pares_lote(combinaciones)
+        tercias = tablas.afinidad_tercias_lote(combinaciones)
+        cuartetos = tablas.afinidad_cuartetos_lote(combinaciones)
+        es_omega = (pares >= UMBRAL_PARES) & (tercias >= UMBRAL_TERCIAS) & (cuartetos >= UMBRAL_CUARTETOS)
+        scores = calcular_omega_score(pares, tercias, cuartetos, es_omega)
+        updates = list(zip(es_omega.astype(int).tolist(), pares.tolist(), tercias.tolist(),
+                           cuartetos.tolist(), scores.tolist(), data[:, 0].tolist()))
+
+    with conn:
+        conn.executemany("""
+            UPDATE melate_retro
+            SET clase_omega = ?, afinidad_pares = ?, afinidad_tercias = ?,
+                afinidad_cuartetos = ?, omega_score = ?
+            WHERE id = ?
+        """, updates)
+        conn.execute("INSERT OR REPLACE INTO omega_meta (key, value) VALUES ('scoring_version', ?)",
+                     (version,))
+
+    mode = "full rescore" if rescore_all else "incremental"
+    print(f"[INFO] Omega Class analysis complete ({mode}): {len(updates)} rows updated.")
+    return len(updates)
 
 if __name__ == '__main__':
     analizar_y_actualizar_clase_omega()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+ACTUALIZACIÓN INCREMENTAL AL AGREGAR UN SORTEO
+==============================================
+
+Un sorteo nuevo D suma 1 a la frecuencia de sus 15 pares, 20 tercias y 15
+cuartetos. Para una combinación C que comparte j números con D, exactamente
+C(j, 2) de sus pares, C(j, 3) de sus tercias y C(j, 4) de sus cuartetos son
+sub-combinaciones de D, así que su puntuación sube en esas cantidades y sólo
+cambian las combinaciones con j >= 2 (731,039 de 3,262,623).
+
+aplicar_sorteo_nuevo() genera los ranks de esas combinaciones de forma
+vectorizada (j números de D más 6 - j de los 33 restantes), parcha en sitio
+la tabla del universo (puntuaciones y bandera Omega) y guarda las tablas de
+frecuencia con el sorteo incluido, en lugar de volver a puntuar el universo.
+
+Las tablas actualizadas se escriben en un archivo derivado
+(frecuencias_omega_actualizadas.npy); el archivo canónico versionado
+frecuencias_omega.npy nunca se sobrescribe. Quien aplica varios sorteos debe
+llevar la cuenta de cuáles ya incluyó (el backend guarda el último concurso
+aplicado en omega_meta): esta función no sabe si un sorteo ya se sumó.
+
+Orden de escritura: primero el digest nuevo en el encabezado de la tabla del
+universo, luego los registros y al final el archivo de frecuencias (reemplazo
+atómico). Si el proceso se interrumpe a medio camino, el digest de la tabla
+no coincide con las frecuencias vigentes y la tabla se reconstruye completa
+la próxima vez que se abra (obtener_tabla_universo). Si alguna afinidad nueva
+no cabe en su campo del registro (cuartetos > 255, pares o tercias > 65,535)
+se lanza ValueError antes de escribir nada.
+
+Uso:
+    python actualizacion_incremental.py N1 N2 N3 N4 N5 N6 [universo.bin] [frecuencias.npy] [salida.npy]
+
+Autor: Proyecto Omega Point
+"""
+
+import os
+import sys
+import time
+from itertools import combinations
+
+import numpy as np
+
+from combinatoria import (MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION, TOTAL_COMBINACIONES, BINOMIALES,
+                          rank_combinaciones)
+from frecuencias_historial import contar_subcombinaciones, normalizar_sorteos, tablas_desde_conteos
+from tabla_universo import (BANDERA_OMEGA, DTYPE_REGISTRO, TAMANO_ENCABEZADO, TablaUniverso,
+                            actualizar_digest, verificar_rango_registros)
+from tablas_frecuencia import ARCHIVO_FRECUENCIAS, TablasFrecuencia, leer_vector
+
+# Tablas con los sorteos agregados después del archivo canónico
+ARCHIVO_FRECUENCIAS_ACTUALIZADAS = os.path.join(os.path.dirname(ARCHIVO_FRECUENCIAS),
+                                                'frecuencias_omega_actualizadas.npy')
+
+# Incremento de afinidad (pares, tercias, cuartetos) según cuántos números comparte con el sorteo
+INCREMENTOS = np.array([[BINOMIALES[j][k] for k in (2, 3, 4)]
+                        for j in range(NUMS_POR_COMBINACION + 1)], dtype=np.int64)
+
+
+def combinaciones_afectadas(sorteo):
+    """
+    Ranks (ordenados) de las combinaciones que comparten al menos dos números
+    con el sorteo, junto con cuántos comparten cada una
+    """
+    sorteo = normalizar_sorteos(sorteo)[0].astype(np.int64)
+    resto = np.setdiff1d(np.arange(MIN_NUM, MAX_NUM + 1), sorteo)
+
+    ranks = []
+    compartidos = []
+    for j in range(2, NUMS_POR_COMBINACION + 1):
+        faltan = NUMS_POR_COMBINACION - j
+        dentro = sorteo[np.array(list(combinations(range(NUMS_POR_COMBINACION), j)), dtype=np.intp)]
+        posiciones = list(combinations(range(len(resto)), faltan))
+        fuera = resto[np.array(posiciones, dtype=np.intp).reshape(len(posiciones), faltan)]
+        bloque = np.concatenate([np.repeat(dentro, len(fuera), axis=0),
+                                 np.tile(fuera, (len(dentro), 1))], axis=1)
+        bloque.sort(axis=1)
+        ranks.append(rank_combinaciones(bloque))
+        compartidos.append(np.full(len(bloque), j, dtype=np.uint8))
+
+    ranks = np.concatenate(ranks)
+    compartidos = np.concatenate(compartidos)
+    orden = np.argsort(ranks)
+    return ranks[orden], compartidos[orden]
+
+
+def aplicar_sorteo_nuevo(sorteo, ruta_frecuencias=ARCHIVO_FRECUENCIAS, ruta_universo=None,
+                         ruta_salida=ARCHIVO_FRECUENCIAS_ACTUALIZADAS):
+    """
+    Agrega un sorteo a las tablas de ruta_frecuencias, guarda el resultado en
+    ruta_salida y, si se indica, parcha la tabla del universo sólo en las
+    combinaciones afectadas. La tabla debe corresponder a las frecuencias de
+    entrada y las afinidades nuevas deben caber en sus campos (ValueError si
+    no, antes de escribir nada). Retorna un resumen con las Omega que entran
+    y salen y el digest de las tablas nuevas.
+    """
+    if os.path.abspath(ruta_salida) == os.path.abspath(ARCHIVO_FRECUENCIAS):
+        raise ValueError(f"El archivo canónico no se sobrescribe: {ARCHIVO_FRECUENCIAS}")
+
+    inicio = time.perf_counter()
+    vector = np.array(leer_vector(ruta_frecuencias))
+    tablas_previas = TablasFrecuencia.desde_vector(vector)
+    tablas_nuevas = tablas_desde_conteos(vector.astype(np.int64) + contar_subcombinaciones(sorteo))
+
+    resumen = {'sorteo': normalizar_sorteos(sorteo)[0].tolist(), 'afectadas': 0,
+               'entran': np.empty(0, dtype=np.int64), 'salen': np.empty(0, dtype=np.int64),
+               'digest': tablas_nuevas.digest()}
+
+    if ruta_universo is not None:
+        tabla = TablaUniverso(ruta_universo, tablas_previas)
+        up, ut, uc = tabla.umbrales
+        del tabla
+
+        ranks, compartidos = combinaciones_afectadas(sorteo)
+        registros = np.memmap(ruta_universo, dtype=DTYPE_REGISTRO, mode='r+',
+                              offset=TAMANO_ENCABEZADO, shape=(TOTAL_COMBINACIONES,))
+        afectados = registros[ranks]
+        incrementos = INCREMENTOS[compartidos]
+        pares = afectados['pares'].astype(np.int64) + incrementos[:, 0]
+        tercias = afectados['tercias'].astype(np.int64) + incrementos[:, 1]
+        cuartetos = afectados['cuartetos'].astype(np.int64) + incrementos[:, 2]
+        verificar_rango_registros(pares, tercias, cuartetos)
+
+        era_omega = (afectados['banderas'] & BANDERA_OMEGA).astype(bool)
+        es_omega = (pares >= up) & (tercias >= ut) & (cuartetos >= uc)
+        afectados['pares'] = pares
+        afectados['tercias'] = tercias
+        afectados['cuartetos'] = cuartetos
+        afectados['banderas'] = np.where(es_omega, afectados['banderas'] | BANDERA_OMEGA,
+                                         afectados['banderas'] & ~np.uint8(BANDERA_OMEGA))
+
+        actualizar_digest(ruta_universo, resumen['digest'])
+        registros[ranks] = afectados
+        registros.flush()
+        del registros
+
+        resumen.update(afectadas=len(ranks), entran=ranks[es_omega & ~era_omega],
+                       salen=ranks[era_omega & ~es_omega])
+
+    tablas_nuevas.guardar(ruta_salida)
+    resumen['segundos'] = time.perf_counter() - inicio
+    return resumen
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 1 + NUMS_POR_COMBINACION:
+        print("Uso: python actualizacion_incremental.py N1 N2 N3 N4 N5 N6 [universo.bin] [frecuencias.npy] "
+              "[salida.npy]")
+        sys.exit(1)
+
+    numeros = [int(x) for x in sys.argv[1:1 + NUMS_POR_COMBINACION]]
+    extras = sys.argv[1 + NUMS_POR_COMBINACION:]
+    ruta_universo = extras[0] if extras else None
+    ruta_salida = extras[2] if len(extras) > 2 else ARCHIVO_FRECUENCIAS_ACTUALIZADAS
+    if len(extras) > 1:
+        ruta_frecuencias = extras[1]
+    else:
+        # Se continúa desde las tablas ya actualizadas si existen
+        ruta_frecuencias = ruta_salida if os.path.exists(ruta_salida) else ARCHIVO_FRECUENCIAS
+
+    resumen = aplicar_sorteo_nuevo(numeros, ruta_frecuencias, ruta_universo, ruta_salida)
+    print(f"✅ Sorteo {resumen['sorteo']} agregado a {ruta_frecuencias} -> {ruta_salida}")
+    if ruta_universo:
+        print(f"   🔄 Combinaciones repuntuadas: {resumen['afectadas']:,}")
+        print(f"   🎯 Omega que entran: {len(resumen['entran']):,} | salen: {len(resumen['salen']):,}")
+    print(f"   ⏱️  Tiempo: {resumen['segundos'] * 1000:.0f} ms")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+ALMACÉN BINARIO DE RESULTADOS OMEGA (STREAMING)
+===============================================
+
+Las combinaciones Omega se agregan a un archivo binario de ancho fijo
+conforme llega cada bloque, en lugar de reconstruir un Excel completo en
+cada guardado:
+
+    encabezado (64 bytes):
+        magic 'OMEGARES' | versión | umbrales (pares, tercias, cuartetos) |
+        digest SHA-256 de las tablas de frecuencia
+    registros (9 bytes cada uno):
+        rank uint32 | pares uint16 | tercias uint16 | cuartetos uint8
+
+La combinación se recupera del rank (ver combinatoria.py). El reporte Excel
+(Todas_Combinaciones_Omega, Top_100_Mayor_Afinidad, Estadisticas) es un paso
+aparte, exportar_excel(), que recorre el almacén por bloques mezclando en
+orden de rank los tramos agregados (memoria acotada por bloque, no por el
+total de registros) y reparte las filas en varias hojas cuando exceden el límite de
+Excel (1,048,576 filas por hoja).
+
+Uso independiente:
+    python almacen_omega.py resultados_omega.bin TODAS_Combinaciones_Omega.xlsx
+
+Autor: Proyecto Omega Point
+"""
+
+import heapq
+import os
+import struct
+import sys
+from itertools import islice
+
+import numpy as np
+
+from combinatoria import NUMS_POR_COMBINACION, unrank_combinacion
+from tabla_universo import verificar_rango_registros
+
+MAGIC = b'OMEGARES'
+VERSION = 1
+FORMATO_ENCABEZADO = '<8sI3H32s'
+TAMANO_ENCABEZADO = 64
+
+DTYPE_OMEGA = np.dtype([
+    ('rank', '<u4'),
+    ('pares', '<u2'),
+    ('tercias', '<u2'),
+    ('cuartetos', 'u1'),
+])
+
+# Límite de filas por hoja de Excel (incluye la fila de encabezados)
+MAX_FILAS_EXCEL = 1048576
+FILAS_POR_BLOQUE = 65536
+TOP_AFINIDAD = 100
+
+COLUMNAS_EXCEL = ([f'n{i + 1}' for i in range(NUMS_POR_COMBINACION)]
+                  + ['afinidad_pares', 'afinidad_tercias', 'afinidad_cuartetos', 'afinidad_total',
+                     'suma', 'rango', 'min_num', 'max_num'])
+
+
+def registros_omega(ranks, pares, tercias, cuartetos):
+    """
+    Arreglo estructurado DTYPE_OMEGA a partir de columnas paralelas.
+    ValueError si alguna afinidad no cabe en su campo (en lugar de truncarla).
+    """
+    verificar_rango_registros(pares, tercias, cuartetos, DTYPE_OMEGA)
+    registros = np.empty(len(ranks), dtype=DTYPE_OMEGA)
+    registros['rank'] = ranks
+    registros['pares'] = pares
+    registros['tercias'] = tercias
+    registros['cuartetos'] = cuartetos
+    return registros
+
+
+def leer_almacen(ruta):
+    """
+    Retorna (umbrales, digest, registros) con los registros abiertos por
+    np.memmap en modo sólo lectura. ValueError si el archivo no es válido.
+    """
+    with open(ruta, 'rb') as f:
+        datos = f.read(TAMANO_ENCABEZADO)
+    if len(datos) < TAMANO_ENCABEZADO:
+        raise ValueError(f"Almacén de resultados truncado: {ruta}")
+
+    magic, version, up, ut, uc, digest = struct.unpack_from(FORMATO_ENCABEZADO, datos)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Almacén de resultados inválido o de otra versión: {ruta}")
+
+    cantidad = (os.path.getsize(ruta) - TAMANO_ENCABEZADO) // DTYPE_OMEGA.itemsize
+    if cantidad == 0:
+        registros = np.empty(0, dtype=DTYPE_OMEGA)
+    else:
+        registros = np.memmap(ruta, dtype=DTYPE_OMEGA, mode='r',
+                              offset=TAMANO_ENCABEZADO, shape=(cantidad,))
+    return (up, ut, uc), digest.hex(), registros
+
+
+class AlmacenOmega:
+    """Archivo de sólo agregado con los registros Omega de una búsqueda"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.archivo = None
+        self.cantidad = 0
+
+    def crear(self, umbrales, digest):
+        """Empieza un almacén vacío (sobrescribe el anterior)"""
+        self.archivo = open(self.ruta, 'wb')
+        encabezado = struct.pack(FORMATO_ENCABEZADO, MAGIC, VERSION, *umbrales, bytes.fromhex(digest))
+        self.archivo.write(encabezado.ljust(TAMANO_ENCABEZADO, b'\0'))
+        self.archivo.flush()
+        self.cantidad = 0
+        return self
+
+    def reabrir(self, cantidad):
+        """
+        Continúa un almacén existente conservando sólo los primeros `cantidad`
+        registros (los confirmados por el punto de control); lo demás se
+        descarta porque su bloque no alcanzó a registrarse.
+        """
+        leer_almacen(self.ruta)
+        tamano = TAMANO_ENCABEZADO + cantidad * DTYPE_OMEGA.itemsize
+        if os.path.getsize(self.ruta) < tamano:
+            raise ValueError(f"El almacén tiene menos registros que el punto de control: {self.ruta}")
+
+        self.archivo = open(self.ruta, 'r+b')
+        self.archivo.truncate(tamano)
+        self.archivo.seek(tamano)
+        self.cantidad = cantidad
+        return self
+
+    def agregar(self, registros):
+        """Agrega registros DTYPE_OMEGA al final del archivo"""
+        if len(registros):
+            self.archivo.write(np.ascontiguousarray(registros, dtype=DTYPE_OMEGA).tobytes())
+            self.cantidad += len(registros)
+
+    def sincronizar(self):
+        """Lleva a disco lo agregado (antes de confirmarlo en el punto de control)"""
+        self.archivo.flush()
+        os.fsync(self.archivo.fileno())
+
+    def cerrar(self):
+        """Cierra el archivo"""
+        if self.archivo is not None:
+            self.archivo.close()
+            self.archivo = None
+
+
+def _filas_excel(registros):
+    """Filas del reporte para un bloque de registros (combinación + afinidades)"""
+    for registro in registros.tolist():
+        rank, pares, tercias, cuartetos = registro
+        combinacion = unrank_combinacion(rank)
+        yield (combinacion + (pares, tercias, cuartetos, pares + tercias + cuartetos,
+                              sum(combinacion), combinacion[-1] - combinacion[0],
+                              combinacion[0], combinacion[-1]))
+
+
+def _afinidad_total(registros):
+    """Afinidad total (pares + tercias + cuartetos) de cada registro"""
+    return (registros['pares'].astype(np.int64) + registros['tercias'] + registros['cuartetos'])
+
+
+def _tramos_ascendentes(ranks):
+    """
+    Límites (inicio, fin) de los tramos con rank creciente: cada bloque se
+    agrega ordenado, así que un tramo nuevo empieza donde el rank disminuye.
+    Se recorre por bloques para no materializar np.diff de todo el almacén.
+    """
+    cortes = [0]
+    for inicio in range(0, len(ranks), FILAS_POR_BLOQUE):
+        tramo = ranks[inicio:inicio + FILAS_POR_BLOQUE + 1]
+        cortes.extend((inicio + 1 + np.flatnonzero(tramo[1:] < tramo[:-1])).tolist())
+    cortes.append(len(ranks))
+    return list(zip(cortes[:-1], cortes[1:]))
+
+
+def _bloques_por_rank(registros):
+    """
+    Bloques de a lo más FILAS_POR_BLOQUE registros en orden de rank: mezcla
+    k-way de los tramos ascendentes leyendo de cada uno una porción del
+    bloque, así la memoria crece con el número de tramos y no con el de registros
+    """
+    tramos = _tramos_ascendentes(registros['rank'])
+    if len(tramos) == 1:
+        for inicio in range(0, len(registros), FILAS_POR_BLOQUE):
+            yield np.asarray(registros[inicio:inicio + FILAS_POR_BLOQUE])
+        return
+
+    lectura = max(64, FILAS_POR_BLOQUE // len(tramos))
+
+    def leer_tramo(inicio, fin):
+        for i in range(inicio, fin, lectura):
+            yield from registros[i:min(i + lectura, fin)].tolist()
+
+    mezcla = heapq.merge(*(leer_tramo(inicio, fin) for inicio, fin in tramos))
+    while True:
+        filas = list(islice(mezcla, FILAS_POR_BLOQUE))
+        if not filas:
+            return
+        yield np.array(filas, dtype=DTYPE_OMEGA)
+
+
+def exportar_excel(ruta_almacen, archivo_excel, filas_por_hoja=MAX_FILAS_EXCEL - 1):
+    """
+    Construye el reporte Excel desde el almacén recorriéndolo por bloques.
+    Los registros se agregan en el orden en que terminan los bloques, así que
+    los tramos ascendentes se mezclan por rank (_bloques_por_rank): las filas de
+    Todas_Combinaciones_Omega van en orden lexicográfico y se reparten en
+    hojas _2, _3, ... cuando superan `filas_por_hoja`. Top_100_Mayor_Afinidad
+    tiene min(100, total) filas. Retorna el número de combinaciones exportadas.
+    """
+    from openpyxl import Workbook
+
+    _, _, registros = leer_almacen(ruta_almacen)
+    total = len(registros)
+
+    libro = Workbook(write_only=True)
+    hoja = None
+    filas_en_hoja = 0
+    numero_hoja = 0
+
+    # Acumuladores de estadísticas y mejores combinaciones (memoria constante)
+    sumas = dict.fromkeys(('pares', 'tercias', 'cuartetos', 'total', 'suma', 'rango'), 0)
+    maximo_total = None
+    minimo_total = None
+    mejores = np.empty(0, dtype=DTYPE_OMEGA)
+
+    for bloque in _bloques_por_rank(registros):
+
+        for fila in _filas_excel(bloque):
+            if hoja is None or filas_en_hoja >= filas_por_hoja:
+                numero_hoja += 1
+                nombre = 'Todas_Combinaciones_Omega' + (f'_{numero_hoja}' if numero_hoja > 1 else '')
+                hoja = libro.create_sheet(nombre)
+                hoja.append(COLUMNAS_EXCEL)
+                filas_en_hoja = 0
+            hoja.append(fila)
+            filas_en_hoja += 1
+            sumas['suma'] += fila[-4]
+            sumas['rango'] += fila[-3]
+
+        totales = _afinidad_total(bloque)
+        sumas['pares'] += int(bloque['pares'].sum())
+        sumas['tercias'] += int(bloque['tercias'].sum())
+        sumas['cuartetos'] += int(bloque['cuartetos'].sum())
+        sumas['total'] += int(totales.sum())
+        maximo_total = int(totales.max()) if maximo_total is None else max(maximo_total, int(totales.max()))
+        minimo_total = int(totales.min()) if minimo_total is None else min(minimo_total, int(totales.min()))
+
+        # Mejores por afinidad total: mayor total primero, a igualdad menor rank
+        candidatos = np.concatenate([mejores, bloque])
+        orden = np.lexsort((candidatos['rank'], -_afinidad_total(candidatos)))
+        mejores = candidatos[orden[:TOP_AFINIDAD]]
+
+    if hoja is None:
+        libro.create_sheet('Todas_Combinaciones_Omega').append(COLUMNAS_EXCEL)
+
+    hoja = libro.create_sheet('Top_100_Mayor_Afinidad')
+    hoja.append(COLUMNAS_EXCEL)
+    for fila in _filas_excel(mejores):
+        hoja.append(fila)
+
+    promedio = (lambda clave: sumas[clave] / total) if total else (lambda clave: 0)
+    hoja = libro.create_sheet('Estadisticas')
+    hoja.append(['Métrica', 'Valor'])
+    for metrica, valor in (
+            ('Total Combinaciones Omega', total),
+            ('Afinidad Pares Promedio', promedio('pares')),
+            ('Afinidad Tercias Promedio', promedio('tercias')),
+            ('Afinidad Cuartetos Promedio', promedio('cuartetos')),
+            ('Afinidad Total Promedio', promedio('total')),
+            ('Afinidad Total Máxima', maximo_total),
+            ('Afinidad Total Mínima', minimo_total),
+            ('Suma Promedio', promedio('suma')),
+            ('Rango Promedio', promedio('rango'))):
+        hoja.append([metrica, valor])
+
+    libro.save(archivo_excel)
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python almacen_omega.py <almacen.bin> <reporte.xlsx>")
+        sys.exit(1)
+
+    exportadas = exportar_excel(sys.argv[1], sys.argv[2])
+    print(f"✅ {exportadas:,} combinaciones Omega exportadas a {sys.argv[2]}")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+BARRIDO DE UMBRALES OMEGA EN UNA SOLA PASADA
+============================================
+
+Cambiar los criterios (459 / 74 / 10) exigía repetir la búsqueda completa
+por cada combinación de umbrales. En su lugar se recorre el universo una sola
+vez y se construye el histograma 3-D de las afinidades:
+
+    H[p, t, q] = combinaciones con exactamente p pares, t tercias, q cuartetos
+
+Su suma acumulada desde arriba en los tres ejes da, para cualquier terna,
+
+    S[up, ut, uc] = combinaciones con pares >= up, tercias >= ut, cuartetos >= uc
+
+es decir, el número de combinaciones Omega con esos umbrales en O(1).
+
+Las dimensiones salen de las tablas de frecuencia (suma de las 15, 20 y 15
+frecuencias más altas de cada orden acota la afinidad máxima), así que los
+histogramas de rangos distintos del universo se pueden sumar directamente.
+La pasada usa la tabla del universo si existe y corresponde a las tablas
+vigentes (lectura secuencial del memmap); si no, la enumeración por prefijos.
+
+Uso:
+    python barrido_umbrales.py [--universo archivo.bin] [--guardar barrido.npz]
+                               [--pares 400,459,500] [--tercias 70,74,80] [--cuartetos 8,10,12]
+
+Autor: Proyecto Omega Point
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from combinatoria import TOTAL_COMBINACIONES
+from enumeracion_prefijos import EnumeradorPrefijos
+from tabla_universo import TablaUniverso
+from tablas_frecuencia import (DESPLAZAMIENTOS_ORDEN, IDX_PARES, IDX_TERCIAS, IDX_CUARTETOS,
+                               TAMANOS_ORDEN, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS,
+                               TablasFrecuencia)
+
+# Sub-combinaciones de cada orden dentro de una combinación (15, 20, 15)
+SUBCOMBINACIONES_ORDEN = (len(IDX_PARES), len(IDX_TERCIAS), len(IDX_CUARTETOS))
+TAMANO_BLOQUE_UNIVERSO = 1 << 20
+
+
+def dimensiones_histograma(tablas):
+    """
+    (pares, tercias, cuartetos) máximos + 1: ninguna combinación puede superar
+    la suma de las frecuencias más altas de cada orden
+    """
+    vector = tablas.a_vector().astype(np.int64)
+    dimensiones = []
+    for desplazamiento, tamano, n in zip(DESPLAZAMIENTOS_ORDEN, TAMANOS_ORDEN, SUBCOMBINACIONES_ORDEN):
+        orden = vector[desplazamiento:desplazamiento + tamano]
+        dimensiones.append(int(np.partition(orden, -n)[-n:].sum()) + 1)
+    return tuple(dimensiones)
+
+
+def conteos_afinidades(tablas, ruta_universo=None, inicio=0, fin=TOTAL_COMBINACIONES):
+    """
+    Histograma disperso de (pares, tercias, cuartetos) de los ranks [inicio, fin):
+    (celdas, conteos) con los índices planos de las celdas no vacías del
+    histograma de dimensiones_histograma(tablas). Usa la tabla del universo si
+    se indica y es válida para estas tablas; si no, la enumeración por prefijos.
+    Los índices planos se cuentan con un solo np.bincount (sin ordenar).
+    """
+    dimensiones = dimensiones_histograma(tablas)
+    fin = min(fin, TOTAL_COMBINACIONES)
+    codigos = np.empty(max(fin - inicio, 0), dtype=np.int64)
+
+    tabla = None
+    if ruta_universo is not None and os.path.exists(ruta_universo):
+        try:
+            tabla = TablaUniverso(ruta_universo, tablas)
+        except ValueError as e:
+            print(f"⚠️  {e}, usando la enumeración por prefijos")
+
+    if tabla is not None:
+        for desde in range(inicio, fin, TAMANO_BLOQUE_UNIVERSO):
+            hasta = min(desde + TAMANO_BLOQUE_UNIVERSO, fin)
+            registros = tabla.registros[desde:hasta]
+            codigos[desde - inicio:hasta - inicio] = np.ravel_multi_index(
+                (registros['pares'], registros['tercias'], registros['cuartetos']), dimensiones)
+    else:
+        for bloque in EnumeradorPrefijos(tablas).recorrer(inicio, fin):
+            codigos[bloque.rank - inicio:bloque.rank - inicio + len(bloque)] = np.ravel_multi_index(
+                (bloque.pares, bloque.tercias, bloque.cuartetos), dimensiones)
+
+    conteos = np.bincount(codigos, minlength=int(np.prod(dimensiones)))
+    celdas = np.flatnonzero(conteos)
+    return celdas, conteos[celdas]
+
+
+def histograma_afinidades(tablas, ruta_universo=None, inicio=0, fin=TOTAL_COMBINACIONES):
+    """Histograma 3-D (int64) de (pares, tercias, cuartetos) de los ranks [inicio, fin)"""
+    dimensiones = dimensiones_histograma(tablas)
+    celdas, conteos = conteos_afinidades(tablas, ruta_universo, inicio, fin)
+    histograma = np.zeros(int(np.prod(dimensiones)), dtype=np.int64)
+    histograma[celdas] = conteos
+    return histograma.reshape(dimensiones)
+
+
+class BarridoUmbrales:
+    """Conteos Omega para cualquier terna de umbrales a partir del histograma 3-D"""
+
+    def __init__(self, histograma, digest=None):
+        self.histograma = histograma
+        self.digest = digest
+        self.total = int(histograma.sum())
+
+        # Suma acumulada desde el extremo superior de cada eje, con una capa de
+        # ceros al final para los umbrales por encima del máximo
+        acumulado = np.zeros(tuple(n + 1 for n in histograma.shape), dtype=np.int64)
+        acumulado[:-1, :-1, :-1] = histograma
+        for eje in range(3):
+            acumulado = np.flip(np.cumsum(np.flip(acumulado, eje), axis=eje), eje)
+        self.acumulado = acumulado.astype(np.uint32)
+
+    @classmethod
+    def desde_universo(cls, tablas, ruta_universo=None):
+        """Recorre el universo una vez y construye el barrido"""
+        return cls(histograma_afinidades(tablas, ruta_universo), tablas.digest())
+
+    @classmethod
+    def cargar(cls, ruta):
+        """Carga un histograma guardado con guardar()"""
+        with np.load(ruta) as datos:
+            digest = str(datos['digest']) or None
+            return cls(datos['histograma'], digest)
+
+    def guardar(self, ruta):
+        """Guarda el histograma comprimido (casi todas las celdas son cero)"""
+        with open(ruta, 'wb') as f:
+            np.savez_compressed(f, histograma=self.histograma, digest=np.array(self.digest or ''))
+
+    def _indices(self, umbrales):
+        """Recorta cada umbral al rango [0, máximo + 1] del acumulado"""
+        return tuple(np.clip(np.asarray(u, dtype=np.int64), 0, n - 1)
+                     for u, n in zip(umbrales, self.acumulado.shape))
+
+    def contar_omega(self, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                     umbral_cuartetos=UMBRAL_CUARTETOS):
+        """Combinaciones que cumplen los tres umbrales (escalares o arreglos), en O(1)"""
+        conteo = self.acumulado[self._indices((umbral_pares, umbral_tercias, umbral_cuartetos))]
+        return int(conteo) if np.ndim(conteo) == 0 else conteo.astype(np.int64)
+
+    def fraccion_omega(self, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                       umbral_cuartetos=UMBRAL_CUARTETOS):
+        """Fracción del universo que cumple los tres umbrales"""
+        return self.contar_omega(umbral_pares, umbral_tercias, umbral_cuartetos) / self.total
+
+    def rejilla(self, valores_pares, valores_tercias, valores_cuartetos):
+        """Conteos Omega para el producto cartesiano de los valores (arreglo 3-D)"""
+        malla = np.meshgrid(valores_pares, valores_tercias, valores_cuartetos, indexing='ij')
+        return self.contar_omega(*malla)
+
+
+def _lista_enteros(texto):
+    return [int(x) for x in texto.split(',') if x.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conteos Omega para una rejilla de umbrales en una pasada")
+    parser.add_argument('--universo', default=None, help="tabla precalculada del universo (opcional)")
+    parser.add_argument('--cargar', default=None, help="histograma .npz previamente guardado")
+    parser.add_argument('--guardar', default=None, help="archivo .npz donde guardar el histograma")
+    parser.add_argument('--pares', type=_lista_enteros, default=[UMBRAL_PARES])
+    parser.add_argument('--tercias', type=_lista_enteros, default=[UMBRAL_TERCIAS])
+    parser.add_argument('--cuartetos', type=_lista_enteros, default=[UMBRAL_CUARTETOS])
+    args = parser.parse_args()
+
+    tablas = TablasFrecuencia.desde_archivo()
+    inicio = time.perf_counter()
+    if args.cargar:
+        barrido = BarridoUmbrales.cargar(args.cargar)
+        if barrido.digest and barrido.digest != tablas.digest():
+            print("⚠️  El histograma se construyó con otras tablas de frecuencia")
+    else:
+        barrido = BarridoUmbrales.desde_universo(tablas, args.universo)
+    print(f"✅ Histograma {barrido.histograma.shape} de {barrido.total:,} combinaciones "
+          f"en {time.perf_counter() - inicio:.1f} segundos")
+
+    if args.guardar:
+        barrido.guardar(args.guardar)
+        print(f"💾 Histograma guardado en {args.guardar}")
+
+    conteos = barrido.rejilla(args.pares, args.tercias, args.cuartetos)
+    print(f"{'Pares':>7} {'Tercias':>8} {'Cuartetos':>10} {'Omega':>12} {'Fracción':>10}")
+    for i, up in enumerate(args.pares):
+        for j, ut in enumerate(args.tercias):
+            for k, uc in enumerate(args.cuartetos):
+                conteo = int(conteos[i, j, k])
+                print(f"{up:>7} {ut:>8} {uc:>10} {conteo:>12,} {conteo / barrido.total * 100:>9.4f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+SUITE DE BENCHMARKS DE LOS EVALUADORES OMEGA
+============================================
+
+Compara los backends de evaluación sobre las mismas rebanadas fijas del
+universo y escribe un JSON para seguir regresiones entre versiones:
+
+Backends:
+    dict_escalar    evaluador original de generador_omega_paralelo: claves
+                    tuple(sorted(...)) y dict.get en ciclos anidados
+    old_analyzer    evaluador original de Old/omega_analyzer: claves de texto
+                    "(a,b)" / str(tuple(sorted(...))) y dict.get
+    tablas_escalar  TablasFrecuencia, una combinación a la vez
+    bloque_numpy    TablasFrecuencia.afinidad_*_lote en cascada por etapas
+    prefijos        EnumeradorPrefijos (sólo rangos contiguos)
+    poda            BuscadorOmegaPoda (sólo rangos contiguos)
+
+Rebanadas: cabeza, mitad y cola del orden lexicográfico más una muestra
+aleatoria de ranks con semilla fija. Las combinaciones se materializan antes
+de medir (unrank por rango, sin recorrer el universo desde el inicio).
+
+Por backend y rebanada se reporta comb/seg, el tiempo de cada etapa
+(pares -> tercias -> cuartetos, cada una sólo sobre las sobrevivientes de
+la anterior), el conteo de Omega y el pico de memoria (RSS) del proceso.
+Cada backend corre en un proceso hijo propio para que su pico de RSS no se
+mezcle con el de los demás.
+
+Uso:
+    python benchmark_omega.py [--tamano N] [--tamano-escalar N] [--semilla S]
+                              [--backends a,b,...] [--frecuencias archivo.npy] [--salida archivo.json]
+
+Los dos backends de línea base reproducen el código de búsqueda original
+tal cual (ya no existe en los módulos, que ahora indexan TablasFrecuencia).
+Todos los backends usan el mismo archivo canónico de frecuencias (los
+diccionarios de las líneas base se arman a partir de él, con su formato de
+clave), así los conteos Omega deben coincidir entre backends en cada rebanada.
+
+Autor: Proyecto Omega Point
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, el pico de RSS queda en None
+    resource = None
+
+from combinatoria import TOTAL_COMBINACIONES, bloque_universo, unrank_combinaciones
+from tablas_frecuencia import (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS, ARCHIVO_FRECUENCIAS,
+                               TablasFrecuencia)
+
+BACKENDS = ('dict_escalar', 'old_analyzer', 'tablas_escalar', 'bloque_numpy', 'prefijos', 'poda')
+BACKENDS_ESCALARES = ('dict_escalar', 'old_analyzer', 'tablas_escalar')
+BACKENDS_CONTIGUOS = ('prefijos', 'poda')
+
+TAMANO_REBANADA = 100000
+TAMANO_ESCALAR = 20000
+SEMILLA = 20250109
+
+
+# ============================================================================
+# REBANADAS DEL UNIVERSO
+# ============================================================================
+
+def definir_rebanadas(tamano=TAMANO_REBANADA, semilla=SEMILLA):
+    """
+    Rebanadas fijas: [(nombre, inicio, fin)] para las contiguas y
+    ('aleatoria', semilla, tamano) para la muestra de ranks
+    """
+    mitad = (TOTAL_COMBINACIONES - tamano) // 2
+    return [
+        ('cabeza', 0, tamano),
+        ('mitad', mitad, mitad + tamano),
+        ('cola', TOTAL_COMBINACIONES - tamano, TOTAL_COMBINACIONES),
+        ('aleatoria', semilla, tamano),
+    ]
+
+
+def materializar_rebanada(rebanada, limite=None):
+    """Arreglo (N, 6) uint8 de la rebanada (opcionalmente sólo sus primeras `limite`)"""
+    nombre, a, b = rebanada
+    if nombre == 'aleatoria':
+        rng = np.random.default_rng(a)
+        ranks = np.sort(rng.choice(TOTAL_COMBINACIONES, size=b, replace=False))
+        if limite is not None:
+            ranks = ranks[:limite]
+        return unrank_combinaciones(ranks)
+
+    fin = b if limite is None else min(b, a + limite)
+    return bloque_universo(a, fin)
+
+
+# ============================================================================
+# CARGA DE FRECUENCIAS
+# ============================================================================
+
+def diccionarios_desde_tablas(tablas):
+    """Diccionarios {tupla: frecuencia} de las entradas no nulas de cada tabla"""
+    return tuple({tuple(indices): int(tabla[tuple(indices)]) for indices in np.argwhere(tabla).tolist()}
+                 for tabla in (tablas.pares, tablas.tercias, tablas.cuartetos))
+
+
+def diccionarios_texto_desde_tablas(tablas):
+    """Diccionarios {"(a,b,...)": frecuencia}, el formato de Old/omega_data.py"""
+    return tuple({str(clave).replace(" ", ""): frecuencia for clave, frecuencia in diccionario.items()}
+                 for diccionario in diccionarios_desde_tablas(tablas))
+
+
+# ============================================================================
+# BACKENDS
+# ============================================================================
+
+def _etapas_dict_escalar(freq_pares, freq_tercias, freq_cuartetos):
+    """Línea base: EvaluadorOmegaUltraRapido original (claves tupla ordenada)"""
+    def afinidad_pares(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                par = tuple(sorted([combinacion[i], combinacion[j]]))
+                afinidad += freq_pares.get(par, 0)
+        return afinidad
+
+    def afinidad_tercias(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                for k in range(j + 1, len(combinacion)):
+                    tercia = tuple(sorted([combinacion[i], combinacion[j], combinacion[k]]))
+                    afinidad += freq_tercias.get(tercia, 0)
+        return afinidad
+
+    def afinidad_cuartetos(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                for k in range(j + 1, len(combinacion)):
+                    for l in range(k + 1, len(combinacion)):
+                        cuarteto = tuple(sorted([combinacion[i], combinacion[j], combinacion[k], combinacion[l]]))
+                        afinidad += freq_cuartetos.get(cuarteto, 0)
+        return afinidad
+
+    return afinidad_pares, afinidad_tercias, afinidad_cuartetos
+
+
+def _etapas_old_analyzer(freq_pares, freq_tercias, freq_cuartetos):
+    """Línea base: calcular_afinidad_* originales de Old/omega_analyzer (claves texto)"""
+    def afinidad_pares(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                par = f"({min(combinacion[i], combinacion[j])},{max(combinacion[i], combinacion[j])})"
+                afinidad += freq_pares.get(par, 0)
+        return afinidad
+
+    def afinidad_tercias(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                for k in range(j + 1, len(combinacion)):
+                    tercia = tuple(sorted((combinacion[i], combinacion[j], combinacion[k])))
+                    key = str(tercia).replace(" ", "")
+                    afinidad += freq_tercias.get(key, 0)
+        return afinidad
+
+    def afinidad_cuartetos(combinacion):
+        afinidad = 0
+        for i in range(len(combinacion)):
+            for j in range(i + 1, len(combinacion)):
+                for k in range(j + 1, len(combinacion)):
+                    for l in range(k + 1, len(combinacion)):
+                        cuarteto = tuple(sorted((combinacion[i], combinacion[j], combinacion[k], combinacion[l])))
+                        key = str(cuarteto).replace(" ", "")
+                        afinidad += freq_cuartetos.get(key, 0)
+        return afinidad
+
+    return afinidad_pares, afinidad_tercias, afinidad_cuartetos
+
+
+def _etapas_escalares(nombre, archivo_frecuencias):
+    """Funciones (pares, tercias, cuartetos) por combinación de un backend escalar"""
+    tablas = TablasFrecuencia.desde_archivo(archivo_frecuencias)
+    if nombre == 'dict_escalar':
+        return _etapas_dict_escalar(*diccionarios_desde_tablas(tablas))
+    if nombre == 'old_analyzer':
+        return _etapas_old_analyzer(*diccionarios_texto_desde_tablas(tablas))
+
+    return tablas.afinidad_pares, tablas.afinidad_tercias, tablas.afinidad_cuartetos
+
+
+def medir_cascada_escalar(etapas, combinaciones_lista):
+    """
+    Evalúa la cascada con terminación temprana midiendo cada etapa por
+    separado: cada etapa recorre sólo las sobrevivientes de la anterior.
+    Retorna (tiempos_por_etapa, omega)
+    """
+    umbrales = (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
+    tiempos = {}
+    sobrevivientes = combinaciones_lista
+    for nombre, afinidad, umbral in zip(('pares', 'tercias', 'cuartetos'), etapas, umbrales):
+        inicio = time.perf_counter()
+        sobrevivientes = [c for c in sobrevivientes if afinidad(c) >= umbral]
+        tiempos[nombre] = time.perf_counter() - inicio
+    return tiempos, len(sobrevivientes)
+
+
+def medir_cascada_bloque(tablas, bloque):
+    """Cascada vectorizada por etapas sobre un arreglo (N, 6); retorna (tiempos, omega)"""
+    tiempos = {}
+    inicio = time.perf_counter()
+    indices = np.flatnonzero(tablas.afinidad_pares_lote(bloque) >= UMBRAL_PARES)
+    tiempos['pares'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    indices = indices[tablas.afinidad_tercias_lote(bloque[indices]) >= UMBRAL_TERCIAS]
+    tiempos['tercias'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    indices = indices[tablas.afinidad_cuartetos_lote(bloque[indices]) >= UMBRAL_CUARTETOS]
+    tiempos['cuartetos'] = time.perf_counter() - inicio
+    return tiempos, len(indices)
+
+
+def medir_enumerador(enumerador, inicio, fin):
+    """Recorre [inicio, fin) con un enumerador por prefijos; retorna (tiempos, omega)"""
+    from enumeracion_prefijos import buscar_omega_prefijos
+
+    t0 = time.perf_counter()
+    omega = sum(len(indices) for _, indices in buscar_omega_prefijos(
+        enumerador, inicio, fin, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS))
+    # Las tres etapas se calculan juntas por bloque de hojas: sólo hay tiempo total
+    return {'total': time.perf_counter() - t0}, omega
+
+
+def _pico_rss_mb():
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB; macOS reporta bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def ejecutar_backend(nombre, rebanadas, tamano_escalar, archivo_frecuencias=ARCHIVO_FRECUENCIAS):
+    """
+    Corre un backend sobre todas las rebanadas (pensado para un proceso hijo).
+    Retorna la lista de resultados, uno por rebanada medida.
+    """
+    inicio_carga = time.perf_counter()
+    tablas = enumerador = etapas = None
+    if nombre in BACKENDS_ESCALARES:
+        etapas = _etapas_escalares(nombre, archivo_frecuencias)
+    else:
+        tablas = TablasFrecuencia.desde_archivo(archivo_frecuencias)
+        if nombre == 'prefijos':
+            from enumeracion_prefijos import EnumeradorPrefijos
+            enumerador = EnumeradorPrefijos(tablas)
+        elif nombre == 'poda':
+            from busqueda_omega_poda import BuscadorOmegaPoda
+            enumerador = BuscadorOmegaPoda(tablas)
+    segundos_carga = time.perf_counter() - inicio_carga
+
+    # Calentamiento sin medir (cachés, primeras llamadas a NumPy)
+    if nombre not in BACKENDS_CONTIGUOS:
+        calentamiento = materializar_rebanada(rebanadas[0], 1000)
+        if etapas is not None:
+            medir_cascada_escalar(etapas, [tuple(c) for c in calentamiento.tolist()])
+        else:
+            medir_cascada_bloque(tablas, calentamiento)
+
+    resultados = []
+    for rebanada in rebanadas:
+        etiqueta, a, b = rebanada
+        if nombre in BACKENDS_CONTIGUOS:
+            if etiqueta == 'aleatoria':
+                continue  # El enumerador sólo recorre rangos contiguos de ranks
+            tiempos, omega = medir_enumerador(enumerador, a, b)
+            combinaciones_medidas = b - a
+        else:
+            limite = tamano_escalar if nombre in BACKENDS_ESCALARES else None
+            bloque = materializar_rebanada(rebanada, limite)
+            combinaciones_medidas = len(bloque)
+            if etapas is not None:
+                tiempos, omega = medir_cascada_escalar(etapas, [tuple(c) for c in bloque.tolist()])
+            else:
+                tiempos, omega = medir_cascada_bloque(tablas, bloque)
+
+        segundos = sum(tiempos.values())
+        resultados.append({
+            'backend': nombre,
+            'rebanada': etiqueta,
+            'combinaciones': combinaciones_medidas,
+            'segundos': segundos,
+            'comb_por_seg': combinaciones_medidas / segundos if segundos > 0 else None,
+            'etapas': tiempos,
+            'omega': omega,
+            'segundos_carga': segundos_carga,
+        })
+
+    pico = _pico_rss_mb()
+    for resultado in resultados:
+        resultado['rss_pico_mb'] = pico
+    return resultados
+
+
+# ============================================================================
+# SUITE
+# ============================================================================
+
+def ejecutar_suite(backends=BACKENDS, tamano=TAMANO_REBANADA, tamano_escalar=TAMANO_ESCALAR,
+                   semilla=SEMILLA, archivo_frecuencias=ARCHIVO_FRECUENCIAS, archivo_json=None):
+    """
+    Corre cada backend en su propio proceso hijo sobre las rebanadas fijas y
+    retorna el reporte (dict). Si se indica archivo_json también lo escribe.
+    """
+    rebanadas = definir_rebanadas(tamano, semilla)
+    contexto = mp.get_context('spawn')
+    resultados = []
+
+    for nombre in backends:
+        if nombre not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {nombre} (opciones: {', '.join(BACKENDS)})")
+        print(f"⏱️  Midiendo {nombre}...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+            resultados.extend(pool.submit(ejecutar_backend, nombre, rebanadas, tamano_escalar,
+                                          archivo_frecuencias).result())
+
+    reporte = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'plataforma': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'cpus': os.cpu_count(),
+        'frecuencias': archivo_frecuencias,
+        'digest_frecuencias': TablasFrecuencia.desde_archivo(archivo_frecuencias).digest(),
+        'umbrales': [UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS],
+        'rebanadas': [{'nombre': r[0], 'inicio': r[1], 'fin': r[2]} if r[0] != 'aleatoria'
+                      else {'nombre': r[0], 'semilla': r[1], 'tamano': r[2]} for r in rebanadas],
+        'tamano_escalar': tamano_escalar,
+        'resultados': resultados,
+        'discrepancias': verificar_conteos(resultados),
+    }
+
+    if archivo_json:
+        with open(archivo_json, 'w') as f:
+            json.dump(reporte, f, indent=2)
+    return reporte
+
+
+def verificar_conteos(resultados):
+    """
+    Rebanadas en las que dos backends midieron las mismas combinaciones y
+    encontraron un número distinto de Omega
+    """
+    conteos = {}
+    for r in resultados:
+        conteos.setdefault((r['rebanada'], r['combinaciones']), {})[r['backend']] = r['omega']
+    return [{'rebanada': rebanada, 'combinaciones': n, 'omega': por_backend}
+            for (rebanada, n), por_backend in conteos.items() if len(set(por_backend.values())) > 1]
+
+
+def mostrar_reporte(reporte):
+    """Tabla resumen del reporte en consola"""
+    print()
+    print(f"{'backend':<15} {'rebanada':<10} {'comb':>8} {'comb/seg':>12} "
+          f"{'pares':>8} {'tercias':>8} {'cuartetos':>9} {'omega':>7} {'RSS MB':>8}")
+    print("-" * 93)
+    for r in reporte['resultados']:
+        etapas = r['etapas']
+        columnas = [f"{etapas[e]:8.3f}" if e in etapas else f"{'-':>8}" for e in ('pares', 'tercias')]
+        columnas.append(f"{etapas['cuartetos']:9.3f}" if 'cuartetos' in etapas else f"{'-':>9}")
+        rss = f"{r['rss_pico_mb']:8.1f}" if r['rss_pico_mb'] is not None else f"{'-':>8}"
+        print(f"{r['backend']:<15} {r['rebanada']:<10} {r['combinaciones']:>8,} "
+              f"{r['comb_por_seg'] or 0:>12,.0f} {' '.join(columnas)} {r['omega']:>7,} {rss}")
+
+    if reporte['discrepancias']:
+        print("\n⚠️  Conteos Omega distintos entre backends:")
+        for d in reporte['discrepancias']:
+            print(f"   {d['rebanada']} ({d['combinaciones']:,}): {d['omega']}")
+    else:
+        print("\n✅ Todos los backends coinciden en los conteos Omega")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de los evaluadores Omega")
+    parser.add_argument('--tamano', type=int, default=TAMANO_REBANADA,
+                        help="combinaciones por rebanada (backends vectorizados)")
+    parser.add_argument('--tamano-escalar', type=int, default=TAMANO_ESCALAR,
+                        help="combinaciones por rebanada para los backends escalares")
+    parser.add_argument('--semilla', type=int, default=SEMILLA, help="semilla de la muestra aleatoria")
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help="lista separada por comas (%(default)s)")
+    parser.add_argument('--frecuencias', default=ARCHIVO_FRECUENCIAS,
+                        help="archivo canónico de frecuencias .npy (%(default)s)")
+    parser.add_argument('--salida', default=None, help="archivo JSON del reporte")
+    args = parser.parse_args()
+
+    archivo_json = args.salida or f"benchmark_omega_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    reporte = ejecutar_suite([b.strip() for b in args.backends.split(',') if b.strip()],
+                             args.tamano, args.tamano_escalar, args.semilla, args.frecuencias, archivo_json)
+    mostrar_reporte(reporte)
+    print(f"💾 Reporte JSON: {archivo_json}")
+
+
+if __name__ == "__main__":
+    main()
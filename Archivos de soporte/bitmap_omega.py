@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+BITMAP DE PERTENENCIA OMEGA CON RANK/SELECT
+===========================================
+
+Un bit por rank del universo (3,262,623 bits, ~400 KB) indica si la
+combinación es Clase Omega. Archivo en disco:
+
+    encabezado (64 bytes):
+        magic 'OMEGABIT' | versión | total de bits |
+        umbrales (pares, tercias, cuartetos) | digest SHA-256 de las tablas
+    bits empaquetados (np.packbits, orden de bits 'little': el rank r es el
+    bit r % 8 del byte r // 8)
+
+Al abrirlo se calcula un directorio de conteos acumulados por superbloque de
+512 bits (64 bytes), con lo que:
+- es_omega / contiene_rank: probar un bit, O(1)
+- rank(r): Omega con rank menor que r, O(1) (directorio + a lo más 64 bytes)
+- select(k): rank de la k-ésima Omega, O(log n) (búsqueda binaria en el
+  directorio + un superbloque)
+- pagina(desde, cantidad): Omega consecutivas en orden lexicográfico
+
+Se construye desde la tabla del universo o desde el almacén de resultados de
+una búsqueda completa, y se mantiene al día al agregar sorteos con las Omega
+que entran y salen (actualizar_bitmap).
+
+Uso:
+    python bitmap_omega.py universo <universo.bin> [bitmap.bin]
+    python bitmap_omega.py almacen <resultados_omega.bin> [bitmap.bin]
+    python bitmap_omega.py consultar <bitmap.bin> [k]
+
+Autor: Proyecto Omega Point
+"""
+
+import os
+import struct
+import sys
+
+import numpy as np
+
+from almacen_omega import leer_almacen
+from combinatoria import TOTAL_COMBINACIONES, rank_combinacion, unrank_combinacion, unrank_combinaciones
+
+MAGIC = b'OMEGABIT'
+VERSION = 1
+FORMATO_ENCABEZADO = '<8sII3H32s'
+TAMANO_ENCABEZADO = 64
+TAMANO_BITS = (TOTAL_COMBINACIONES + 7) // 8
+
+BYTES_SUPERBLOQUE = 64
+BITS_SUPERBLOQUE = BYTES_SUPERBLOQUE * 8
+# Bits encendidos de cada valor de byte
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1).astype(np.int64)
+
+
+def _escribir_encabezado(archivo, umbrales, digest):
+    encabezado = struct.pack(FORMATO_ENCABEZADO, MAGIC, VERSION, TOTAL_COMBINACIONES,
+                             *umbrales, bytes.fromhex(digest))
+    archivo.write(encabezado.ljust(TAMANO_ENCABEZADO, b'\0'))
+
+
+def leer_encabezado(ruta):
+    """Retorna (umbrales, digest) del encabezado; ValueError si el archivo no es válido"""
+    with open(ruta, 'rb') as f:
+        datos = f.read(TAMANO_ENCABEZADO)
+    if len(datos) < TAMANO_ENCABEZADO or os.path.getsize(ruta) != TAMANO_ENCABEZADO + TAMANO_BITS:
+        raise ValueError(f"Bitmap Omega truncado: {ruta}")
+
+    magic, version, total, up, ut, uc, digest = struct.unpack_from(FORMATO_ENCABEZADO, datos)
+    if magic != MAGIC or version != VERSION or total != TOTAL_COMBINACIONES:
+        raise ValueError(f"Bitmap Omega inválido o de otra versión: {ruta}")
+    return (up, ut, uc), digest.hex()
+
+
+def construir_bitmap(ruta, mascara, umbrales, digest):
+    """Escribe el bitmap de una máscara booleana por rank (temporal + reemplazo atómico)"""
+    mascara = np.asarray(mascara, dtype=bool)
+    if mascara.shape != (TOTAL_COMBINACIONES,):
+        raise ValueError(f"La máscara debe tener {TOTAL_COMBINACIONES:,} elementos")
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'wb') as f:
+        _escribir_encabezado(f, umbrales, digest)
+        f.write(np.packbits(mascara, bitorder='little').tobytes())
+    os.replace(temporal, ruta)
+
+
+def bitmap_desde_universo(tabla, ruta):
+    """Bitmap a partir de la bandera Omega de una TablaUniverso"""
+    construir_bitmap(ruta, tabla.mascara_omega(), tabla.umbrales, tabla.digest)
+
+
+def bitmap_desde_almacen(ruta_almacen, ruta):
+    """Bitmap a partir del almacén de resultados de una búsqueda completa"""
+    umbrales, digest, registros = leer_almacen(ruta_almacen)
+    mascara = np.zeros(TOTAL_COMBINACIONES, dtype=bool)
+    mascara[np.asarray(registros['rank'], dtype=np.int64)] = True
+    construir_bitmap(ruta, mascara, umbrales, digest)
+
+
+def actualizar_bitmap(ruta, entran, salen, digest):
+    """
+    Enciende los bits de las Omega que entran, apaga los de las que salen y
+    registra el digest de las nuevas tablas (resumen de aplicar_sorteo_nuevo)
+    """
+    umbrales, _ = leer_encabezado(ruta)
+    bits = np.memmap(ruta, dtype=np.uint8, mode='r+', offset=TAMANO_ENCABEZADO, shape=(TAMANO_BITS,))
+    for ranks, encender in ((np.asarray(salen, dtype=np.int64), False),
+                            (np.asarray(entran, dtype=np.int64), True)):
+        mascaras = np.left_shift(1, ranks & 7).astype(np.uint8)
+        if encender:
+            np.bitwise_or.at(bits, ranks >> 3, mascaras)
+        else:
+            np.bitwise_and.at(bits, ranks >> 3, ~mascaras)
+    bits.flush()
+    del bits
+    with open(ruta, 'r+b') as f:
+        _escribir_encabezado(f, umbrales, digest)
+
+
+class BitmapOmega:
+    """Pertenencia Omega por rank con rank/select sobre un bitmap memory-mapped"""
+
+    def __init__(self, ruta, tablas=None):
+        """
+        Abre el archivo en modo sólo lectura. Si se pasan las tablas de frecuencia
+        vigentes, verifica que el bitmap corresponda a ellas.
+        """
+        self.ruta = ruta
+        self.umbrales, self.digest = leer_encabezado(ruta)
+        if tablas is not None and tablas.digest() != self.digest:
+            raise ValueError(f"Bitmap Omega desactualizado (otras frecuencias): {ruta}")
+
+        self.bits = np.memmap(ruta, dtype=np.uint8, mode='r', offset=TAMANO_ENCABEZADO, shape=(TAMANO_BITS,))
+
+        # directorio[s] = Omega en los superbloques anteriores a s
+        conteos = POPCOUNT[self.bits]
+        relleno = -len(conteos) % BYTES_SUPERBLOQUE
+        por_superbloque = np.pad(conteos, (0, relleno)).reshape(-1, BYTES_SUPERBLOQUE).sum(axis=1)
+        self.directorio = np.concatenate(([0], np.cumsum(por_superbloque)))
+        self.total = int(self.directorio[-1])
+
+    def __len__(self):
+        return self.total
+
+    def contiene_rank(self, r):
+        """True si la combinación de rank r es Omega"""
+        return bool((self.bits[r >> 3] >> (r & 7)) & 1)
+
+    def es_omega(self, combinacion):
+        """True si la combinación es Clase Omega, O(1)"""
+        return self.contiene_rank(rank_combinacion(sorted(combinacion)))
+
+    def rank(self, r):
+        """Número de combinaciones Omega con rank menor que r"""
+        r = min(max(r, 0), TOTAL_COMBINACIONES)
+        byte = r >> 3
+        superbloque = byte // BYTES_SUPERBLOQUE
+        conteo = int(self.directorio[superbloque])
+        conteo += int(POPCOUNT[self.bits[superbloque * BYTES_SUPERBLOQUE:byte]].sum())
+        if r & 7:
+            conteo += int(POPCOUNT[self.bits[byte] & ((1 << (r & 7)) - 1)])
+        return conteo
+
+    def select(self, k):
+        """Rank de la k-ésima combinación Omega (k = 0 es la primera en orden lexicográfico)"""
+        if not 0 <= k < self.total:
+            raise IndexError(f"Índice Omega fuera de rango: {k} (total {self.total:,})")
+        superbloque = int(np.searchsorted(self.directorio, k, side='right')) - 1
+        inicio = superbloque * BYTES_SUPERBLOQUE
+        posiciones = np.flatnonzero(np.unpackbits(self.bits[inicio:inicio + BYTES_SUPERBLOQUE],
+                                                  bitorder='little'))
+        return superbloque * BITS_SUPERBLOQUE + int(posiciones[k - self.directorio[superbloque]])
+
+    def combinacion(self, k):
+        """La k-ésima combinación Omega"""
+        return unrank_combinacion(self.select(k))
+
+    def pagina(self, desde, cantidad):
+        """Ranks de las Omega desde..desde + cantidad - 1 (orden lexicográfico)"""
+        cantidad = min(cantidad, self.total - desde)
+        if cantidad <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        primero = self.select(desde)
+        byte = primero >> 3
+        ranks = []
+        encontradas = 0
+        while encontradas < cantidad:
+            # Ventana proporcional a lo que falta según la densidad media de Omega
+            faltan = cantidad - encontradas
+            ventana = faltan * TOTAL_COMBINACIONES // (8 * self.total) + BYTES_SUPERBLOQUE
+            posiciones = np.flatnonzero(np.unpackbits(self.bits[byte:byte + ventana], bitorder='little'))
+            posiciones = posiciones + byte * 8
+            posiciones = posiciones[posiciones >= primero]
+            ranks.append(posiciones[:faltan])
+            encontradas += len(ranks[-1])
+            byte += ventana
+        return np.concatenate(ranks).astype(np.int64)
+
+    def combinaciones_pagina(self, desde, cantidad):
+        """Arreglo (N, 6) uint8 de las Omega desde..desde + cantidad - 1"""
+        return unrank_combinaciones(self.pagina(desde, cantidad))
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    if len(argumentos) < 2 or argumentos[0] not in ('universo', 'almacen', 'consultar'):
+        print("Uso: python bitmap_omega.py universo <universo.bin> [bitmap.bin]")
+        print("     python bitmap_omega.py almacen <resultados_omega.bin> [bitmap.bin]")
+        print("     python bitmap_omega.py consultar <bitmap.bin> [k]")
+        sys.exit(1)
+
+    comando, origen = argumentos[0], argumentos[1]
+    if comando == 'consultar':
+        bitmap = BitmapOmega(origen)
+        print(f"✅ {origen}: {len(bitmap):,} combinaciones Omega (umbrales {bitmap.umbrales})")
+        if len(argumentos) > 2:
+            k = int(argumentos[2])
+            print(f"   🎯 Omega #{k:,}: {bitmap.combinacion(k)} (rank {bitmap.select(k):,})")
+        sys.exit(0)
+
+    destino = argumentos[2] if len(argumentos) > 2 else 'omega_bitmap.bin'
+    if comando == 'universo':
+        from tabla_universo import TablaUniverso
+        bitmap_desde_universo(TablaUniverso(origen), destino)
+    else:
+        bitmap_desde_almacen(origen, destino)
+    print(f"💾 Bitmap Omega guardado en {destino} ({len(BitmapOmega(destino)):,} Omega)")
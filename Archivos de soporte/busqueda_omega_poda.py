@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+BÚSQUEDA OMEGA EXACTA CON PODA (BRANCH-AND-BOUND)
+=================================================
+
+Extiende la enumeración por prefijos con una cota superior de la afinidad de
+pares, tercias y cuartetos que puede alcanzar cualquier combinación que
+complete un prefijo. Si alguna cota queda por debajo de su umbral, el
+subárbol completo se descarta sin evaluar sus hojas.
+
+Al completar un prefijo de tres números se acotan de una sola vez
+(vectorizado) todos sus hijos d; para cada hijo faltan dos números e < f:
+    afinidad <= suma(prefijo) + A1[d] + max2_f(A1[f] + A2[d, f]) + max_{d<e<f} A2'[e, f]
+donde max2 es la suma de los dos mayores valores (aporte individual de e y f)
+y el último término acota el aporte conjunto de e y f con los máximos de la
+cola. La cota es válida, así que el resultado es exactamente el mismo
+conjunto que la búsqueda completa.
+
+Al completar prefijos de uno y dos números se acotan igualmente los hijos de
+los niveles 2 y 3: con m números por agregar, aporte individual (los m
+mayores de cada fila), aporte conjunto de parejas (las C(m, 2) mayores) y las
+sub-combinaciones formadas sólo por números posteriores, precalculadas por
+número inicial (mayores C(m, 2) pares y C(m, 3) tercias). Los cuartetos sólo
+se acotan en el último nivel.
+
+Con las tablas y umbrales actuales (459 está por debajo de la afinidad media
+de pares) la poda descarta sólo el 11% de las hojas, casi todo en el último
+nivel, y la búsqueda NO es más rápida que la enumeración sin poda: el cálculo
+de cotas del último nivel cuesta lo mismo que las hojas que ahorra, y en
+tramos con poca poda (p. ej. el inicio del universo) puede ser hasta ~30% más
+lenta. Las cotas de los niveles 2 y 3 sí se pagan solas (sin ellas la
+búsqueda es más lenta con cualquier umbral). Con umbrales más exigentes la
+proporción crece (41% con 500/80/10, 94% con 550/90/12) y la poda sí gana
+(~1.4 s frente a ~2.3 s de la enumeración con 500/80/10 en el mismo
+tramo); ratio_poda en las estadísticas reporta la medida de cada búsqueda.
+
+Autor: Proyecto Omega Point
+"""
+
+import time
+
+import numpy as np
+
+from combinatoria import MAX_NUM, NUMS_POR_COMBINACION, TOTAL_COMBINACIONES
+from enumeracion_prefijos import EnumeradorPrefijos, NIVELES_PREFIJO
+from tablas_frecuencia import DIMENSION, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS
+
+
+def _max_sufijo(filas):
+    """Para cada d, máximo de filas[e] con e > d (0 si no hay)"""
+    sufijo = np.zeros(len(filas), dtype=np.int64)
+    sufijo[:-1] = np.maximum.accumulate(filas[::-1])[::-1][1:]
+    return sufijo
+
+
+def _mejores_por_fila(matriz, n):
+    """Suma de los n mayores valores de cada fila"""
+    return np.partition(matriz, -n, axis=1)[:, -n:].sum(axis=1)
+
+
+def _mejores_dos_por_fila(matriz):
+    """Suma de los dos mayores valores de cada fila (ordenar filas cortas cuesta menos que partition)"""
+    ordenada = np.sort(matriz, axis=1)
+    return ordenada[:, -1].astype(np.int64) + ordenada[:, -2]
+
+
+def _mejores_posteriores(tabla, mascara, n):
+    """
+    Para cada número x, suma de los n mayores valores de la tabla (2-D o 3-D)
+    entre las sub-combinaciones ascendentes formadas sólo por números > x
+    """
+    resultado = np.zeros(DIMENSION, dtype=np.int64)
+    for x in range(DIMENSION):
+        posteriores = (slice(x + 1, None),) * tabla.ndim
+        valores = tabla[posteriores][mascara[posteriores]]
+        if len(valores) >= n:
+            resultado[x] = np.partition(valores.astype(np.int64), -n)[-n:].sum()
+    return resultado
+
+
+class BuscadorOmegaPoda(EnumeradorPrefijos):
+    """Enumeración por prefijos que descarta subárboles sin completaciones Omega"""
+
+    def __init__(self, tablas, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                 umbral_cuartetos=UMBRAL_CUARTETOS):
+        super().__init__(tablas)
+        self.umbral_pares = umbral_pares
+        self.umbral_tercias = umbral_tercias
+        self.umbral_cuartetos = umbral_cuartetos
+
+        # Máximos estáticos para los hijos d: P[e, f] y T[d, e, f] con d < e < f
+        self.max_sufijo_pares = _max_sufijo(self.P.max(axis=1).astype(np.int64))
+        self.max_tercias_desde = self.T.max(axis=(1, 2)).astype(np.int64)
+        # Sólo cuentan los candidatos f > d
+        self.posterior = np.triu(np.ones((DIMENSION, DIMENSION), dtype=bool), 1)
+
+        # Niveles 2 y 3: [x, r, s] válido si x < r < s, y las sub-combinaciones de
+        # números posteriores a x (m = números por agregar después de x)
+        ejes = np.ogrid[0:DIMENSION, 0:DIMENSION, 0:DIMENSION]
+        ascendente_3 = (ejes[0] < ejes[1]) & (ejes[1] < ejes[2])
+        # Penalización (int32) que excluye de los máximos las posiciones no válidas
+        vacio = np.int32(-(1 << 24))
+        self.penalizacion = np.where(self.posterior, 0, vacio).astype(np.int32)
+        self.penalizacion_parejas = np.where(ascendente_3, 0, vacio).astype(np.int32).reshape(DIMENSION, -1)
+        self.T_parejas = self.T.reshape(DIMENSION, -1)
+        self.max_pares_resto = {}
+        self.max_tercias_resto = {}
+        for k in range(2, NIVELES_PREFIJO):
+            m = NUMS_POR_COMBINACION - k
+            self.max_pares_resto[m] = _mejores_posteriores(self.P, self.posterior, m * (m - 1) // 2)
+            self.max_tercias_resto[m] = _mejores_posteriores(self.T, ascendente_3, m * (m - 1) * (m - 2) // 6)
+
+        self.hijos_podados = np.zeros((NIVELES_PREFIJO + 1, DIMENSION), dtype=bool)
+        self.nodos_podados = 0
+        self.nodos_podados_nivel = [0] * (NIVELES_PREFIJO + 1)
+
+    def _mejores_dos_hijos(self, a1, a2, filas, columnas):
+        """Para cada hijo d: suma de los dos mayores a1[f] + a2[d, f] con f > d"""
+        return _mejores_dos_por_fila(a1[columnas] + a2[filas, columnas] + self.penalizacion[filas, columnas])
+
+    def cotas_componentes(self, hijos):
+        """
+        Cotas superiores (pares, tercias, cuartetos) de los hijos d (arreglo
+        contiguo y ascendente) del prefijo actual de tres números, como
+        arreglos alineados con hijos
+        """
+        k = NIVELES_PREFIJO - 1
+        pares, tercias, cuartetos = self.sumas[k]
+        a1p, a1t, a1q = self.a1p[k], self.a1t[k], self.a1q[k]
+        a2t, a2q = self.a2t[k], self.a2q[k]
+        # Todos los números e, f > d de los hijos están desde el primer hijo: se
+        # trabaja sobre vistas (sin copias) de esas filas y columnas
+        filas = slice(hijos[0], hijos[-1] + 1)
+        resto = slice(hijos[0], DIMENSION)
+        n = len(hijos)
+
+        cota_pares = (pares + a1p[filas] + self._mejores_dos_hijos(a1p, self.P, filas, resto)
+                      + self.max_sufijo_pares[filas])
+        cota_tercias = (tercias + a1t[filas] + self._mejores_dos_hijos(a1t, a2t, filas, resto)
+                        + _max_sufijo(a2t[resto, resto].max(axis=1).astype(np.int64))[:n]
+                        + self.max_tercias_desde[filas])
+        cota_cuartetos = (cuartetos + a1q[filas] + self._mejores_dos_hijos(a1q, a2q, filas, resto)
+                          + _max_sufijo(a2q[resto, resto].max(axis=1).astype(np.int64))[:n]
+                          + self.a3q[k][filas, resto, resto].max(axis=(1, 2)))
+        return cota_pares, cota_tercias, cota_cuartetos
+
+    def cotas_nivel(self, k, hijos):
+        """
+        Cotas superiores (pares, tercias) de los hijos x (arreglo) del nivel k
+        (2 o 3) con el prefijo actual de k - 1 números
+        """
+        previo = k - 1
+        m = NUMS_POR_COMBINACION - k
+        pares, tercias, _ = self.sumas[previo]
+        a1p, a1t, a2t = self.a1p[previo], self.a1t[previo], self.a2t[previo]
+
+        # [x, r]: aporte individual del número r > x agregado después de x
+        individual_pares = a1p + self.P[hijos] + self.penalizacion[hijos]
+        individual_tercias = a1t + a2t[hijos] + self.penalizacion[hijos]
+        # [x, (r, s)]: aporte conjunto de la pareja x < r < s con el prefijo y con x
+        conjunto_tercias = a2t.ravel() + self.T_parejas[hijos] + self.penalizacion_parejas[hijos]
+
+        cota_pares = (pares + a1p[hijos] + _mejores_por_fila(individual_pares, m)
+                      + self.max_pares_resto[m][hijos])
+        cota_tercias = (tercias + a1t[hijos] + _mejores_por_fila(individual_tercias, m)
+                        + _mejores_por_fila(conjunto_tercias, m * (m - 1) // 2)
+                        + self.max_tercias_resto[m][hijos])
+        return cota_pares, cota_tercias
+
+    def cotas_hijos(self, hijos):
+        """
+        Cotas de todos los hijos d del prefijo actual de tres números a la vez.
+        Retorna un arreglo booleano alineado con hijos: True si el hijo se poda.
+        """
+        cota_pares, cota_tercias, cota_cuartetos = self.cotas_componentes(hijos)
+        return ((cota_pares < self.umbral_pares) | (cota_tercias < self.umbral_tercias)
+                | (cota_cuartetos < self.umbral_cuartetos))
+
+    def agregar_numero(self, k, x):
+        """Al completar un prefijo de uno, dos o tres números acota todos sus hijos"""
+        super().agregar_numero(k, x)
+        if 1 <= k < NIVELES_PREFIJO:
+            hijos = np.arange(x + 1, MAX_NUM - (NUMS_POR_COMBINACION - k - 1) + 1)
+            if k == NIVELES_PREFIJO - 1:
+                self.hijos_podados[NIVELES_PREFIJO, hijos] = self.cotas_hijos(hijos)
+            else:
+                cota_pares, cota_tercias = self.cotas_nivel(k + 1, hijos)
+                self.hijos_podados[k + 1, hijos] = ((cota_pares < self.umbral_pares)
+                                                    | (cota_tercias < self.umbral_tercias))
+
+    def podar(self, k, x):
+        """Poda el hijo x si alguna de sus cotas superiores no alcanza su umbral"""
+        if k > 1 and self.hijos_podados[k, x]:
+            self.nodos_podados += 1
+            self.nodos_podados_nivel[k] += 1
+            return True
+        return False
+
+
+def buscar_omega_con_poda(tablas, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                          umbral_cuartetos=UMBRAL_CUARTETOS, inicio=0, fin=TOTAL_COMBINACIONES):
+    """
+    Encuentra todas las combinaciones Omega del rango [inicio, fin) con poda.
+    Retorna (omega_encontradas, estadisticas) con el mismo formato de resultados
+    que CoordinadorOmegaUltraOptimizado.
+    """
+    buscador = BuscadorOmegaPoda(tablas, umbral_pares, umbral_tercias, umbral_cuartetos)
+    omega_encontradas = []
+    hojas_visitadas = 0
+    inicio_tiempo = time.time()
+
+    for bloque in buscador.recorrer(inicio, fin):
+        hojas_visitadas += len(bloque)
+        mascara = ((bloque.pares >= umbral_pares)
+                   & (bloque.tercias >= umbral_tercias)
+                   & (bloque.cuartetos >= umbral_cuartetos))
+        for i in np.flatnonzero(mascara):
+            afinidades = (int(bloque.pares[i]), int(bloque.tercias[i]), int(bloque.cuartetos[i]))
+            omega_encontradas.append({
+                'combinacion': bloque.prefijo + (int(bloque.quintos[i]), int(bloque.sextos[i])),
+                'afinidad_pares': afinidades[0],
+                'afinidad_tercias': afinidades[1],
+                'afinidad_cuartetos': afinidades[2],
+                'afinidad_total': sum(afinidades)
+            })
+
+    total = min(fin, TOTAL_COMBINACIONES) - inicio
+    estadisticas = {
+        'combinaciones_rango': total,
+        'hojas_visitadas': hojas_visitadas,
+        'hojas_podadas': buscador.hojas_podadas,
+        'nodos_podados': buscador.nodos_podados,
+        'nodos_podados_nivel': buscador.nodos_podados_nivel[2:],
+        'prefijos_visitados': buscador.prefijos_visitados,
+        'ratio_poda': buscador.hojas_podadas / total if total > 0 else 0,
+        'omega_encontradas': len(omega_encontradas),
+        'tiempo': time.time() - inicio_tiempo
+    }
+    return omega_encontradas, estadisticas
+
+
+def mostrar_estadisticas_poda(estadisticas):
+    """Muestra las estadísticas de una búsqueda con poda"""
+    print("✂️  ESTADÍSTICAS DE PODA (BRANCH-AND-BOUND)")
+    print(f"   📊 Combinaciones en el rango: {estadisticas['combinaciones_rango']:,}")
+    print(f"   🍃 Hojas visitadas: {estadisticas['hojas_visitadas']:,}")
+    print(f"   ✂️  Hojas podadas: {estadisticas['hojas_podadas']:,} "
+          f"({estadisticas['ratio_poda'] * 100:.2f}%)")
+    print(f"   🌳 Subárboles podados: {estadisticas['nodos_podados']:,} "
+          f"(niveles 2/3/4: {' / '.join(f'{n:,}' for n in estadisticas['nodos_podados_nivel'])})")
+    print(f"   🎯 Omega encontradas: {estadisticas['omega_encontradas']:,}")
+    print(f"   ⏱️  Tiempo: {estadisticas['tiempo']:.1f} segundos")
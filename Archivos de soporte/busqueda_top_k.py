@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+TOP-K DE MAYOR AFINIDAD SIN RECORRER EL UNIVERSO
+================================================
+
+Encuentra las K combinaciones con mayor afinidad (total o un componente)
+sin evaluar todas las hojas, en dos fases:
+
+1. Se recorren los prefijos de tres números (9,139) y, con las mismas cotas
+   vectorizadas de BuscadorOmegaPoda, se obtiene una cota superior del
+   criterio para cada uno de los 66,045 prefijos de cuatro números que aún
+   admiten dos números posteriores. Con solo_omega también se descartan los
+   que no pueden alcanzar los umbrales.
+2. Los prefijos se visitan de mayor a menor cota (best-first) evaluando su
+   bloque de hojas y manteniendo un montículo mínimo acotado a K elementos.
+   En cuanto la cota del siguiente prefijo queda por debajo del K-ésimo
+   puntaje, ningún subárbol restante puede mejorar el resultado y se termina.
+
+Los empates se resuelven por rank ascendente, igual que la hoja
+Top_100_Mayor_Afinidad del almacén, así que el resultado es exactamente el
+mismo que ordenar el universo completo.
+
+Uso:
+    python busqueda_top_k.py [K] [total|pares|tercias|cuartetos] [--todas]
+
+Autor: Proyecto Omega Point
+"""
+
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from combinatoria import MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION, rank_combinacion
+from busqueda_omega_poda import BuscadorOmegaPoda
+from enumeracion_prefijos import EnumeradorPrefijos, NIVELES_PREFIJO
+from tablas_frecuencia import UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS
+
+# Peso de cada componente (pares, tercias, cuartetos) según el criterio de orden
+CRITERIOS = {
+    'total': (1, 1, 1),
+    'pares': (1, 0, 0),
+    'tercias': (0, 1, 0),
+    'cuartetos': (0, 0, 1),
+}
+
+
+class BuscadorTopK(BuscadorOmegaPoda):
+    """Búsqueda best-first de las K combinaciones con mayor puntaje del criterio"""
+
+    def __init__(self, tablas, k=100, criterio='total', solo_omega=True,
+                 umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                 umbral_cuartetos=UMBRAL_CUARTETOS):
+        if criterio not in CRITERIOS:
+            raise ValueError(f"Criterio desconocido: {criterio} (opciones: {', '.join(CRITERIOS)})")
+        if k <= 0:
+            raise ValueError("K debe ser positivo")
+        if not solo_omega:
+            umbral_pares = umbral_tercias = umbral_cuartetos = 0
+        super().__init__(tablas, umbral_pares, umbral_tercias, umbral_cuartetos)
+
+        self.k = k
+        self.criterio = criterio
+        self.pesos = CRITERIOS[criterio]
+        self.prefijo_actual = [0] * NIVELES_PREFIJO
+        self.prefijos_candidatos = 0
+        self.hojas_evaluadas = 0
+
+    def agregar_numero(self, k, x):
+        """Sin acotado automático: la fase 1 pide las cotas numéricas explícitamente"""
+        EnumeradorPrefijos.agregar_numero(self, k, x)
+        self.prefijo_actual[k - 1] = x
+
+    def _ir_a_prefijo(self, prefijo):
+        """Deja el estado en el prefijo de 4 números recalculando sólo los niveles que cambian"""
+        desde = 0
+        while desde < NIVELES_PREFIJO and self.prefijo_actual[desde] == prefijo[desde]:
+            desde += 1
+        for k in range(desde + 1, NIVELES_PREFIJO + 1):
+            self.agregar_numero(k, prefijo[k - 1])
+
+    def cotas_prefijos(self):
+        """
+        Fase 1: (prefijos, cotas) de todos los prefijos de 4 números que pueden
+        contener una combinación válida, con la cota superior del criterio
+        """
+        prefijos = []
+        cotas = []
+        ultimo_d = MAX_NUM - (NUMS_POR_COMBINACION - NIVELES_PREFIJO)
+        for a in range(MIN_NUM, ultimo_d - 2):
+            self.agregar_numero(1, a)
+            for b in range(a + 1, ultimo_d - 1):
+                self.agregar_numero(2, b)
+                for c in range(b + 1, ultimo_d):
+                    self.agregar_numero(3, c)
+                    hijos = np.arange(c + 1, ultimo_d + 1)
+                    cota_pares, cota_tercias, cota_cuartetos = self.cotas_componentes(hijos)
+                    validos = ((cota_pares >= self.umbral_pares)
+                               & (cota_tercias >= self.umbral_tercias)
+                               & (cota_cuartetos >= self.umbral_cuartetos))
+                    hijos = hijos[validos]
+                    if len(hijos):
+                        wp, wt, wq = self.pesos
+                        cotas.append(wp * cota_pares[validos] + wt * cota_tercias[validos]
+                                     + wq * cota_cuartetos[validos])
+                        prefijos.append(np.column_stack([np.full((len(hijos), 3), (a, b, c)), hijos]))
+
+        if not prefijos:
+            return np.empty((0, NIVELES_PREFIJO), dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(prefijos), np.concatenate(cotas).astype(np.int64)
+
+    def buscar(self):
+        """
+        Fase 2: visita los prefijos de mayor a menor cota y retorna la lista de
+        (puntaje, -rank, combinacion, (pares, tercias, cuartetos)) de las K
+        mejores, ordenada de mejor a peor
+        """
+        prefijos, cotas = self.cotas_prefijos()
+        self.prefijos_candidatos = len(prefijos)
+        # Orden estable: a igual cota se visita primero el prefijo de menor rank
+        orden = np.argsort(-cotas, kind='stable')
+        wp, wt, wq = self.pesos
+        monticulo = []
+
+        for i in orden:
+            if len(monticulo) == self.k and cotas[i] < monticulo[0][0]:
+                break
+
+            prefijo = tuple(int(x) for x in prefijos[i])
+            self._ir_a_prefijo(prefijo)
+            d = prefijo[-1]
+            self.rank_actual = rank_combinacion(prefijo + (d + 1, d + 2))
+            self.restantes = len(self.colas[d][0])
+            bloque = self.bloque_hojas(prefijo)
+            self.hojas_evaluadas += len(bloque)
+
+            puntajes = wp * bloque.pares + wt * bloque.tercias + wq * bloque.cuartetos
+            mascara = ((bloque.pares >= self.umbral_pares)
+                       & (bloque.tercias >= self.umbral_tercias)
+                       & (bloque.cuartetos >= self.umbral_cuartetos))
+            if len(monticulo) == self.k:
+                mascara &= puntajes >= monticulo[0][0]
+            indices = np.flatnonzero(mascara)
+            if len(indices) > self.k:
+                # Dentro del bloque el rank crece con el índice: desempate por índice
+                indices = indices[np.lexsort((indices, -puntajes[indices]))[:self.k]]
+
+            for j in indices:
+                entrada = (int(puntajes[j]), -(bloque.rank + int(j)),
+                           prefijo + (int(bloque.quintos[j]), int(bloque.sextos[j])),
+                           (int(bloque.pares[j]), int(bloque.tercias[j]), int(bloque.cuartetos[j])))
+                if len(monticulo) < self.k:
+                    heapq.heappush(monticulo, entrada)
+                elif entrada[:2] > monticulo[0][:2]:
+                    heapq.heapreplace(monticulo, entrada)
+
+        return sorted(monticulo, reverse=True)
+
+
+def buscar_top_k(tablas, k=100, criterio='total', solo_omega=True, umbral_pares=UMBRAL_PARES,
+                 umbral_tercias=UMBRAL_TERCIAS, umbral_cuartetos=UMBRAL_CUARTETOS):
+    """
+    Las K combinaciones de mayor afinidad según el criterio (empates por rank
+    ascendente). Con solo_omega sólo compiten las que cumplen los umbrales.
+    Retorna (top, estadisticas) con el formato de resultados de buscar_omega_con_poda
+    más el rank de cada combinación.
+    """
+    inicio_tiempo = time.time()
+    buscador = BuscadorTopK(tablas, k, criterio, solo_omega, umbral_pares, umbral_tercias, umbral_cuartetos)
+    mejores = buscador.buscar()
+
+    top = []
+    for _, rank_negativo, combinacion, afinidades in mejores:
+        top.append({
+            'rank': -rank_negativo,
+            'combinacion': combinacion,
+            'afinidad_pares': afinidades[0],
+            'afinidad_tercias': afinidades[1],
+            'afinidad_cuartetos': afinidades[2],
+            'afinidad_total': sum(afinidades)
+        })
+
+    estadisticas = {
+        'k': k,
+        'criterio': criterio,
+        'prefijos_candidatos': buscador.prefijos_candidatos,
+        'prefijos_visitados': buscador.prefijos_visitados,
+        'hojas_evaluadas': buscador.hojas_evaluadas,
+        'puntaje_k': mejores[-1][0] if mejores else None,
+        'tiempo': time.time() - inicio_tiempo
+    }
+    return top, estadisticas
+
+
+def mostrar_top_k(top, estadisticas, limite=10):
+    """Muestra las primeras combinaciones del top-K y las estadísticas de la búsqueda"""
+    print(f"🏆 TOP-{estadisticas['k']} POR AFINIDAD ({estadisticas['criterio'].upper()})")
+    for posicion, resultado in enumerate(top[:limite], 1):
+        print(f"   {posicion:3d}. {resultado['combinacion']} -> total {resultado['afinidad_total']} "
+              f"(P: {resultado['afinidad_pares']}, T: {resultado['afinidad_tercias']}, "
+              f"C: {resultado['afinidad_cuartetos']})")
+    if len(top) > limite:
+        print(f"   ... ({len(top) - limite:,} más)")
+    print(f"   🎯 Puntaje del K-ésimo: {estadisticas['puntaje_k']}")
+    print(f"   🌳 Prefijos visitados: {estadisticas['prefijos_visitados']:,} de "
+          f"{estadisticas['prefijos_candidatos']:,} candidatos")
+    print(f"   🍃 Hojas evaluadas: {estadisticas['hojas_evaluadas']:,}")
+    print(f"   ⏱️  Tiempo: {estadisticas['tiempo']:.2f} segundos")
+
+
+if __name__ == "__main__":
+    from tablas_frecuencia import TablasFrecuencia
+
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    k = int(argumentos[0]) if argumentos else 100
+    criterio = argumentos[1] if len(argumentos) > 1 else 'total'
+
+    top, estadisticas = buscar_top_k(TablasFrecuencia.desde_archivo(), k, criterio,
+                                     solo_omega='--todas' not in sys.argv)
+    mostrar_top_k(top, estadisticas)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+SISTEMA COMBINATORIO (COMBINADIC) PARA EL UNIVERSO MELATE RETRO
+===============================================================
+
+Permite ubicar cualquier combinación del universo por su posición (rank)
+en orden lexicográfico, el mismo orden que produce
+itertools.combinations(range(1, 40), 6):
+- rank_combinacion: combinación ordenada -> rank
+- unrank_combinacion: rank -> combinación
+- iterar_desde_rank: recorre N combinaciones a partir de un rank
+- rank_combinaciones: rank de muchas combinaciones a la vez (NumPy)
+- unrank_combinaciones: combinaciones (N, 6) uint8 de muchos ranks (NumPy)
+- bloques_universo: bloques (N, 6) uint8 de cualquier rango de ranks, la
+  entrada común de los evaluadores por bloques
+
+Con esto cada proceso comienza a generar directamente en su rango sin
+materializar las 3,262,623 combinaciones en memoria.
+
+Autor: Proyecto Omega Point
+"""
+
+import os
+from math import comb
+
+import numpy as np
+
+# Parámetros del juego
+MIN_NUM = 1
+MAX_NUM = 39
+NUMS_POR_COMBINACION = 6
+
+# Tabla de coeficientes binomiales BINOMIALES[n][k] para n, k <= MAX_NUM
+BINOMIALES = [[comb(n, k) for k in range(MAX_NUM + 1)] for n in range(MAX_NUM + 1)]
+_BINOMIALES_NP = np.array(BINOMIALES, dtype=np.int64)
+
+
+def total_combinaciones(k=NUMS_POR_COMBINACION, max_num=MAX_NUM):
+    """Número de combinaciones de k números tomados de 1..max_num"""
+    return BINOMIALES[max_num][k]
+
+
+TOTAL_COMBINACIONES = total_combinaciones()
+
+
+def rank_combinacion(combinacion, max_num=MAX_NUM):
+    """
+    Posición lexicográfica de una combinación ordenada ascendentemente
+    (números de 1 a max_num). La primera combinación tiene rank 0.
+    """
+    k = len(combinacion)
+    rank_complemento = 0
+    for i, numero in enumerate(combinacion):
+        rank_complemento += BINOMIALES[max_num - numero][k - i]
+    return BINOMIALES[max_num][k] - 1 - rank_complemento
+
+
+def rank_combinaciones(combinaciones, max_num=MAX_NUM):
+    """
+    Versión vectorizada de rank_combinacion: recibe un arreglo (..., k) de
+    combinaciones ascendentes y retorna sus ranks lexicográficos (int64)
+    """
+    combinaciones = np.asarray(combinaciones, dtype=np.intp)
+    k = combinaciones.shape[-1]
+    complemento = _BINOMIALES_NP[max_num - combinaciones, np.arange(k, 0, -1)].sum(axis=-1)
+    return BINOMIALES[max_num][k] - 1 - complemento
+
+
+def unrank_combinacion(rank, k=NUMS_POR_COMBINACION, max_num=MAX_NUM):
+    """Combinación (tupla ascendente) que ocupa la posición `rank`"""
+    total = BINOMIALES[max_num][k]
+    if not 0 <= rank < total:
+        raise ValueError(f"Rank fuera de rango: {rank} (total {total:,})")
+
+    restante = total - 1 - rank
+    combinacion = []
+    y = max_num
+    for i in range(k):
+        # Mayor y tal que C(y, k - i) <= restante
+        y -= 1
+        while BINOMIALES[y][k - i] > restante:
+            y -= 1
+        restante -= BINOMIALES[y][k - i]
+        combinacion.append(max_num - y)
+    return tuple(combinacion)
+
+
+def unrank_combinaciones(ranks, k=NUMS_POR_COMBINACION, max_num=MAX_NUM):
+    """
+    Versión vectorizada de unrank_combinacion: arreglo (N, k) uint8 con las
+    combinaciones de los ranks dados. En cada posición, el mayor y tal que
+    C(y, k - i) <= restante se obtiene con una búsqueda binaria por columna.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    total = BINOMIALES[max_num][k]
+    if ranks.size and (ranks.min() < 0 or ranks.max() >= total):
+        raise ValueError(f"Rank fuera de rango (total {total:,})")
+
+    restante = total - 1 - ranks
+    combinaciones = np.empty(ranks.shape + (k,), dtype=np.uint8)
+    for i in range(k):
+        columna = _BINOMIALES_NP[:max_num, k - i]
+        y = np.searchsorted(columna, restante, side='right') - 1
+        restante = restante - columna[y]
+        combinaciones[..., i] = max_num - y
+    return combinaciones
+
+
+def bloque_universo(inicio, fin, universo=None):
+    """
+    Arreglo (N, 6) uint8 con las combinaciones de los ranks [inicio, fin).
+    Con `universo` (arreglo memory-mapped de arreglo_universo) es una rebanada
+    sin copia; si no, se obtiene por unrank vectorizado.
+    """
+    fin = min(fin, TOTAL_COMBINACIONES)
+    if universo is not None:
+        return universo[inicio:fin]
+    return unrank_combinaciones(np.arange(inicio, max(fin, inicio), dtype=np.int64))
+
+
+def bloques_universo(inicio=0, fin=TOTAL_COMBINACIONES, tamano_bloque=50000, universo=None):
+    """Generador de bloques (N, 6) uint8 consecutivos que cubren [inicio, fin)"""
+    fin = min(fin, TOTAL_COMBINACIONES)
+    for desde in range(inicio, fin, tamano_bloque):
+        yield bloque_universo(desde, min(desde + tamano_bloque, fin), universo)
+
+
+def arreglo_universo(ruta):
+    """
+    Universo completo (3,262,623 x 6 uint8, ~20 MB) como .npy abierto con
+    mmap en sólo lectura, compartido por todos los procesos a través de la
+    caché de páginas. Se construye la primera vez (escritura atómica).
+    """
+    if not os.path.exists(ruta):
+        temporal = f"{ruta}.tmp"
+        destino = np.lib.format.open_memmap(temporal, mode='w+', dtype=np.uint8,
+                                            shape=(TOTAL_COMBINACIONES, NUMS_POR_COMBINACION))
+        for desde in range(0, TOTAL_COMBINACIONES, 1 << 20):
+            hasta = min(desde + (1 << 20), TOTAL_COMBINACIONES)
+            destino[desde:hasta] = bloque_universo(desde, hasta)
+        destino.flush()
+        del destino
+        os.replace(temporal, ruta)
+
+    universo = np.load(ruta, mmap_mode='r')
+    if universo.shape != (TOTAL_COMBINACIONES, NUMS_POR_COMBINACION) or universo.dtype != np.uint8:
+        raise ValueError(f"Arreglo del universo inválido: {ruta}")
+    return universo
+
+
+def iterar_desde_rank(rank, cantidad, k=NUMS_POR_COMBINACION, max_num=MAX_NUM):
+    """
+    Generador de `cantidad` combinaciones consecutivas en orden lexicográfico
+    a partir de `rank`. Se detiene al final del universo.
+    """
+    cantidad = min(cantidad, BINOMIALES[max_num][k] - rank)
+    if cantidad <= 0:
+        return
+
+    actual = list(unrank_combinacion(rank, k, max_num))
+    yield tuple(actual)
+
+    for _ in range(cantidad - 1):
+        # Siguiente combinación: incrementar la posición más a la derecha posible
+        i = k - 1
+        while actual[i] == max_num - k + 1 + i:
+            i -= 1
+        actual[i] += 1
+        for j in range(i + 1, k):
+            actual[j] = actual[j - 1] + 1
+        yield tuple(actual)
+
+
+def dividir_rangos(num_partes, inicio=0, fin=TOTAL_COMBINACIONES):
+    """Divide [inicio, fin) en `num_partes` rangos contiguos de ranks"""
+    tamano = (fin - inicio) // num_partes
+    rangos = []
+    for i in range(num_partes):
+        rango_inicio = inicio + i * tamano
+        rango_fin = inicio + (i + 1) * tamano if i < num_partes - 1 else fin
+        rangos.append((rango_inicio, rango_fin))
+    return rangos
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+DISTRIBUCIÓN DE PUNTUACIONES DE TODO EL UNIVERSO
+================================================
+
+Los generadores sólo conservan la cola Omega, pero las gráficas del frontend
+(OmegaScoreDistributionHistogram, WinnerOmegaScoreDistributionHistogram)
+necesitan la distribución de las 3,262,623 combinaciones para comparar
+contra los sorteos ganadores.
+
+Cada proceso trabajador recorre un rango de ranks con la enumeración por
+prefijos y regresa sólo su histograma disperso de (pares, tercias, cuartetos)
+(ver barrido_umbrales.conteos_afinidades); el coordinador los suma. De ese
+histograma 3-D salen de forma exacta:
+- histogramas por valor de pares, tercias, cuartetos y afinidad total
+- histograma de omega_score (tablas_frecuencia.omega_score, la misma que usa
+  Old/omega_analyzer.py) en los 20 intervalos de 0.06 de las gráficas, más el resto
+- percentiles de cada métrica
+
+Artefactos: un JSON pequeño para el frontend y el histograma 3-D en .npz
+(el mismo formato de BarridoUmbrales, sirve también para barrer umbrales).
+
+Uso:
+    python distribucion_universo.py [--procesos N] [--universo archivo.bin]
+                                    [--salida distribucion.json] [--histograma histograma.npz]
+
+Autor: Proyecto Omega Point
+"""
+
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from combinatoria import TOTAL_COMBINACIONES
+from barrido_umbrales import BarridoUmbrales, conteos_afinidades, dimensiones_histograma
+from tablas_frecuencia import (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS, TablasFrecuencia,
+                               liberar_memoria_compartida, omega_score)
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVO_DISTRIBUCION = os.path.join(RAIZ_PROYECTO, 'src', 'api', 'distribucion_universo.json')
+
+PERCENTILES = (1, 5, 10, 25, 50, 75, 90, 95, 99)
+# Intervalos de omega_score de las gráficas del frontend
+INTERVALOS_SCORE = 20
+MAXIMO_SCORE = 1.2
+TAMANO_BLOQUE = 100_000
+
+# Tablas del proceso trabajador (adjuntas a la memoria compartida)
+TABLAS_TRABAJADOR = None
+
+
+# ============================================================================
+# PASADA PARALELA
+# ============================================================================
+
+def _inicializar_trabajador(descriptor_tablas):
+    global TABLAS_TRABAJADOR
+    TABLAS_TRABAJADOR = TablasFrecuencia.desde_memoria_compartida(descriptor_tablas)
+
+
+def _conteos_rango(inicio, fin):
+    """Histograma disperso de un rango, acumulado dentro del trabajador"""
+    return conteos_afinidades(TABLAS_TRABAJADOR, None, inicio, fin)
+
+
+def histograma_universo(tablas, num_procesos=None, ruta_universo=None, tamano_bloque=TAMANO_BLOQUE):
+    """
+    Histograma 3-D de (pares, tercias, cuartetos) de todo el universo. Con una
+    tabla del universo válida basta una lectura secuencial; si no, se reparte
+    la enumeración por rangos entre procesos trabajadores.
+    """
+    dimensiones = dimensiones_histograma(tablas)
+    histograma = np.zeros(int(np.prod(dimensiones)), dtype=np.int64)
+
+    if ruta_universo is not None and os.path.exists(ruta_universo):
+        celdas, conteos = conteos_afinidades(tablas, ruta_universo)
+        histograma[celdas] += conteos
+        return histograma.reshape(dimensiones)
+
+    num_procesos = num_procesos or mp.cpu_count()
+    bloques_compartidos, descriptor_tablas = tablas.a_memoria_compartida()
+    try:
+        with ProcessPoolExecutor(max_workers=num_procesos, mp_context=mp.get_context('spawn'),
+                                 initializer=_inicializar_trabajador,
+                                 initargs=(descriptor_tablas,)) as executor:
+            inicios = range(0, TOTAL_COMBINACIONES, tamano_bloque)
+            fines = [min(inicio + tamano_bloque, TOTAL_COMBINACIONES) for inicio in inicios]
+            for celdas, conteos in executor.map(_conteos_rango, inicios, fines):
+                histograma[celdas] += conteos
+    finally:
+        liberar_memoria_compartida(bloques_compartidos)
+
+    return histograma.reshape(dimensiones)
+
+
+# ============================================================================
+# ESTADÍSTICAS
+# ============================================================================
+
+def percentiles_ponderados(valores, pesos):
+    """
+    Percentiles exactos de valores con multiplicidad: el menor valor cuya
+    frecuencia acumulada alcanza el porcentaje
+    """
+    orden = np.argsort(valores, kind='stable')
+    valores = np.asarray(valores)[orden]
+    acumulado = np.cumsum(np.asarray(pesos)[orden])
+    if not len(acumulado):
+        return {}
+    total = acumulado[-1]
+    return {f"p{p}": valores[np.searchsorted(acumulado, math.ceil(total * p / 100))].item()
+            for p in PERCENTILES}
+
+
+def resumen_entero(conteos):
+    """Histograma por valor (desde el mínimo observado), media y percentiles"""
+    valores = np.flatnonzero(conteos)
+    minimo, maximo = int(valores[0]), int(valores[-1])
+    total = int(conteos.sum())
+    return {
+        'minimo': minimo,
+        'maximo': maximo,
+        'media': float((np.arange(len(conteos)) * conteos).sum() / total),
+        'conteos': conteos[minimo:maximo + 1].tolist(),
+        'percentiles': percentiles_ponderados(valores, conteos[valores]),
+    }
+
+
+def distribucion_desde_histograma(histograma, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                                  umbral_cuartetos=UMBRAL_CUARTETOS):
+    """Diccionario serializable con todas las distribuciones del universo"""
+    celdas = np.flatnonzero(histograma)
+    conteos = histograma.ravel()[celdas]
+    pares, tercias, cuartetos = np.unravel_index(celdas, histograma.shape)
+    es_omega = (pares >= umbral_pares) & (tercias >= umbral_tercias) & (cuartetos >= umbral_cuartetos)
+
+    total = pares + tercias + cuartetos
+    conteos_total = np.bincount(total, weights=conteos).astype(np.int64)
+
+    scores = omega_score(pares, tercias, cuartetos, es_omega, umbral_pares, umbral_tercias, umbral_cuartetos)
+    tamano = MAXIMO_SCORE / INTERVALOS_SCORE
+    indices = np.floor(scores[es_omega] / tamano).astype(np.int64)
+    dentro = (indices >= 0) & (indices < INTERVALOS_SCORE)
+    conteos_score = np.bincount(indices[dentro], weights=conteos[es_omega][dentro],
+                                minlength=INTERVALOS_SCORE).astype(np.int64)
+    total_omega = int(conteos[es_omega].sum())
+
+    return {
+        'total_combinaciones': int(conteos.sum()),
+        'umbrales': {'pares': umbral_pares, 'tercias': umbral_tercias, 'cuartetos': umbral_cuartetos},
+        'omega': total_omega,
+        'pares': resumen_entero(histograma.sum(axis=(1, 2))),
+        'tercias': resumen_entero(histograma.sum(axis=(0, 2))),
+        'cuartetos': resumen_entero(histograma.sum(axis=(0, 1))),
+        'total': resumen_entero(conteos_total),
+        'omega_score': {
+            # Igual que en la base: las combinaciones que no son Omega tienen score 0
+            'no_omega': int(conteos[~es_omega].sum()),
+            'media_omega': float((scores[es_omega] * conteos[es_omega]).sum() / total_omega) if total_omega else 0.0,
+            'intervalos': [{'name': f"{i * tamano:.2f} - {(i + 1) * tamano:.2f}",
+                            'min': round(i * tamano, 6), 'max': round((i + 1) * tamano, 6),
+                            'count': int(conteos_score[i])} for i in range(INTERVALOS_SCORE)],
+            'fuera_de_rango': total_omega - int(conteos_score.sum()),
+            'percentiles_omega': percentiles_ponderados(scores[es_omega], conteos[es_omega]),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribución de puntuaciones de todo el universo")
+    parser.add_argument('--procesos', type=int, default=None, help="procesos trabajadores")
+    parser.add_argument('--universo', default=None, help="tabla precalculada del universo (opcional)")
+    parser.add_argument('--salida', default=ARCHIVO_DISTRIBUCION, help="archivo JSON para el frontend")
+    parser.add_argument('--histograma', default=None, help="archivo .npz con el histograma 3-D")
+    args = parser.parse_args()
+
+    tablas = TablasFrecuencia.desde_archivo()
+    inicio = time.perf_counter()
+    histograma = histograma_universo(tablas, args.procesos, args.universo)
+    print(f"✅ Histograma de {int(histograma.sum()):,} combinaciones en "
+          f"{time.perf_counter() - inicio:.1f} segundos")
+
+    distribucion = distribucion_desde_histograma(histograma)
+    distribucion['digest'] = tablas.digest()
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(distribucion, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"💾 Distribución guardada en {args.salida} ({os.path.getsize(args.salida):,} bytes)")
+
+    if args.histograma:
+        BarridoUmbrales(histograma, tablas.digest()).guardar(args.histograma)
+        print(f"💾 Histograma 3-D guardado en {args.histograma}")
+
+    for metrica in ('pares', 'tercias', 'cuartetos', 'total'):
+        resumen = distribucion[metrica]
+        print(f"   📊 {metrica.capitalize()}: {resumen['minimo']}..{resumen['maximo']}, "
+              f"media {resumen['media']:.1f}, mediana {resumen['percentiles']['p50']}")
+    print(f"   🎯 Omega: {distribucion['omega']:,} | omega_score medio: "
+          f"{distribucion['omega_score']['media_omega']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
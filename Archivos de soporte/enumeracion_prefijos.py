@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+ENUMERACIÓN POR PREFIJOS CON SUMAS PARCIALES COMPARTIDAS
+========================================================
+
+Recorre el universo en orden lexicográfico como niveles anidados
+(a < b < c < d < e < f) y arrastra, para el prefijo actual, las sumas de
+afinidad ya acumuladas junto con la contribución que aportaría cada número
+candidato. Al avanzar un nivel sólo se suman las contribuciones del número
+nuevo, en lugar de recalcular las 50 sub-combinaciones desde cero.
+
+Los dos últimos niveles (e, f) se resuelven como un solo bloque NumPy por
+cada prefijo de cuatro números, usando las contribuciones acumuladas:
+    pares     = P(prefijo) + A1p[e] + A1p[f] + P[e, f]
+    tercias   = T(prefijo) + A1t[e] + A1t[f] + A2t[e, f]
+    cuartetos = Q(prefijo) + A1q[e] + A1q[f] + A2q[e, f]
+
+Autor: Proyecto Omega Point
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from combinatoria import (MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION, TOTAL_COMBINACIONES,
+                          rank_combinacion, unrank_combinacion)
+from tablas_frecuencia import DIMENSION
+
+# Niveles que se recorren explícitamente; los dos restantes forman el bloque de hojas
+NIVELES_PREFIJO = NUMS_POR_COMBINACION - 2
+
+
+class BloqueHojas(namedtuple('BloqueHojas', 'rank prefijo quintos sextos pares tercias cuartetos')):
+    """Hojas consecutivas (ranks rank .. rank + N - 1) que comparten un prefijo de 4 números"""
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.quintos)
+
+    def combinaciones(self):
+        """Materializa el bloque como arreglo (N, 6) uint8"""
+        bloque = np.empty((len(self.quintos), NUMS_POR_COMBINACION), dtype=np.uint8)
+        bloque[:, :NIVELES_PREFIJO] = self.prefijo
+        bloque[:, NIVELES_PREFIJO] = self.quintos
+        bloque[:, NIVELES_PREFIJO + 1] = self.sextos
+        return bloque
+
+
+class EnumeradorPrefijos:
+    """Recorrido del universo con sumas de afinidad compartidas entre prefijos"""
+
+    def __init__(self, tablas):
+        # Se usan las tablas (uint8 o uint16) tal cual, sin copias: los acumuladores son int32
+        self.P = tablas.pares
+        self.T = tablas.tercias
+        self.Q = tablas.cuartetos
+
+        niveles = NIVELES_PREFIJO + 1
+        # Estado después de k números del prefijo (k = 0..4):
+        #   sumas[k]  -> afinidades (pares, tercias, cuartetos) del propio prefijo
+        #   a1p/a1t/a1q[k][x]  -> aporte de agregar x como un número más
+        #   a2t/a2q[k][x, y]   -> aporte de agregar x e y juntos (con el prefijo)
+        #   a3q[k][x, y, z]    -> necesario para actualizar a2q (sólo k <= 3)
+        self.sumas = [(0, 0, 0)] * niveles
+        self.a1p = np.zeros((niveles, DIMENSION), dtype=np.int32)
+        self.a1t = np.zeros((niveles, DIMENSION), dtype=np.int32)
+        self.a1q = np.zeros((niveles, DIMENSION), dtype=np.int32)
+        self.a2t = np.zeros((niveles, DIMENSION, DIMENSION), dtype=np.int32)
+        self.a2q = np.zeros((niveles, DIMENSION, DIMENSION), dtype=np.int32)
+        self.a3q = np.zeros((niveles - 1, DIMENSION, DIMENSION, DIMENSION), dtype=np.int32)
+
+        # Parejas (e, f) ascendentes posteriores a cada último número d del prefijo,
+        # en orden lexicográfico
+        self.colas = []
+        for d in range(DIMENSION):
+            e, f = np.triu_indices(max(MAX_NUM - d, 0), 1)
+            self.colas.append((e + d + 1, f + d + 1))
+
+        self.rank_actual = 0
+        self.restantes = 0
+        self.prefijos_visitados = 0
+        self.hojas_podadas = 0
+
+    def agregar_numero(self, k, x):
+        """Calcula el estado del nivel k agregando x al prefijo del nivel k - 1"""
+        previo = k - 1
+        pares, tercias, cuartetos = self.sumas[previo]
+        self.sumas[k] = (pares + int(self.a1p[previo, x]),
+                         tercias + int(self.a1t[previo, x]),
+                         cuartetos + int(self.a1q[previo, x]))
+
+        np.add(self.a1p[previo], self.P[x], out=self.a1p[k])
+        np.add(self.a1t[previo], self.a2t[previo, x], out=self.a1t[k])
+        np.add(self.a1q[previo], self.a2q[previo, x], out=self.a1q[k])
+        np.add(self.a2t[previo], self.T[x], out=self.a2t[k])
+        np.add(self.a2q[previo], self.a3q[previo, x], out=self.a2q[k])
+        if k < NIVELES_PREFIJO:
+            np.add(self.a3q[previo], self.Q[x], out=self.a3q[k])
+
+    def bloque_hojas(self, prefijo, inicial=None):
+        """Evalúa todas las hojas (e, f) del prefijo de 4 números actual"""
+        k = NIVELES_PREFIJO
+        d = prefijo[-1]
+        quintos, sextos = self.colas[d]
+
+        desplazamiento = 0
+        if inicial is not None:
+            # Primer bloque del recorrido: empezar en la hoja del rank inicial
+            desplazamiento = rank_combinacion((inicial[k] - d, inicial[k + 1] - d), MAX_NUM - d)
+        cantidad = min(len(quintos) - desplazamiento, self.restantes)
+        quintos = quintos[desplazamiento:desplazamiento + cantidad]
+        sextos = sextos[desplazamiento:desplazamiento + cantidad]
+
+        pares, tercias, cuartetos = self.sumas[k]
+        a1p, a1t, a1q = self.a1p[k], self.a1t[k], self.a1q[k]
+        bloque = BloqueHojas(
+            self.rank_actual, tuple(prefijo), quintos, sextos,
+            pares + a1p[quintos] + a1p[sextos] + self.P[quintos, sextos],
+            tercias + a1t[quintos] + a1t[sextos] + self.a2t[k][quintos, sextos],
+            cuartetos + a1q[quintos] + a1q[sextos] + self.a2q[k][quintos, sextos],
+        )
+
+        self.rank_actual += cantidad
+        self.restantes -= cantidad
+        self.prefijos_visitados += 1
+        return bloque
+
+    def podar(self, k, x):
+        """
+        Punto de extensión: retorna True si ninguna hoja del subárbol que se
+        obtiene al agregar x como número k puede interesar. Se consulta antes de
+        agregar x, con el estado del prefijo de k - 1 números. Por omisión no poda.
+        """
+        return False
+
+    def saltar_subarbol(self, k, prefijo):
+        """Avanza el rank actual hasta el final del subárbol del prefijo de k números"""
+        faltantes = NUMS_POR_COMBINACION - k
+        ultima_hoja = tuple(prefijo[:k]) + tuple(range(MAX_NUM - faltantes + 1, MAX_NUM + 1))
+        saltadas = min(rank_combinacion(ultima_hoja) + 1 - self.rank_actual, self.restantes)
+        self.rank_actual += saltadas
+        self.restantes -= saltadas
+        self.hojas_podadas += saltadas
+
+    def recorrer_nivel(self, k, prefijo, inicial, en_ruta):
+        """Recorre recursivamente los números del nivel k (1..4) y sus subárboles"""
+        desde = inicial[k - 1] if en_ruta else (prefijo[k - 2] + 1 if k > 1 else MIN_NUM)
+        hasta = MAX_NUM - (NUMS_POR_COMBINACION - k)
+
+        for x in range(desde, hasta + 1):
+            ruta = en_ruta and x == inicial[k - 1]
+            prefijo[k - 1] = x
+
+            if self.podar(k, x):
+                self.saltar_subarbol(k, prefijo)
+            else:
+                self.agregar_numero(k, x)
+                if k < NIVELES_PREFIJO:
+                    yield from self.recorrer_nivel(k + 1, prefijo, inicial, ruta)
+                else:
+                    yield self.bloque_hojas(prefijo, inicial if ruta else None)
+
+            if self.restantes <= 0:
+                return
+
+    def recorrer(self, inicio=0, fin=TOTAL_COMBINACIONES):
+        """
+        Generador de BloqueHojas que cubre exactamente los ranks [inicio, fin)
+        con las afinidades completas (pares, tercias, cuartetos) de cada hoja.
+        Los subárboles descartados por podar() se omiten.
+        """
+        fin = min(fin, TOTAL_COMBINACIONES)
+        if inicio >= fin:
+            return
+
+        self.rank_actual = inicio
+        self.restantes = fin - inicio
+        self.prefijos_visitados = 0
+        self.hojas_podadas = 0
+        prefijo = [0] * NIVELES_PREFIJO
+        yield from self.recorrer_nivel(1, prefijo, unrank_combinacion(inicio), True)
+
+
+def buscar_omega_prefijos(enumerador, inicio, fin, umbral_pares, umbral_tercias, umbral_cuartetos):
+    """
+    Generador de (bloque, indices_omega) para cada bloque de hojas del rango,
+    donde indices_omega son las posiciones del bloque que cumplen los tres criterios
+    """
+    for bloque in enumerador.recorrer(inicio, fin):
+        mascara = ((bloque.pares >= umbral_pares)
+                   & (bloque.tercias >= umbral_tercias)
+                   & (bloque.cuartetos >= umbral_cuartetos))
+        yield bloque, np.flatnonzero(mascara)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+FRECUENCIAS DESDE EL HISTORIAL DE SORTEOS
+=========================================
+
+Regenera las tablas de frecuencia de pares, tercias y cuartetos a partir de
+los sorteos (lottodata.db o scripts/melate_retro_download.csv) en lugar de
+depender de artefactos congelados.
+
+Los sorteos se cargan como un arreglo (n, 6) ordenado por fila. Para cada
+orden k se toman las C(6, k) sub-combinaciones de todas las filas a la vez,
+se calcula su rank lexicográfico vectorizado y se cuentan con np.bincount
+(scatter-add) directamente en el vector canónico indexado por rank (ver
+tablas_frecuencia.py). El costo es lineal en el número de sorteos. Las
+tablas pasan a uint16 cuando alguna frecuencia supera 255 (unos 8,000
+sorteos) y admiten frecuencias de hasta 65,535.
+
+Uso:
+    python frecuencias_historial.py [--db archivo.db | --csv archivo.csv]
+                                    [--hasta CONCURSO] [--salida archivo.npy]
+
+Sin --salida sólo se reportan conteos, digest y tiempo; el archivo canónico
+no se sobrescribe a menos que se indique explícitamente.
+
+Autor: Proyecto Omega Point
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from combinatoria import MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION, rank_combinaciones
+from tablas_frecuencia import (IDX_PARES, IDX_TERCIAS, IDX_CUARTETOS, DESPLAZAMIENTOS_ORDEN,
+                               TAMANOS_ORDEN, TAMANO_VECTOR, TablasFrecuencia)
+
+RAIZ_PROYECTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVO_DB = os.path.join(RAIZ_PROYECTO, 'lottodata.db')
+ARCHIVO_CSV = os.path.join(RAIZ_PROYECTO, 'scripts', 'melate_retro_download.csv')
+
+# Posiciones de cada sub-combinación dentro de un sorteo, por orden (2, 3, 4)
+IDX_ORDEN = (IDX_PARES, IDX_TERCIAS, IDX_CUARTETOS)
+
+
+# ============================================================================
+# CARGA DE SORTEOS
+# ============================================================================
+
+def normalizar_sorteos(sorteos):
+    """
+    Arreglo (n, 6) uint8 con cada sorteo ordenado ascendentemente.
+    ValueError si hay números fuera de 1..39 o repetidos en un sorteo.
+    """
+    sorteos = np.sort(np.asarray(sorteos, dtype=np.int64).reshape(-1, NUMS_POR_COMBINACION), axis=1)
+    if len(sorteos):
+        if sorteos.min() < MIN_NUM or sorteos.max() > MAX_NUM:
+            raise ValueError(f"Sorteo con números fuera de {MIN_NUM}..{MAX_NUM}")
+        repetidos = np.flatnonzero((np.diff(sorteos, axis=1) == 0).any(axis=1))
+        if len(repetidos):
+            raise ValueError(f"Sorteo con números repetidos: {sorteos[repetidos[0]].tolist()}")
+    return sorteos.astype(np.uint8)
+
+
+def cargar_sorteos_db(ruta_db=ARCHIVO_DB, hasta_concurso=None):
+    """Sorteos de la tabla melate_retro en orden de concurso"""
+    consulta = "SELECT r1, r2, r3, r4, r5, r6 FROM melate_retro WHERE r1 IS NOT NULL"
+    parametros = ()
+    if hasta_concurso is not None:
+        consulta += " AND concurso <= ?"
+        parametros = (hasta_concurso,)
+    conn = sqlite3.connect(ruta_db)
+    try:
+        filas = conn.execute(consulta + " ORDER BY concurso", parametros).fetchall()
+    finally:
+        conn.close()
+    return normalizar_sorteos(filas)
+
+
+def cargar_sorteos_csv(ruta_csv=ARCHIVO_CSV, hasta_concurso=None):
+    """
+    Sorteos del CSV de descarga (CONCURSO, F1..F6; F7 es el número adicional
+    y no forma parte de la combinación) en orden de concurso
+    """
+    sorteos = []
+    with open(ruta_csv, newline='', encoding='utf-8') as f:
+        for fila in csv.DictReader(f):
+            concurso = int(fila['CONCURSO'])
+            if hasta_concurso is None or concurso <= hasta_concurso:
+                sorteos.append((concurso, [int(fila[f'F{i}']) for i in range(1, NUMS_POR_COMBINACION + 1)]))
+    sorteos.sort(key=lambda sorteo: sorteo[0])
+    return normalizar_sorteos([numeros for _, numeros in sorteos])
+
+
+# ============================================================================
+# CONTEO VECTORIZADO
+# ============================================================================
+
+def contar_subcombinaciones(sorteos):
+    """
+    Vector canónico int64 (TAMANO_VECTOR) con cuántas veces aparece cada par,
+    tercia y cuarteto en los sorteos. También sirve para el delta de un solo
+    sorteo nuevo.
+    """
+    sorteos = normalizar_sorteos(sorteos)
+    conteos = np.zeros(TAMANO_VECTOR, dtype=np.int64)
+    for idx, desplazamiento, tamano in zip(IDX_ORDEN, DESPLAZAMIENTOS_ORDEN, TAMANOS_ORDEN):
+        ranks = rank_combinaciones(sorteos[:, idx])
+        conteos[desplazamiento:desplazamiento + tamano] = np.bincount(ranks.ravel(), minlength=tamano)
+    return conteos
+
+
+def tablas_desde_conteos(conteos):
+    """
+    TablasFrecuencia a partir del vector de conteos: uint8 mientras quepan,
+    uint16 si alguna frecuencia pasa de 255 (ValueError si pasa de 65,535)
+    """
+    return TablasFrecuencia.desde_vector(np.asarray(conteos))
+
+
+def construir_tablas_historial(sorteos):
+    """Tablas de frecuencia de pares, tercias y cuartetos de un historial (n, 6)"""
+    return tablas_desde_conteos(contar_subcombinaciones(sorteos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frecuencias de pares/tercias/cuartetos desde el historial")
+    fuente = parser.add_mutually_exclusive_group()
+    fuente.add_argument('--db', default=None, help=f"base SQLite (por omisión {ARCHIVO_DB})")
+    fuente.add_argument('--csv', default=None, help="CSV de descarga NPRODUCTO,CONCURSO,F1..F7,...")
+    parser.add_argument('--hasta', type=int, default=None, help="último concurso a incluir")
+    parser.add_argument('--salida', default=None, help="archivo .npy a escribir (formato canónico)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    if args.csv:
+        sorteos = cargar_sorteos_csv(args.csv, args.hasta)
+    else:
+        sorteos = cargar_sorteos_db(args.db or ARCHIVO_DB, args.hasta)
+    segundos_carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    tablas = construir_tablas_historial(sorteos)
+    segundos_conteo = time.perf_counter() - inicio
+
+    pares, tercias, cuartetos = tablas.conteos()
+    print(f"✅ {len(sorteos):,} sorteos -> no nulos: {pares:,} pares, {tercias:,} tercias, {cuartetos:,} cuartetos")
+    print(f"   ⏱️  Carga: {segundos_carga * 1000:.1f} ms | Conteo: {segundos_conteo * 1000:.1f} ms")
+    print(f"   🔑 Digest: {tablas.digest()}")
+
+    if args.salida:
+        tablas.guardar(args.salida)
+        print(f"💾 Tablas guardadas en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
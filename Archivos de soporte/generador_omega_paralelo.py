@@ -23,19 +23,29 @@ Fecha: 2025-01-09
 """
 
 import numpy as np
-import pandas as pd
-from itertools import combinations
-import pickle
 import time
 from datetime import datetime, timedelta
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import os
 import sys
 import psutil
-from functools import partial
 import gc
 
+from combinatoria import TOTAL_COMBINACIONES, bloques_universo
+from tablas_frecuencia import ARCHIVO_FRECUENCIAS, TablasFrecuencia, liberar_memoria_compartida
+from benchmark_omega import ejecutar_suite, mostrar_reporte
+from busqueda_omega_poda import buscar_omega_con_poda, mostrar_estadisticas_poda
+from busqueda_top_k import buscar_top_k, mostrar_top_k
+from barrido_umbrales import BarridoUmbrales
+from bitmap_omega import bitmap_desde_almacen
+from tabla_universo import obtener_tabla_universo
+from planificador_bloques import PlanificadorBloques
+from puntos_control import PuntoControl
+from almacen_omega import AlmacenOmega, registros_omega, exportar_excel
+from telemetria import TelemetriaCompartida, ReportadorTrabajador, MonitorProgreso
+
 # ============================================================================
 # CONFIGURACIÓN ULTRA-OPTIMIZADA
 # ============================================================================
@@ -53,11 +63,34 @@ class ConfiguracionOptima:
         self.batch_size = self.calcular_batch_size()
         self.save_interval = 250000  # Guardar cada 250k combinaciones
         
+        # Planificación dinámica: bloques pequeños de ranks repartidos bajo demanda
+        self.bloque_inicial = 20000
+        self.bloque_minimo = 2000
+        self.bloque_maximo = 500000
+        self.segundos_por_bloque = 1.0  # Duración objetivo de cada bloque
+        self.bloques_en_vuelo = 2       # Bloques pendientes por proceso
+        
+        # Archivos junto a este script: la tabla del universo y el bitmap son los
+        # mismos que abre el backend (UNIVERSE_TABLE_PATH y OMEGA_BITMAP_PATH en Old/config.py)
+        self.directorio = os.path.dirname(os.path.abspath(__file__))
+        
+        # Puntos de control: bloques terminados y sus Omega (para --resume)
+        self.archivo_punto_control = os.path.join(self.directorio, 'punto_control_omega_ultra.jsonl')
+        self.archivo_almacen = os.path.join(self.directorio, 'resultados_omega_ultra.bin')  # Omega en binario (streaming)
+        self.archivo_bitmap = os.path.join(self.directorio, 'omega_bitmap.bin')  # Pertenencia Omega por rank (rank/select)
+        self.max_reintentos = 3  # Reintentos de un bloque fallido
+        
+        # Telemetría: los trabajadores publican contadores, el coordinador consolida
+        self.intervalo_telemetria = 0.5  # Segundos entre publicaciones de cada trabajador
+        self.intervalo_progreso = 5.0    # Segundos entre líneas de progreso
+        self.archivo_universo = os.path.join(self.directorio, 'universo_omega.bin')  # Tabla precalculada por rank
+        self.archivo_frecuencias = ARCHIVO_FRECUENCIAS  # Tablas canónicas .npy (ver tablas_frecuencia.py)
+        
         # Parámetros del juego
         self.MIN_NUM = 1
         self.MAX_NUM = 39
         self.NUMS_POR_COMBINACION = 6
-        self.TOTAL_COMBINACIONES = 3262623
+        self.TOTAL_COMBINACIONES = TOTAL_COMBINACIONES
         
         # Criterios Omega
         self.UMBRAL_PARES = 459
@@ -84,6 +117,8 @@ class ConfiguracionOptima:
         print(f"🔄 Procesos paralelos: {self.num_procesos}")
         print(f"📦 Tamaño de lote: {self.batch_size:,}")
         print(f"💾 Intervalo de guardado: {self.save_interval:,}")
+        print(f"🧩 Bloques dinámicos: {self.bloque_minimo:,} - {self.bloque_maximo:,} combinaciones "
+              f"(~{self.segundos_por_bloque:.1f} s cada uno)")
         print()
 
 # Instancia global de configuración
@@ -97,60 +132,66 @@ class CargadorDatos:
     """Cargador optimizado de datos de frecuencia"""
     
     def __init__(self):
-        self.freq_pares = {}
-        self.freq_tercias = {}
-        self.freq_cuartetos = {}
+        self.tablas = None
         self.datos_cargados = False
     
     def cargar_frecuencias_optimizado(self):
-        """Carga optimizada de frecuencias con validación"""
+        """Carga las tablas desde el archivo canónico .npy (mmap, milisegundos)"""
         if self.datos_cargados:
             return
             
         print("🔄 Cargando datos de frecuencia ultra-optimizados...")
         
-        archivos_requeridos = [
-            '/home/ubuntu/frecuencias_reales_pares.pkl',
-            '/home/ubuntu/frecuencias_reales_tercias.pkl',
-            '/home/ubuntu/frecuencias_reales_cuartetos.pkl'
-        ]
-        
-        # Verificar existencia de archivos
-        for archivo in archivos_requeridos:
-            if not os.path.exists(archivo):
-                print(f"❌ Error: Archivo no encontrado: {archivo}")
-                sys.exit(1)
+        if not os.path.exists(CONFIG.archivo_frecuencias):
+            print(f"❌ Error: Archivo no encontrado: {CONFIG.archivo_frecuencias}")
+            print("   Genéralo con: python tablas_frecuencia.py pickles <directorio> "
+                  "(o: python tablas_frecuencia.py omega_data)")
+            sys.exit(1)
         
         try:
-            # Carga paralela de archivos
-            with open(archivos_requeridos[0], 'rb') as f:
-                self.freq_pares = pickle.load(f)
-            with open(archivos_requeridos[1], 'rb') as f:
-                self.freq_tercias = pickle.load(f)
-            with open(archivos_requeridos[2], 'rb') as f:
-                self.freq_cuartetos = pickle.load(f)
-            
+            inicio = time.perf_counter()
+            self.tablas = TablasFrecuencia.desde_archivo(CONFIG.archivo_frecuencias)
+            milisegundos = (time.perf_counter() - inicio) * 1000
             self.datos_cargados = True
             
-            print(f"✅ Datos cargados exitosamente:")
-            print(f"   📊 Pares: {len(self.freq_pares):,}")
-            print(f"   📊 Tercias: {len(self.freq_tercias):,}")
-            print(f"   📊 Cuartetos: {len(self.freq_cuartetos):,}")
+            pares, tercias, cuartetos = self.tablas.conteos()
+            print(f"✅ Datos cargados exitosamente en {milisegundos:.1f} ms:")
+            print(f"   📊 Pares: {pares:,}")
+            print(f"   📊 Tercias: {tercias:,}")
+            print(f"   📊 Cuartetos: {cuartetos:,}")
             print()
             
         except Exception as e:
             print(f"❌ Error al cargar datos: {e}")
             sys.exit(1)
     
-    def obtener_frecuencias(self):
-        """Retorna las frecuencias cargadas"""
+    def obtener_tablas(self):
+        """Retorna las tablas densas de frecuencia"""
         if not self.datos_cargados:
             self.cargar_frecuencias_optimizado()
-        return self.freq_pares, self.freq_tercias, self.freq_cuartetos
+        return self.tablas
+    
+    def adjuntar_memoria_compartida(self, descriptor):
+        """Adjunta las tablas publicadas por el coordinador (sin volver a leer el archivo)"""
+        self.tablas = TablasFrecuencia.desde_memoria_compartida(descriptor)
+        self.datos_cargados = True
 
 # Instancia global del cargador
 CARGADOR = CargadorDatos()
 
+# Contadores de telemetría del proceso trabajador (None fuera del pool)
+REPORTADOR = None
+
+def inicializar_proceso_trabajador(descriptor_tablas, contadores=None, siguiente_ranura=None):
+    """
+    Inicializador del pool: cada trabajador se adjunta a las tablas compartidas
+    y toma su ranura de contadores de telemetría
+    """
+    global REPORTADOR
+    CARGADOR.adjuntar_memoria_compartida(descriptor_tablas)
+    if contadores is not None:
+        REPORTADOR = ReportadorTrabajador(contadores, siguiente_ranura, CONFIG.intervalo_telemetria)
+
 # ============================================================================
 # EVALUADOR OMEGA ULTRA-OPTIMIZADO
 # ============================================================================
@@ -159,38 +200,20 @@ class EvaluadorOmegaUltraRapido:
     """Evaluador ultra-optimizado con terminación temprana"""
     
     def __init__(self):
-        self.freq_pares, self.freq_tercias, self.freq_cuartetos = CARGADOR.obtener_frecuencias()
+        self.tablas = CARGADOR.obtener_tablas()
         self.evaluaciones_realizadas = 0
         
     def calcular_afinidad_pares_vectorizado(self, combinacion):
-        """Cálculo vectorizado de afinidad de pares"""
-        afinidad = 0
-        for i in range(len(combinacion)):
-            for j in range(i + 1, len(combinacion)):
-                par = tuple(sorted([combinacion[i], combinacion[j]]))
-                afinidad += self.freq_pares.get(par, 0)
-        return afinidad
+        """Afinidad de pares por indexación directa (combinación ascendente)"""
+        return self.tablas.afinidad_pares(combinacion)
     
     def calcular_afinidad_tercias_vectorizado(self, combinacion):
-        """Cálculo vectorizado de afinidad de tercias"""
-        afinidad = 0
-        for i in range(len(combinacion)):
-            for j in range(i + 1, len(combinacion)):
-                for k in range(j + 1, len(combinacion)):
-                    tercia = tuple(sorted([combinacion[i], combinacion[j], combinacion[k]]))
-                    afinidad += self.freq_tercias.get(tercia, 0)
-        return afinidad
+        """Afinidad de tercias por indexación directa (combinación ascendente)"""
+        return self.tablas.afinidad_tercias(combinacion)
     
     def calcular_afinidad_cuartetos_vectorizado(self, combinacion):
-        """Cálculo vectorizado de afinidad de cuartetos"""
-        afinidad = 0
-        for i in range(len(combinacion)):
-            for j in range(i + 1, len(combinacion)):
-                for k in range(j + 1, len(combinacion)):
-                    for l in range(k + 1, len(combinacion)):
-                        cuarteto = tuple(sorted([combinacion[i], combinacion[j], combinacion[k], combinacion[l]]))
-                        afinidad += self.freq_cuartetos.get(cuarteto, 0)
-        return afinidad
+        """Afinidad de cuartetos por indexación directa (combinación ascendente)"""
+        return self.tablas.afinidad_cuartetos(combinacion)
     
     def evaluar_omega_terminacion_temprana(self, combinacion):
         """
@@ -213,50 +236,63 @@ class EvaluadorOmegaUltraRapido:
             return False, (afinidad_pares, afinidad_tercias, afinidad_cuartetos)
         
         return True, (afinidad_pares, afinidad_tercias, afinidad_cuartetos)
+    
+    def evaluar_omega_lote(self, combinaciones):
+        """
+        Evaluación de un bloque completo como arreglo (N, 6) uint8 con la misma
+        terminación temprana, aplicada en cascada sobre las filas sobrevivientes
+        Retorna (pares, tercias, cuartetos, es_omega) como arreglos de N elementos
+        """
+        self.evaluaciones_realizadas += len(combinaciones)
+        return self.tablas.evaluar_lote(combinaciones, CONFIG.UMBRAL_PARES,
+                                        CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS)
 
 # ============================================================================
 # PROCESADOR PARALELO ULTRA-OPTIMIZADO
 # ============================================================================
 
-def procesar_rango_combinaciones(rango_inicio, rango_fin, proceso_id):
+def procesar_rango_combinaciones(rango_inicio, rango_fin, bloque_id):
     """
-    Procesa un rango específico de combinaciones en un proceso separado
-    Optimizado para máxima eficiencia y mínimo uso de memoria
+    Procesa un bloque de ranks [rango_inicio, rango_fin) en un proceso trabajador
+    El avance se publica por telemetría; el coordinador es quien lo reporta
     """
-    evaluador = EvaluadorOmegaUltraRapido()
+    tablas = CARGADOR.obtener_tablas()
     omega_encontradas = []
     combinaciones_procesadas = 0
     
-    # Generar combinaciones en el rango especificado
-    todas_combinaciones = list(combinations(range(CONFIG.MIN_NUM, CONFIG.MAX_NUM + 1), CONFIG.NUMS_POR_COMBINACION))
-    combinaciones_rango = todas_combinaciones[rango_inicio:rango_fin]
-    
     inicio_tiempo = time.time()
     
-    for combinacion in combinaciones_rango:
-        es_omega, afinidades = evaluador.evaluar_omega_terminacion_temprana(combinacion)
-        
-        if es_omega:
-            omega_encontradas.append({
-                'combinacion': combinacion,
-                'afinidad_pares': afinidades[0],
-                'afinidad_tercias': afinidades[1],
-                'afinidad_cuartetos': afinidades[2],
-                'afinidad_total': sum(afinidades)
-            })
-        
-        combinaciones_procesadas += 1
-        
-        # Reporte de progreso cada 10,000 combinaciones
-        if combinaciones_procesadas % 10000 == 0:
-            tiempo_transcurrido = time.time() - inicio_tiempo
-            velocidad = combinaciones_procesadas / tiempo_transcurrido if tiempo_transcurrido > 0 else 0
-            print(f"🔄 Proceso {proceso_id}: {combinaciones_procesadas:,} procesadas, "
-                  f"{len(omega_encontradas)} Omega, {velocidad:,.0f} comb/seg")
+    # Bloques (N, 6) generados por rank dentro del trabajador y evaluados en cascada
+    rank = rango_inicio
+    for bloque in bloques_universo(rango_inicio, rango_fin):
+        pares, tercias, cuartetos, es_omega = tablas.evaluar_lote(
+            bloque, CONFIG.UMBRAL_PARES, CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS)
+        indices_omega = np.flatnonzero(es_omega)
+        
+        if len(indices_omega):
+            omega_encontradas.append(registros_omega(
+                rank + indices_omega, pares[indices_omega],
+                tercias[indices_omega], cuartetos[indices_omega]))
+        
+        rank += len(bloque)
+        combinaciones_procesadas += len(bloque)
+        
+        if REPORTADOR is not None:
+            # Etapa en la que se descarta cada combinación (las no evaluadas quedan en 0)
+            n_pares = int(np.count_nonzero(pares >= CONFIG.UMBRAL_PARES))
+            n_tercias = int(np.count_nonzero(tercias >= CONFIG.UMBRAL_TERCIAS))
+            REPORTADOR.acumular(len(bloque), len(indices_omega), len(bloque) - n_pares,
+                                n_pares - n_tercias, n_tercias - len(indices_omega))
     
+    if REPORTADOR is not None:
+        REPORTADOR.publicar()
+    
+    # Omega del bloque como registros compactos (rank + afinidades) para el almacén
     return {
-        'proceso_id': proceso_id,
-        'omega_encontradas': omega_encontradas,
+        'bloque_id': bloque_id,
+        'rango': (rango_inicio, rango_fin),
+        'omega_encontradas': (np.concatenate(omega_encontradas) if omega_encontradas
+                              else registros_omega([], [], [], [])),
         'combinaciones_procesadas': combinaciones_procesadas,
         'tiempo_procesamiento': time.time() - inicio_tiempo
     }
@@ -270,16 +306,20 @@ class CoordinadorOmegaUltraOptimizado:
     
     def __init__(self):
         self.inicio_tiempo = None
-        self.omega_totales = []
+        self.total_omega = 0
         self.combinaciones_totales_procesadas = 0
+        self.combinaciones_reanudadas = 0  # Recuperadas del punto de control
+        self.total_omega_reanudadas = 0
         self.archivo_progreso = None
         self.archivo_resultados = None
+        self.punto_control = None
+        self.almacen = None
         
     def inicializar_archivos(self):
         """Inicializa archivos de progreso y resultados"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.archivo_progreso = f"/home/ubuntu/progreso_omega_ultra_{timestamp}.txt"
-        self.archivo_resultados = f"/home/ubuntu/TODAS_Omega_Ultra_Optimizado_{timestamp}.xlsx"
+        self.archivo_progreso = os.path.join(CONFIG.directorio, f"progreso_omega_ultra_{timestamp}.txt")
+        self.archivo_resultados = os.path.join(CONFIG.directorio, f"TODAS_Omega_Ultra_Optimizado_{timestamp}.xlsx")
         
         # Crear archivo de progreso inicial
         with open(self.archivo_progreso, 'w') as f:
@@ -288,102 +328,98 @@ class CoordinadorOmegaUltraOptimizado:
             f.write(f"Inicio: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Configuración: {CONFIG.num_procesos} procesos, lotes de {CONFIG.batch_size:,}\n\n")
     
-    def calcular_rangos_trabajo(self):
-        """Calcula rangos de trabajo optimizados para cada proceso"""
-        total_combinaciones = CONFIG.TOTAL_COMBINACIONES
-        combinaciones_por_proceso = total_combinaciones // CONFIG.num_procesos
-        
-        rangos = []
-        for i in range(CONFIG.num_procesos):
-            inicio = i * combinaciones_por_proceso
-            fin = (i + 1) * combinaciones_por_proceso if i < CONFIG.num_procesos - 1 else total_combinaciones
-            rangos.append((inicio, fin))
-        
-        return rangos
+    def crear_planificador(self):
+        """Planificador de bloques dinámicos sobre los rangos que faltan por procesar"""
+        return PlanificadorBloques(CONFIG.num_procesos, 0, CONFIG.TOTAL_COMBINACIONES,
+                                   CONFIG.bloque_inicial, CONFIG.bloque_minimo,
+                                   CONFIG.bloque_maximo, CONFIG.segundos_por_bloque,
+                                   rangos=self.punto_control.pendientes())
     
-    def actualizar_progreso(self, resultados_parciales):
-        """Actualiza el progreso y guarda estado"""
-        tiempo_transcurrido = time.time() - self.inicio_tiempo
-        velocidad_promedio = self.combinaciones_totales_procesadas / tiempo_transcurrido if tiempo_transcurrido > 0 else 0
-        porcentaje = (self.combinaciones_totales_procesadas / CONFIG.TOTAL_COMBINACIONES) * 100
-        
-        # Estimación de tiempo restante
-        if velocidad_promedio > 0:
-            combinaciones_restantes = CONFIG.TOTAL_COMBINACIONES - self.combinaciones_totales_procesadas
-            tiempo_restante = combinaciones_restantes / velocidad_promedio
-            eta = datetime.now() + timedelta(seconds=tiempo_restante)
+    def abrir_punto_control(self, reanudar):
+        """
+        Abre el punto de control y el almacén de resultados; al reanudar
+        recupera lo ya procesado y recorta el almacén a lo confirmado
+        """
+        self.punto_control = PuntoControl(
+            CONFIG.archivo_punto_control,
+            (CONFIG.UMBRAL_PARES, CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS),
+            CARGADOR.obtener_tablas().digest())
+        
+        self.almacen = AlmacenOmega(CONFIG.archivo_almacen)
+        
+        try:
+            self.punto_control.abrir(reanudar)
+            if reanudar:
+                self.almacen.reabrir(self.punto_control.registros_almacen)
+            else:
+                self.almacen.crear(self.punto_control.umbrales, self.punto_control.digest)
+        except (ValueError, OSError) as e:
+            print(f"❌ No se puede reanudar: {e}")
+            sys.exit(1)
+        
+        if reanudar:
+            self.total_omega = self.punto_control.omega_encontradas
+            self.total_omega_reanudadas = self.total_omega
+            self.combinaciones_totales_procesadas = self.punto_control.combinaciones_completadas
+            self.combinaciones_reanudadas = self.combinaciones_totales_procesadas
+            print(f"♻️  Reanudando desde {CONFIG.archivo_punto_control}: "
+                  f"{len(self.punto_control.rangos_completados):,} bloques, "
+                  f"{self.combinaciones_totales_procesadas:,} combinaciones, "
+                  f"{self.total_omega:,} Omega")
+        else:
+            print(f"📝 Punto de control: {CONFIG.archivo_punto_control}")
+            print(f"💾 Almacén de resultados: {CONFIG.archivo_almacen}")
+    
+    def actualizar_progreso(self, planificador, telemetria, monitor):
+        """
+        Una sola línea de progreso (consola y archivo) a partir de los contadores
+        publicados por los trabajadores: velocidad agregada y ETA por EWMA
+        """
+        contadores = telemetria.totales()
+        procesadas = min(self.combinaciones_reanudadas + contadores['procesadas'],
+                         CONFIG.TOTAL_COMBINACIONES)
+        omega = self.total_omega_reanudadas + contadores['omega']
+        porcentaje = (procesadas / CONFIG.TOTAL_COMBINACIONES) * 100
+        velocidad_promedio, velocidad_ewma, segundos_restantes = monitor.muestrear(contadores['procesadas'])
+        
+        if segundos_restantes is not None:
+            eta = (datetime.now() + timedelta(seconds=segundos_restantes)).strftime('%H:%M:%S')
         else:
-            tiempo_restante = 0
-            eta = datetime.now()
+            eta = '--:--:--'
+        
+        linea = (f"{procesadas:,}/{CONFIG.TOTAL_COMBINACIONES:,} ({porcentaje:.2f}%) | "
+                 f"Omega: {omega:,} | "
+                 f"{velocidad_ewma:,.0f} comb/seg (prom. {velocidad_promedio:,.0f}) | "
+                 f"ETA: {eta} | "
+                 f"Descartes P/T/C: {contadores['descartadas_pares']:,}/"
+                 f"{contadores['descartadas_tercias']:,}/{contadores['descartadas_cuartetos']:,} | "
+                 f"Bloques: {planificador.bloques_completados:,}")
         
         # Mostrar progreso en consola
-        print(f"\n📊 PROGRESO ULTRA-OPTIMIZADO")
-        print(f"   Procesadas: {self.combinaciones_totales_procesadas:,} / {CONFIG.TOTAL_COMBINACIONES:,} ({porcentaje:.2f}%)")
-        print(f"   Omega encontradas: {len(self.omega_totales):,}")
-        print(f"   Velocidad: {velocidad_promedio:,.0f} combinaciones/segundo")
-        print(f"   Tiempo transcurrido: {tiempo_transcurrido/60:.1f} minutos")
-        print(f"   ETA: {eta.strftime('%H:%M:%S')}")
+        print(f"📊 {linea}")
         
         # Actualizar archivo de progreso
         with open(self.archivo_progreso, 'a') as f:
-            f.write(f"{datetime.now().strftime('%H:%M:%S')} - ")
-            f.write(f"Procesadas: {self.combinaciones_totales_procesadas:,} ({porcentaje:.2f}%) | ")
-            f.write(f"Omega: {len(self.omega_totales):,} | ")
-            f.write(f"Velocidad: {velocidad_promedio:,.0f} comb/seg\n")
+            f.write(f"{datetime.now().strftime('%H:%M:%S')} - {linea}\n")
     
-    def guardar_resultados_parciales(self):
-        """Guarda resultados parciales para evitar pérdida de datos"""
-        if not self.omega_totales:
-            return
-            
+    def exportar_resultados(self):
+        """
+        Genera el reporte Excel y el bitmap Omega desde el almacén binario
+        (pasos aparte, memoria constante)
+        """
         try:
-            # Crear DataFrame
-            df_omega = pd.DataFrame(self.omega_totales)
-            
-            # Expandir combinaciones
-            df_expandido = pd.DataFrame(df_omega['combinacion'].tolist(), 
-                                      columns=[f'n{i+1}' for i in range(6)])
-            
-            # Combinar datos
-            df_final = pd.concat([
-                df_expandido,
-                df_omega[['afinidad_pares', 'afinidad_tercias', 'afinidad_cuartetos', 'afinidad_total']]
-            ], axis=1)
-            
-            # Ordenar por afinidad total
-            df_final = df_final.sort_values('afinidad_total', ascending=False).reset_index(drop=True)
-            
-            # Guardar en Excel
-            with pd.ExcelWriter(self.archivo_resultados, engine='openpyxl') as writer:
-                df_final.to_excel(writer, sheet_name='Omega_Parciales', index=False)
-                
-                # Estadísticas parciales
-                stats = {
-                    'Métrica': [
-                        'Combinaciones Omega Encontradas',
-                        'Combinaciones Procesadas',
-                        'Porcentaje Omega',
-                        'Afinidad Total Promedio',
-                        'Afinidad Total Máxima'
-                    ],
-                    'Valor': [
-                        len(df_final),
-                        self.combinaciones_totales_procesadas,
-                        (len(df_final) / self.combinaciones_totales_procesadas) * 100 if self.combinaciones_totales_procesadas > 0 else 0,
-                        df_final['afinidad_total'].mean(),
-                        df_final['afinidad_total'].max()
-                    ]
-                }
-                
-                pd.DataFrame(stats).to_excel(writer, sheet_name='Estadisticas_Parciales', index=False)
-            
-            print(f"💾 Resultados parciales guardados: {len(self.omega_totales):,} combinaciones Omega")
-            
+            exportadas = exportar_excel(CONFIG.archivo_almacen, self.archivo_resultados)
+            print(f"💾 Reporte Excel generado: {exportadas:,} combinaciones Omega")
+            bitmap_desde_almacen(CONFIG.archivo_almacen, CONFIG.archivo_bitmap)
+            print(f"💾 Bitmap Omega (rank/select): {CONFIG.archivo_bitmap}")
         except Exception as e:
-            print(f"⚠️  Error al guardar resultados parciales: {e}")
+            print(f"⚠️  Error al exportar resultados: {e}")
     
-    def ejecutar_busqueda_completa(self):
-        """Ejecuta la búsqueda completa ultra-optimizada"""
+    def ejecutar_busqueda_completa(self, reanudar=False):
+        """
+        Ejecuta la búsqueda completa ultra-optimizada
+        Con reanudar=True sólo procesa los bloques ausentes del punto de control
+        """
         print("🚀 INICIANDO BÚSQUEDA ULTRA-OPTIMIZADA DE TODAS LAS COMBINACIONES OMEGA")
         print("=" * 80)
         
@@ -393,81 +429,227 @@ class CoordinadorOmegaUltraOptimizado:
         # Inicializar
         self.inicio_tiempo = time.time()
         self.inicializar_archivos()
+        self.abrir_punto_control(reanudar)
         
-        # Calcular rangos de trabajo
-        rangos_trabajo = self.calcular_rangos_trabajo()
+        # Bloques dinámicos: cada proceso toma el siguiente bloque al desocuparse
+        planificador = self.crear_planificador()
         
-        print(f"📋 Distribución de trabajo:")
-        for i, (inicio, fin) in enumerate(rangos_trabajo):
-            print(f"   Proceso {i+1}: {inicio:,} - {fin:,} ({fin-inicio:,} combinaciones)")
+        print(f"📋 Distribución de trabajo: bloques dinámicos entre {CONFIG.num_procesos} procesos, "
+              f"{CONFIG.bloques_en_vuelo} pendientes por proceso")
         print()
         
+        # Publicar las tablas una sola vez en memoria compartida
+        bloques_compartidos, descriptor_tablas = CARGADOR.obtener_tablas().a_memoria_compartida()
+        
         # Ejecutar procesamiento paralelo
         print("🔄 Iniciando procesamiento paralelo ultra-optimizado...")
         
-        with ProcessPoolExecutor(max_workers=CONFIG.num_procesos) as executor:
-            # Enviar trabajos
-            futuros = []
-            for i, (inicio, fin) in enumerate(rangos_trabajo):
-                futuro = executor.submit(procesar_rango_combinaciones, inicio, fin, i+1)
-                futuros.append(futuro)
-            
-            # Recopilar resultados conforme se completan
-            for futuro in as_completed(futuros):
+        try:
+            self.ejecutar_procesos(planificador, descriptor_tablas)
+        finally:
+            liberar_memoria_compartida(bloques_compartidos)
+            self.almacen.cerrar()
+            self.punto_control.cerrar()
+        
+        # Finalizar
+        self.finalizar_busqueda()
+    
+    def crear_executor(self, descriptor_tablas, telemetria):
+        """Pool de trabajadores adjuntos a las tablas compartidas y a la telemetría"""
+        return ProcessPoolExecutor(max_workers=CONFIG.num_procesos,
+                                   initializer=inicializar_proceso_trabajador,
+                                   initargs=(descriptor_tablas, *telemetria.argumentos_trabajador()))
+    
+    def ejecutar_procesos(self, planificador, descriptor_tablas):
+        """
+        Mantiene cada proceso con bloques pendientes y consolida los resultados
+        conforme llega cada bloque; al terminar uno se entrega el siguiente.
+        Si un trabajador muere (OOM, expropiación) el pool queda roto: se crea
+        uno nuevo y los bloques que estaban en vuelo vuelven a la cola.
+        """
+        telemetria = TelemetriaCompartida(CONFIG.num_procesos)
+        monitor = MonitorProgreso(CONFIG.TOTAL_COMBINACIONES, self.combinaciones_reanudadas)
+        ultimo_reporte = time.time()
+        
+        reintentos = {}
+        reconstrucciones = 0
+        pendientes = set()
+        rangos = {}
+        executor = self.crear_executor(descriptor_tablas, telemetria)
+        
+        def enviar_bloques():
+            """Repone bloques en vuelo; retorna False si el pool está roto"""
+            while (len(pendientes) < CONFIG.num_procesos * CONFIG.bloques_en_vuelo
+                   and planificador.hay_trabajo()):
+                inicio, fin = planificador.siguiente_bloque()
                 try:
-                    resultado = futuro.result()
-                    
-                    # Consolidar resultados
-                    self.omega_totales.extend(resultado['omega_encontradas'])
-                    self.combinaciones_totales_procesadas += resultado['combinaciones_procesadas']
-                    
-                    print(f"✅ Proceso {resultado['proceso_id']} completado: "
-                          f"{resultado['combinaciones_procesadas']:,} procesadas, "
-                          f"{len(resultado['omega_encontradas'])} Omega encontradas")
-                    
-                    # Actualizar progreso
-                    self.actualizar_progreso(resultado)
-                    
-                    # Guardar resultados parciales
-                    if len(self.omega_totales) % 100 == 0:  # Cada 100 Omega encontradas
-                        self.guardar_resultados_parciales()
+                    futuro = executor.submit(procesar_rango_combinaciones, inicio, fin,
+                                             planificador.bloques_entregados)
+                except BrokenProcessPool:
+                    planificador.devolver_bloque(inicio, fin)
+                    return False
+                rangos[futuro] = (inicio, fin)
+                pendientes.add(futuro)
+            return True
+        
+        def consolidar(futuro):
+            """Procesa un bloque terminado; retorna False si falló por pool roto"""
+            inicio, fin = rangos.pop(futuro)
+            try:
+                resultado = futuro.result()
+                
+                # Agregar las Omega al almacén y confirmar el bloque en el punto de control
+                omega_bloque = resultado['omega_encontradas']
+                self.almacen.agregar(omega_bloque)
+                self.almacen.sincronizar()
+                self.punto_control.registrar_bloque(inicio, fin, len(omega_bloque),
+                                                    self.almacen.cantidad)
+                
+                # Consolidar resultados
+                self.total_omega += len(omega_bloque)
+                self.combinaciones_totales_procesadas += resultado['combinaciones_procesadas']
+                planificador.registrar_resultado(resultado['combinaciones_procesadas'],
+                                                 resultado['tiempo_procesamiento'])
+                
+            except BrokenProcessPool:
+                # No es culpa del bloque: se reintenta completo en el pool nuevo
+                planificador.devolver_bloque(inicio, fin)
+                return False
+            except Exception as e:
+                intentos = reintentos.get((inicio, fin), 0) + 1
+                reintentos[(inicio, fin)] = intentos
+                if intentos <= CONFIG.max_reintentos:
+                    print(f"⚠️  Error en bloque {inicio:,} - {fin:,}: {e} "
+                          f"(reintento {intentos}/{CONFIG.max_reintentos})")
+                    planificador.devolver_bloque(inicio, fin)
+                else:
+                    print(f"❌ Error en bloque {inicio:,} - {fin:,}: {e} "
+                          f"(sin más reintentos; usa --resume para completarlo)")
+            return True
+        
+        try:
+            pool_sano = enviar_bloques()
+            
+            # Recopilar resultados bloque por bloque
+            while pendientes or not pool_sano:
+                if pendientes:
+                    # Despertar también por tiempo para reportar aunque ningún bloque termine
+                    completados, pendientes = wait(pendientes, timeout=CONFIG.intervalo_progreso,
+                                                   return_when=FIRST_COMPLETED)
+                    for futuro in completados:
+                        pool_sano &= consolidar(futuro)
+                
+                if not pool_sano:
+                    # Los demás bloques en vuelo fallan enseguida con el pool roto (o
+                    # alcanzaron a terminar): se consolidan o regresan a la cola
+                    completados, pendientes = wait(pendientes)
+                    for futuro in completados:
+                        consolidar(futuro)
+                    executor.shutdown(wait=True)
                     
-                    # Liberar memoria
+                    reconstrucciones += 1
+                    if reconstrucciones > CONFIG.max_reintentos:
+                        print(f"❌ Pool de procesos roto {reconstrucciones} veces; "
+                              f"usa --resume para completar los bloques restantes")
+                        break
+                    print(f"⚠️  Un proceso trabajador terminó inesperadamente; recreando el pool "
+                          f"({reconstrucciones}/{CONFIG.max_reintentos})")
+                    telemetria.reiniciar_ranuras()
+                    executor = self.crear_executor(descriptor_tablas, telemetria)
+                    pool_sano = True
+                
+                # Reponer trabajo antes de reportar para no dejar procesos ociosos
+                pool_sano = enviar_bloques()
+                
+                # Línea de progreso consolidada cada intervalo_progreso segundos
+                if time.time() - ultimo_reporte >= CONFIG.intervalo_progreso or not pendientes:
+                    ultimo_reporte = time.time()
+                    self.actualizar_progreso(planificador, telemetria, monitor)
                     gc.collect()
-                    
-                except Exception as e:
-                    print(f"❌ Error en proceso: {e}")
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
         
-        # Finalizar
-        self.finalizar_busqueda()
+        print(f"🧩 Bloques procesados: {planificador.bloques_completados:,}")
     
     def finalizar_busqueda(self):
         """Finaliza la búsqueda y genera reporte final"""
         tiempo_total = time.time() - self.inicio_tiempo
-        velocidad_promedio = self.combinaciones_totales_procesadas / tiempo_total
+        velocidad_promedio = (self.combinaciones_totales_procesadas - self.combinaciones_reanudadas) / tiempo_total
         
         print("\n" + "=" * 80)
         print("🏆 BÚSQUEDA ULTRA-OPTIMIZADA COMPLETADA")
         print("=" * 80)
         print(f"📊 Combinaciones procesadas: {self.combinaciones_totales_procesadas:,}")
-        print(f"🎯 Combinaciones Omega encontradas: {len(self.omega_totales):,}")
-        print(f"📈 Porcentaje Omega: {(len(self.omega_totales) / self.combinaciones_totales_procesadas) * 100:.6f}%")
+        print(f"🎯 Combinaciones Omega encontradas: {self.total_omega:,}")
+        print(f"📈 Porcentaje Omega: {(self.total_omega / self.combinaciones_totales_procesadas) * 100:.6f}%")
         print(f"⏱️  Tiempo total: {tiempo_total:.1f} segundos ({tiempo_total/3600:.2f} horas)")
         print(f"🚀 Velocidad promedio: {velocidad_promedio:,.0f} combinaciones/segundo")
         print(f"💾 Resultados guardados en: {self.archivo_resultados}")
         
-        # Guardar resultados finales
-        self.guardar_resultados_parciales()
+        # Reporte final desde el almacén
+        self.exportar_resultados()
         
         # Actualizar archivo de progreso final
         with open(self.archivo_progreso, 'a') as f:
             f.write(f"\n{'='*50}\n")
             f.write(f"BÚSQUEDA COMPLETADA - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
             f.write(f"Combinaciones procesadas: {self.combinaciones_totales_procesadas:,}\n")
-            f.write(f"Omega encontradas: {len(self.omega_totales):,}\n")
+            f.write(f"Omega encontradas: {self.total_omega:,}\n")
             f.write(f"Tiempo total: {tiempo_total:.1f} segundos\n")
             f.write(f"Velocidad promedio: {velocidad_promedio:,.0f} comb/seg\n")
 
+# ============================================================================
+# TABLA PRECALCULADA DEL UNIVERSO
+# ============================================================================
+
+def consultar_tabla_universo():
+    """Abre (o construye) la tabla precalculada y responde consultas en O(1)"""
+    inicio = time.time()
+    tabla = obtener_tabla_universo(CARGADOR.obtener_tablas(), CONFIG.archivo_universo,
+                                   CONFIG.UMBRAL_PARES, CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS)
+    total_omega = tabla.contar_omega()
+    
+    print(f"✅ Tabla del universo lista en {time.time() - inicio:.1f} segundos: {tabla.ruta}")
+    print(f"   🎯 Combinaciones Omega: {total_omega:,} "
+          f"({(total_omega / CONFIG.TOTAL_COMBINACIONES) * 100:.4f}%)")
+    
+    while True:
+        entrada = input("Combinación a consultar (6 números separados por coma, Enter para salir): ").strip()
+        if not entrada:
+            break
+        try:
+            combinacion = sorted(int(x) for x in entrada.split(','))
+            if len(set(combinacion)) != 6 or not all(1 <= n <= 39 for n in combinacion):
+                raise ValueError
+        except ValueError:
+            print("❌ Debe ser una lista de 6 números únicos entre 1 y 39")
+            continue
+        
+        pares, tercias, cuartetos = tabla.puntuacion(combinacion)
+        print(f"   Pares: {pares} | Tercias: {tercias} | Cuartetos: {cuartetos} | "
+              f"Omega: {'✅ Sí' if tabla.es_omega(combinacion) else '❌ No'}")
+
+def barrido_umbrales():
+    """Construye el histograma 3-D una vez y responde conteos para cualquier terna"""
+    inicio = time.time()
+    barrido = BarridoUmbrales.desde_universo(CARGADOR.obtener_tablas(), CONFIG.archivo_universo)
+    print(f"✅ Histograma de afinidades listo en {time.time() - inicio:.1f} segundos")
+    
+    while True:
+        entrada = input("Umbrales pares,tercias,cuartetos (Enter para salir): ").strip()
+        if not entrada:
+            break
+        try:
+            umbrales = [int(x) for x in entrada.split(',')]
+            if len(umbrales) != 3:
+                raise ValueError
+        except ValueError:
+            print("❌ Deben ser tres enteros separados por coma")
+            continue
+        
+        print(f"   🎯 Omega: {barrido.contar_omega(*umbrales):,} "
+              f"({barrido.fraccion_omega(*umbrales) * 100:.4f}%)")
+
 # ============================================================================
 # FUNCIÓN PRINCIPAL Y MENÚ
 # ============================================================================
@@ -484,15 +666,24 @@ def main():
     # Cargar datos
     CARGADOR.cargar_frecuencias_optimizado()
     
+    # Reanudar una búsqueda interrumpida sin pasar por el menú
+    if '--resume' in sys.argv:
+        CoordinadorOmegaUltraOptimizado().ejecutar_busqueda_completa(reanudar=True)
+        return
+    
     while True:
         print("OPCIONES ULTRA-OPTIMIZADAS:")
         print("1. 🚀 Ejecutar búsqueda completa (MÁXIMA EFICIENCIA)")
         print("2. 📊 Mostrar configuración del sistema")
-        print("3. 🧪 Prueba de velocidad (100,000 combinaciones)")
-        print("4. ❌ Salir")
+        print("3. 🧪 Suite de benchmarks de evaluadores (JSON)")
+        print("4. ✂️  Búsqueda exacta con poda (branch-and-bound)")
+        print("5. 🗂️  Tabla precalculada del universo (consultas instantáneas)")
+        print("6. 🏆 Top-100 de mayor afinidad (sin búsqueda completa)")
+        print("7. 📐 Barrido de umbrales (conteos Omega para otros criterios)")
+        print("8. ❌ Salir")
         print()
         
-        opcion = input("Selecciona una opción (1-4): ").strip()
+        opcion = input("Selecciona una opción (1-8): ").strip()
         
         if opcion == '1':
             confirmacion = input("\n⚠️  ADVERTENCIA: Proceso intensivo que puede tomar varias horas.\n"
@@ -508,32 +699,38 @@ def main():
             CONFIG.mostrar_configuracion()
             
         elif opcion == '3':
-            print("\n🧪 Ejecutando prueba de velocidad...")
-            evaluador = EvaluadorOmegaUltraRapido()
+            print("\n🧪 Ejecutando suite de benchmarks (todos los backends, rebanadas fijas)...")
+            archivo_json = os.path.join(CONFIG.directorio,
+                                        f"benchmark_omega_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            reporte = ejecutar_suite(archivo_frecuencias=CONFIG.archivo_frecuencias, archivo_json=archivo_json)
+            mostrar_reporte(reporte)
+            print(f"💾 Reporte JSON: {archivo_json}")
             
-            combinaciones_prueba = list(combinations(range(1, 40), 6))[:100000]
-            omega_encontradas = 0
+        elif opcion == '4':
+            print("\n✂️  Ejecutando búsqueda exacta con poda...")
+            omega_poda, estadisticas = buscar_omega_con_poda(
+                CARGADOR.obtener_tablas(), CONFIG.UMBRAL_PARES, CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS)
+            mostrar_estadisticas_poda(estadisticas)
             
-            inicio = time.time()
-            for combinacion in combinaciones_prueba:
-                es_omega, _ = evaluador.evaluar_omega_terminacion_temprana(combinacion)
-                if es_omega:
-                    omega_encontradas += 1
+        elif opcion == '5':
+            consultar_tabla_universo()
             
-            tiempo_prueba = time.time() - inicio
-            velocidad = 100000 / tiempo_prueba
+        elif opcion == '6':
+            print("\n🏆 Buscando las 100 combinaciones Omega de mayor afinidad total...")
+            top, estadisticas = buscar_top_k(
+                CARGADOR.obtener_tablas(), 100, 'total', True,
+                CONFIG.UMBRAL_PARES, CONFIG.UMBRAL_TERCIAS, CONFIG.UMBRAL_CUARTETOS)
+            mostrar_top_k(top, estadisticas)
             
-            print(f"✅ Prueba completada:")
-            print(f"   ⏱️  Tiempo: {tiempo_prueba:.1f} segundos")
-            print(f"   🚀 Velocidad: {velocidad:,.0f} combinaciones/segundo")
-            print(f"   🎯 Omega encontradas: {omega_encontradas} ({(omega_encontradas/100000)*100:.3f}%)")
+        elif opcion == '7':
+            barrido_umbrales()
             
-        elif opcion == '4':
+        elif opcion == '8':
             print("👋 ¡Hasta luego!")
             break
             
         else:
-            print("❌ Opción inválida. Selecciona 1-4.")
+            print("❌ Opción inválida. Selecciona 1-8.")
         
         print("\n" + "-" * 50 + "\n")
 
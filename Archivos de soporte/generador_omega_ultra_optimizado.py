@@ -23,16 +23,22 @@ Fecha: 2025-01-09
 """
 
 import numpy as np
-import pandas as pd
-from itertools import combinations
-import pickle
 import time
 from datetime import datetime
 import multiprocessing as mp
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 from functools import partial
-import os
 import sys
 
+from combinatoria import TOTAL_COMBINACIONES, arreglo_universo, bloque_universo, iterar_desde_rank
+from tablas_frecuencia import ARCHIVO_FRECUENCIAS, TablasFrecuencia, liberar_memoria_compartida
+from tabla_universo import obtener_tabla_universo
+from puntos_control import PuntoControl
+from almacen_omega import AlmacenOmega, registros_omega, exportar_excel
+from bitmap_omega import bitmap_desde_almacen
+
 # ============================================================================
 # CONFIGURACIÓN GLOBAL
 # ============================================================================
@@ -51,6 +57,13 @@ UMBRAL_CUARTETOS = 10
 NUM_PROCESOS = mp.cpu_count()  # Usar todos los cores disponibles
 BATCH_SIZE = 50000  # Procesar en lotes para eficiencia de memoria
 SAVE_INTERVAL = 100000  # Guardar progreso cada X combinaciones procesadas
+LOTES_EN_VUELO = 4  # Lotes pendientes por proceso en el modo en tubería
+MAX_REINTENTOS = 3  # Pasadas extra sobre los lotes que fallaron
+ARCHIVO_PUNTO_CONTROL = './punto_control_omega.jsonl'  # Lotes terminados (para --resume)
+ARCHIVO_ALMACEN = './resultados_omega.bin'  # Omega encontradas (rank + afinidades, streaming)
+ARCHIVO_UNIVERSO = './universo_omega.bin'  # Tabla precalculada de puntuaciones por rank
+ARCHIVO_COMBINACIONES = './universo_combinaciones.npy'  # Universo (N, 6) uint8 compartido por mmap
+ARCHIVO_BITMAP = './omega_bitmap.bin'  # Pertenencia Omega por rank (rank/select)
 
 # ============================================================================
 # DATOS DE FRECUENCIA REALES (EXTRAÍDOS DEL PROYECTO OMEGA POINT)
@@ -58,67 +71,64 @@ SAVE_INTERVAL = 100000  # Guardar progreso cada X combinaciones procesadas
 
 def cargar_frecuencias_reales():
     """
-    Carga las frecuencias reales de pares, tercias y cuartetos
-    desde los datos del Proyecto Omega Point
+    Carga las tablas de frecuencia reales de pares, tercias y cuartetos
+    desde el archivo canónico .npy del Proyecto Omega Point
     """
     print("🔄 Cargando frecuencias reales del Proyecto Omega Point...")
     
-    # Intentar cargar desde archivos pickle si existen
     try:
-        with open('./frecuencias_reales_pares.pkl', 'rb') as f:
-            freq_pares = pickle.load(f)
-        with open('./frecuencias_reales_tercias.pkl', 'rb') as f:
-            freq_tercias = pickle.load(f)
-        with open('./frecuencias_reales_cuartetos.pkl', 'rb') as f:
-            freq_cuartetos = pickle.load(f)
-        
-        print(f"✅ Frecuencias cargadas: {len(freq_pares)} pares, {len(freq_tercias)} tercias, {len(freq_cuartetos)} cuartetos")
-        return freq_pares, freq_tercias, freq_cuartetos
+        inicio = time.perf_counter()
+        tablas = TablasFrecuencia.desde_archivo(ARCHIVO_FRECUENCIAS)
+        pares, tercias, cuartetos = tablas.conteos()
+        print(f"✅ Frecuencias cargadas en {(time.perf_counter() - inicio) * 1000:.1f} ms: "
+              f"{pares} pares, {tercias} tercias, {cuartetos} cuartetos")
+        return tablas
         
     except FileNotFoundError:
-        print("❌ Error: No se encontraron los archivos de frecuencias reales")
-        print("   Asegúrate de que existan los archivos:")
-        print("   - frecuencias_reales_pares.pkl")
-        print("   - frecuencias_reales_tercias.pkl") 
-        print("   - frecuencias_reales_cuartetos.pkl")
+        print(f"❌ Error: No se encontró el archivo de frecuencias {ARCHIVO_FRECUENCIAS}")
+        print("   Genéralo desde los pickles frecuencias_reales_*.pkl con:")
+        print("   python tablas_frecuencia.py pickles <directorio>")
         sys.exit(1)
 
-# Cargar frecuencias globalmente para eficiencia
-FREQ_PARES, FREQ_TERCIAS, FREQ_CUARTETOS = cargar_frecuencias_reales()
+# Tablas densas del proceso (indexación directa en lugar de hashing de tuplas).
+# Se cargan una sola vez en el proceso principal; los procesos del pool se
+# adjuntan a ellas por memoria compartida en lugar de volver a leer el archivo.
+TABLAS = None
+# Universo (N, 6) uint8 memory-mapped; sin él los bloques se generan por unrank vectorizado
+UNIVERSO = None
+
+def obtener_tablas():
+    """Carga las tablas de frecuencia la primera vez que se necesitan"""
+    global TABLAS
+    if TABLAS is None:
+        TABLAS = cargar_frecuencias_reales()
+    return TABLAS
+
+def inicializar_trabajador(descriptor_tablas, archivo_combinaciones=None):
+    """
+    Inicializador del pool: adjunta las tablas publicadas por el proceso principal
+    y, si existe, el arreglo del universo (mismo archivo mmap en todos los procesos)
+    """
+    global TABLAS, UNIVERSO
+    TABLAS = TablasFrecuencia.desde_memoria_compartida(descriptor_tablas)
+    if archivo_combinaciones is not None:
+        UNIVERSO = arreglo_universo(archivo_combinaciones)
 
 # ============================================================================
 # FUNCIONES DE CÁLCULO DE AFINIDADES (ULTRA-OPTIMIZADAS)
 # ============================================================================
 
 def calcular_afinidad_pares_optimizada(combinacion):
-    """Calcula afinidad de pares de forma ultra-optimizada"""
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            par = tuple(sorted([combinacion[i], combinacion[j]]))
-            afinidad += FREQ_PARES.get(par, 0)
-    return afinidad
+    """Calcula afinidad de pares por indexación directa (combinación ascendente)"""
+    return TABLAS.afinidad_pares(combinacion)
 
 def calcular_afinidad_tercias_optimizada(combinacion):
-    """Calcula afinidad de tercias de forma ultra-optimizada"""
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            for k in range(j + 1, len(combinacion)):
-                tercia = tuple(sorted([combinacion[i], combinacion[j], combinacion[k]]))
-                afinidad += FREQ_TERCIAS.get(tercia, 0)
-    return afinidad
+    """Calcula afinidad de tercias por indexación directa (combinación ascendente)"""
+    return TABLAS.afinidad_tercias(combinacion)
 
 def calcular_afinidad_cuartetos_optimizada(combinacion):
-    """Calcula afinidad de cuartetos de forma ultra-optimizada"""
-    afinidad = 0
-    for i in range(len(combinacion)):
-        for j in range(i + 1, len(combinacion)):
-            for k in range(j + 1, len(combinacion)):
-                for l in range(k + 1, len(combinacion)):
-                    cuarteto = tuple(sorted([combinacion[i], combinacion[j], combinacion[k], combinacion[l]]))
-                    afinidad += FREQ_CUARTETOS.get(cuarteto, 0)
-    return afinidad
+    """Calcula afinidad de cuartetos por indexación directa (combinación ascendente)"""
+    return TABLAS.afinidad_cuartetos(combinacion)
 
 def es_clase_omega_ultra_rapido(combinacion):
     """
@@ -143,50 +153,123 @@ def es_clase_omega_ultra_rapido(combinacion):
 # PROCESAMIENTO PARALELO OPTIMIZADO
 # ============================================================================
 
-def procesar_lote_combinaciones(lote_combinaciones):
+def procesar_rango_lote(rango):
     """
-    Procesa un lote de combinaciones en paralelo
-    Retorna solo las combinaciones Omega encontradas
+    Procesa el lote de ranks [inicio, fin) dentro del proceso trabajador:
+    genera el bloque (N, 6) uint8 localmente y lo evalúa con la cascada
+    vectorizada. Sólo viajan por IPC dos enteros de ida y las Omega de vuelta.
+    Retorna (combinaciones procesadas, registros Omega para el almacén)
     """
-    omega_encontradas = []
+    inicio, fin = rango
+    bloque = bloque_universo(inicio, fin, UNIVERSO)
+    cantidad = len(bloque)
     
-    for combinacion in lote_combinaciones:
-        es_omega, afinidades = es_clase_omega_ultra_rapido(combinacion)
-        if es_omega:
-            omega_encontradas.append({
-                'combinacion': combinacion,
-                'afinidad_pares': afinidades[0],
-                'afinidad_tercias': afinidades[1],
-                'afinidad_cuartetos': afinidades[2],
-                'afinidad_total': sum(afinidades)
-            })
+    pares, tercias, cuartetos, es_omega = TABLAS.evaluar_lote(bloque, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
     
-    return omega_encontradas
+    indices = np.flatnonzero(es_omega)
+    return cantidad, registros_omega(inicio + indices, pares[indices], tercias[indices], cuartetos[indices])
+
+def procesar_rango_lote_protegido(rango):
+    """
+    Envoltura de procesar_rango_lote para el pool: un error se reporta junto
+    con su rango en lugar de interrumpir la tubería, para poder reintentarlo.
+    Retorna (rango, resultado, error)
+    """
+    try:
+        return rango, procesar_rango_lote(rango), None
+    except Exception as e:
+        return rango, None, f"{type(e).__name__}: {e}"
+
+def generar_rangos_por_lotes(rangos=((0, TOTAL_COMBINACIONES),), batch_size=BATCH_SIZE):
+    """
+    Generador de rangos de ranks (inicio, fin) de a lo más batch_size
+    combinaciones que cubren los rangos dados (por omisión todo el universo)
+    """
+    for inicio_rango, fin_rango in rangos:
+        for inicio in range(inicio_rango, fin_rango, batch_size):
+            yield inicio, min(inicio + batch_size, fin_rango)
+
+def crear_pool(descriptor_tablas):
+    """Pool de procesos adjuntos a las tablas compartidas y al universo mmap"""
+    return ProcessPoolExecutor(max_workers=NUM_PROCESOS, initializer=inicializar_trabajador,
+                               initargs=(descriptor_tablas, ARCHIVO_COMBINACIONES))
 
-def generar_combinaciones_por_lotes(batch_size=BATCH_SIZE):
+def despachar_en_tuberia(fabrica_pool, funcion, tareas, en_vuelo, max_reconstrucciones=MAX_REINTENTOS):
     """
-    Generador que produce lotes de combinaciones para procesamiento eficiente
+    Ejecuta funcion(tarea) con a lo más `en_vuelo` tareas pendientes y entrega
+    los resultados en orden de término: la siguiente tarea se envía al consumir
+    un resultado, así la generación, el IPC y la consolidación se traslapan sin
+    encolar todo el trabajo de una vez.
+    Si un proceso muere (SIGKILL, OOM) el pool queda roto en lugar de colgarse:
+    se crea otro con fabrica_pool() y las tareas en vuelo vuelven a la cola.
+    Tras max_reconstrucciones las tareas restantes se entregan como
+    (tarea, None, error) para que el llamador las reintente o las reporte.
     """
-    lote_actual = []
+    tareas = iter(tareas)
+    devueltas = deque()  # Tareas en vuelo cuando el pool se rompió
+    pendientes = {}
+    reconstrucciones = 0
+    pool = fabrica_pool()
     
-    for combinacion in combinations(range(MIN_NUM, MAX_NUM + 1), NUMS_POR_COMBINACION):
-        lote_actual.append(combinacion)
-        
-        if len(lote_actual) >= batch_size:
-            yield lote_actual
-            lote_actual = []
+    def recoger(completados):
+        """Resultados de los futuros terminados; los del pool roto regresan a la cola"""
+        listos = []
+        for futuro in completados:
+            tarea = pendientes.pop(futuro)
+            try:
+                listos.append(futuro.result())
+            except BrokenProcessPool:
+                devueltas.append(tarea)
+        return listos
     
-    # Yield del último lote si no está vacío
-    if lote_actual:
-        yield lote_actual
+    try:
+        while True:
+            roto = False
+            while len(pendientes) < en_vuelo:
+                tarea = devueltas.popleft() if devueltas else next(tareas, None)
+                if tarea is None:
+                    break
+                try:
+                    pendientes[pool.submit(funcion, tarea)] = tarea
+                except BrokenProcessPool:
+                    devueltas.appendleft(tarea)
+                    roto = True
+                    break
+            if not pendientes and not roto:
+                return
+            
+            if pendientes:
+                completados, _ = wait(pendientes, return_when=FIRST_COMPLETED)
+                antes = len(devueltas)
+                yield from recoger(completados)
+                roto |= len(devueltas) > antes
+            if not roto:
+                continue
+            
+            # Las demás tareas en vuelo fallan enseguida con el pool roto (o
+            # alcanzaron a terminar): se entregan o regresan a la cola
+            yield from recoger(wait(pendientes)[0])
+            pool.shutdown(wait=True)
+            reconstrucciones += 1
+            if reconstrucciones > max_reconstrucciones:
+                error = f"BrokenProcessPool: pool de procesos roto {reconstrucciones} veces"
+                for tarea in (*devueltas, *tareas):
+                    yield tarea, None, error
+                return
+            print(f"⚠️  Un proceso trabajador terminó inesperadamente; recreando el pool "
+                  f"({reconstrucciones}/{max_reconstrucciones})")
+            pool = fabrica_pool()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 # ============================================================================
 # FUNCIÓN PRINCIPAL ULTRA-OPTIMIZADA
 # ============================================================================
 
-def encontrar_todas_combinaciones_omega():
+def encontrar_todas_combinaciones_omega(reanudar=False):
     """
     Función principal ultra-optimizada para encontrar TODAS las combinaciones Omega
+    Con reanudar=True continúa desde el punto de control de una ejecución interrumpida
     """
     print("🚀 INICIANDO BÚSQUEDA ULTRA-OPTIMIZADA DE TODAS LAS COMBINACIONES OMEGA")
     print("=" * 80)
@@ -195,146 +278,150 @@ def encontrar_todas_combinaciones_omega():
     print(f"💻 Procesadores disponibles: {NUM_PROCESOS}")
     print(f"📊 Tamaño de lote: {BATCH_SIZE:,}")
     print(f"💾 Intervalo de guardado: {SAVE_INTERVAL:,}")
-    print(f"🎯 Espacio total: {3262623:,} combinaciones")
+    print(f"🎯 Espacio total: {TOTAL_COMBINACIONES:,} combinaciones")
     print()
     
     # Inicialización
     inicio_tiempo = time.time()
     combinaciones_procesadas = 0
-    omega_encontradas = []
+    total_omega = 0
     
     # Archivo de progreso
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     archivo_progreso = f"./progreso_omega_completo_{timestamp}.txt"
     archivo_omega = f"./TODAS_Combinaciones_Omega_{timestamp}.xlsx"
     
-    # Pool de procesos
-    with mp.Pool(processes=NUM_PROCESOS) as pool:
-        
+    # Las Omega van al almacén binario; el punto de control confirma cada lote
+    umbrales = (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
+    punto_control = PuntoControl(ARCHIVO_PUNTO_CONTROL, umbrales, obtener_tablas().digest())
+    almacen = AlmacenOmega(ARCHIVO_ALMACEN)
+    try:
+        punto_control.abrir(reanudar)
+        if reanudar:
+            almacen.reabrir(punto_control.registros_almacen)
+        else:
+            almacen.crear(umbrales, punto_control.digest)
+    except (ValueError, OSError) as e:
+        print(f"❌ No se puede reanudar: {e}")
+        sys.exit(1)
+    
+    if reanudar:
+        total_omega = punto_control.omega_encontradas
+        combinaciones_procesadas = punto_control.combinaciones_completadas
+        print(f"♻️  Reanudando: {combinaciones_procesadas:,} combinaciones y "
+              f"{total_omega:,} Omega recuperadas de {ARCHIVO_PUNTO_CONTROL}")
+    combinaciones_previas = combinaciones_procesadas
+    
+    # Publicar las tablas en memoria compartida una sola vez y construir (si hace
+    # falta) el arreglo del universo antes de que los procesos lo abran
+    bloques_compartidos, descriptor_tablas = obtener_tablas().a_memoria_compartida()
+    arreglo_universo(ARCHIVO_COMBINACIONES)
+    
+    try:
         print("🔄 Iniciando procesamiento paralelo...")
         
-        for i, lote in enumerate(generar_combinaciones_por_lotes()):
-            
-            # Procesar lote en paralelo
-            resultados = pool.map(procesar_lote_combinaciones, [lote])
-            
-            # Consolidar resultados
-            for resultado in resultados:
-                omega_encontradas.extend(resultado)
+        # Tubería: NUM_PROCESOS x LOTES_EN_VUELO rangos pendientes; cada proceso
+        # genera y evalúa su lote y los resultados llegan en orden de término
+        siguiente_guardado = SAVE_INTERVAL
+        tareas = list(generar_rangos_por_lotes(punto_control.pendientes()))
+        i = 0
+        
+        for intento in range(MAX_REINTENTOS + 1):
+            if not tareas:
+                break
+            if intento > 0:
+                print(f"🔁 Reintentando {len(tareas)} lotes fallidos (intento {intento}/{MAX_REINTENTOS})...")
             
-            # Actualizar contadores
-            combinaciones_procesadas += len(lote)
+            fallidos = []
+            resultados = despachar_en_tuberia(partial(crear_pool, descriptor_tablas),
+                                              procesar_rango_lote_protegido, tareas,
+                                              NUM_PROCESOS * LOTES_EN_VUELO)
             
-            # Mostrar progreso
-            if combinaciones_procesadas % SAVE_INTERVAL == 0 or i % 100 == 0:
-                tiempo_transcurrido = time.time() - inicio_tiempo
-                velocidad = combinaciones_procesadas / tiempo_transcurrido if tiempo_transcurrido > 0 else 0
-                porcentaje = (combinaciones_procesadas / 3262623) * 100
+            for rango, resultado, error in resultados:
+                i += 1
+                if error is not None:
+                    print(f"⚠️  Error en lote {rango[0]:,} - {rango[1]:,}: {error}")
+                    fallidos.append(rango)
+                    continue
                 
-                print(f"📊 Progreso: {combinaciones_procesadas:,} ({porcentaje:.2f}%) | "
-                      f"Omega: {len(omega_encontradas)} | "
-                      f"Velocidad: {velocidad:,.0f} comb/seg")
+                cantidad, omega_lote = resultado
                 
-                # Guardar progreso
-                with open(archivo_progreso, 'w') as f:
-                    f.write(f"Progreso: {combinaciones_procesadas:,} / 3,262,623\n")
-                    f.write(f"Porcentaje: {porcentaje:.2f}%\n")
-                    f.write(f"Omega encontradas: {len(omega_encontradas)}\n")
-                    f.write(f"Velocidad: {velocidad:,.0f} combinaciones/segundo\n")
-                    f.write(f"Tiempo transcurrido: {tiempo_transcurrido:.1f} segundos\n")
+                # Agregar las Omega al almacén y confirmar el lote antes de contarlo
+                almacen.agregar(omega_lote)
+                almacen.sincronizar()
+                punto_control.registrar_bloque(rango[0], rango[1], len(omega_lote), almacen.cantidad)
+                
+                # Consolidar resultados
+                total_omega += len(omega_lote)
+                
+                # Actualizar contadores
+                combinaciones_procesadas += cantidad
+                
+                # Mostrar progreso
+                if combinaciones_procesadas >= siguiente_guardado or i % 100 == 0:
+                    siguiente_guardado = (combinaciones_procesadas // SAVE_INTERVAL + 1) * SAVE_INTERVAL
+                    tiempo_transcurrido = time.time() - inicio_tiempo
+                    velocidad = (combinaciones_procesadas - combinaciones_previas) / tiempo_transcurrido if tiempo_transcurrido > 0 else 0
+                    porcentaje = (combinaciones_procesadas / TOTAL_COMBINACIONES) * 100
+                    
+                    print(f"📊 Progreso: {combinaciones_procesadas:,} ({porcentaje:.2f}%) | "
+                          f"Omega: {total_omega} | "
+                          f"Velocidad: {velocidad:,.0f} comb/seg")
+                    
+                    # Guardar progreso
+                    with open(archivo_progreso, 'w') as f:
+                        f.write(f"Progreso: {combinaciones_procesadas:,} / {TOTAL_COMBINACIONES:,}\n")
+                        f.write(f"Porcentaje: {porcentaje:.2f}%\n")
+                        f.write(f"Omega encontradas: {total_omega}\n")
+                        f.write(f"Velocidad: {velocidad:,.0f} combinaciones/segundo\n")
+                        f.write(f"Tiempo transcurrido: {tiempo_transcurrido:.1f} segundos\n")
+            
+            tareas = fallidos
+        
+        if tareas:
+            print(f"❌ {len(tareas)} lotes siguen fallando; ejecuta con --resume para completarlos")
+    
+    finally:
+        liberar_memoria_compartida(bloques_compartidos)
+        almacen.cerrar()
+        punto_control.cerrar()
     
     # Estadísticas finales
     tiempo_total = time.time() - inicio_tiempo
-    velocidad_promedio = combinaciones_procesadas / tiempo_total
+    velocidad_promedio = (combinaciones_procesadas - combinaciones_previas) / tiempo_total
     
     print("\n" + "=" * 80)
     print("🏆 BÚSQUEDA COMPLETADA CON ÉXITO")
     print("=" * 80)
     print(f"📊 Combinaciones procesadas: {combinaciones_procesadas:,}")
-    print(f"🎯 Combinaciones Omega encontradas: {len(omega_encontradas):,}")
-    print(f"📈 Porcentaje Omega: {(len(omega_encontradas) / combinaciones_procesadas) * 100:.4f}%")
+    print(f"🎯 Combinaciones Omega encontradas: {total_omega:,}")
+    print(f"📈 Porcentaje Omega: {(total_omega / combinaciones_procesadas) * 100:.4f}%")
     print(f"⏱️  Tiempo total: {tiempo_total:.1f} segundos ({tiempo_total/60:.1f} minutos)")
     print(f"🚀 Velocidad promedio: {velocidad_promedio:,.0f} combinaciones/segundo")
     
-    # Guardar resultados en Excel
-    if omega_encontradas:
+    # Exportar el reporte Excel desde el almacén
+    if total_omega:
         print(f"\n💾 Guardando resultados en: {archivo_omega}")
-        guardar_resultados_excel(omega_encontradas, archivo_omega)
+        guardar_resultados_excel(ARCHIVO_ALMACEN, archivo_omega)
+        bitmap_desde_almacen(ARCHIVO_ALMACEN, ARCHIVO_BITMAP)
+        print(f"💾 Bitmap Omega (rank/select): {ARCHIVO_BITMAP}")
     else:
         print("\n⚠️  No se encontraron combinaciones Omega")
     
-    return omega_encontradas, archivo_omega
+    return total_omega, archivo_omega
 
 # ============================================================================
 # FUNCIÓN DE GUARDADO OPTIMIZADA
 # ============================================================================
 
-def guardar_resultados_excel(omega_encontradas, archivo_omega):
+def guardar_resultados_excel(archivo_almacen, archivo_omega):
     """
-    Guarda los resultados en un archivo Excel optimizado
+    Exporta el almacén binario a Excel (Todas_Combinaciones_Omega, Top_100 y
+    Estadisticas) recorriéndolo por bloques, sin cargar todo en memoria
     """
     try:
-        # Convertir a DataFrame
-        df_omega = pd.DataFrame(omega_encontradas)
-        
-        # Expandir combinaciones en columnas separadas
-        df_expandido = pd.DataFrame(df_omega['combinacion'].tolist(), 
-                                  columns=[f'n{i+1}' for i in range(6)])
-        
-        # Combinar con afinidades
-        df_final = pd.concat([
-            df_expandido,
-            df_omega[['afinidad_pares', 'afinidad_tercias', 'afinidad_cuartetos', 'afinidad_total']]
-        ], axis=1)
-        
-        # Agregar estadísticas adicionales
-        df_final['suma'] = df_final[['n1', 'n2', 'n3', 'n4', 'n5', 'n6']].sum(axis=1)
-        df_final['rango'] = df_final['n6'] - df_final['n1']
-        df_final['min_num'] = df_final['n1']
-        df_final['max_num'] = df_final['n6']
-        
-        # Ordenar por afinidad total descendente
-        df_final = df_final.sort_values('afinidad_total', ascending=False).reset_index(drop=True)
-        
-        # Crear archivo Excel con múltiples hojas
-        with pd.ExcelWriter(archivo_omega, engine='openpyxl') as writer:
-            
-            # Hoja principal
-            df_final.to_excel(writer, sheet_name='Todas_Combinaciones_Omega', index=False)
-            
-            # Top 100 por afinidad
-            if len(df_final) >= 100:
-                df_final.head(100).to_excel(writer, sheet_name='Top_100_Mayor_Afinidad', index=False)
-            
-            # Estadísticas
-            stats = {
-                'Métrica': [
-                    'Total Combinaciones Omega',
-                    'Afinidad Pares Promedio',
-                    'Afinidad Tercias Promedio', 
-                    'Afinidad Cuartetos Promedio',
-                    'Afinidad Total Promedio',
-                    'Afinidad Total Máxima',
-                    'Afinidad Total Mínima',
-                    'Suma Promedio',
-                    'Rango Promedio'
-                ],
-                'Valor': [
-                    len(df_final),
-                    df_final['afinidad_pares'].mean(),
-                    df_final['afinidad_tercias'].mean(),
-                    df_final['afinidad_cuartetos'].mean(),
-                    df_final['afinidad_total'].mean(),
-                    df_final['afinidad_total'].max(),
-                    df_final['afinidad_total'].min(),
-                    df_final['suma'].mean(),
-                    df_final['rango'].mean()
-                ]
-            }
-            
-            pd.DataFrame(stats).to_excel(writer, sheet_name='Estadisticas', index=False)
-        
-        print(f"✅ Archivo Excel guardado exitosamente: {archivo_omega}")
+        exportadas = exportar_excel(archivo_almacen, archivo_omega)
+        print(f"✅ Archivo Excel guardado exitosamente: {archivo_omega} ({exportadas:,} combinaciones)")
         
     except Exception as e:
         print(f"❌ Error al guardar Excel: {e}")
@@ -354,7 +441,7 @@ def estimar_tiempo_completo():
     muestra_size = 10000
     inicio = time.time()
     
-    combinaciones_muestra = list(combinations(range(MIN_NUM, MAX_NUM + 1), NUMS_POR_COMBINACION))[:muestra_size]
+    combinaciones_muestra = iterar_desde_rank(0, muestra_size, NUMS_POR_COMBINACION, MAX_NUM)
     omega_muestra = 0
     
     for combinacion in combinaciones_muestra:
@@ -366,8 +453,8 @@ def estimar_tiempo_completo():
     velocidad_estimada = muestra_size / tiempo_muestra
     
     # Estimaciones
-    tiempo_total_estimado = 3262623 / velocidad_estimada
-    omega_estimadas = (omega_muestra / muestra_size) * 3262623
+    tiempo_total_estimado = TOTAL_COMBINACIONES / velocidad_estimada
+    omega_estimadas = (omega_muestra / muestra_size) * TOTAL_COMBINACIONES
     
     print(f"📊 Muestra procesada: {muestra_size:,} combinaciones")
     print(f"🎯 Omega en muestra: {omega_muestra} ({(omega_muestra/muestra_size)*100:.3f}%)")
@@ -378,6 +465,39 @@ def estimar_tiempo_completo():
     
     return tiempo_total_estimado, omega_estimadas
 
+# ============================================================================
+# TABLA PRECALCULADA DEL UNIVERSO
+# ============================================================================
+
+def consultar_tabla_universo():
+    """
+    Abre (o construye una sola vez) la tabla precalculada del universo y
+    responde cuántas Omega hay y la puntuación de cualquier combinación
+    """
+    inicio = time.time()
+    tabla = obtener_tabla_universo(obtener_tablas(), ARCHIVO_UNIVERSO, UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)
+    total_omega = tabla.contar_omega()
+    
+    print(f"✅ Tabla del universo lista en {time.time() - inicio:.1f} segundos")
+    print(f"🎯 Omega en el universo: {total_omega:,} de {TOTAL_COMBINACIONES:,} "
+          f"({(total_omega / TOTAL_COMBINACIONES) * 100:.4f}%)")
+    
+    while True:
+        entrada = input("Combinación a consultar (ej. 1,5,12,20,33,39 - Enter para salir): ").strip()
+        if not entrada:
+            break
+        try:
+            combinacion = sorted(int(x) for x in entrada.split(','))
+            if len(set(combinacion)) != NUMS_POR_COMBINACION or not all(MIN_NUM <= n <= MAX_NUM for n in combinacion):
+                raise ValueError
+        except ValueError:
+            print(f"❌ Debe ser una lista de {NUMS_POR_COMBINACION} números únicos entre {MIN_NUM} y {MAX_NUM}")
+            continue
+        
+        pares, tercias, cuartetos = tabla.puntuacion(combinacion)
+        estado = "✅ Clase Omega" if tabla.es_omega(combinacion) else "❌ No Omega"
+        print(f"   {estado} | Pares: {pares} | Tercias: {tercias} | Cuartetos: {cuartetos}")
+
 # ============================================================================
 # MENÚ PRINCIPAL
 # ============================================================================
@@ -389,18 +509,28 @@ def main():
     print("🎯 GENERADOR ULTRA-OPTIMIZADO DE TODAS LAS COMBINACIONES OMEGA")
     print("=" * 70)
     print("Objetivo: Encontrar TODAS las combinaciones Clase Omega del espacio completo")
-    print("Espacio total: 3,262,623 combinaciones posibles de Melate Retro")
+    print(f"Espacio total: {TOTAL_COMBINACIONES:,} combinaciones posibles de Melate Retro")
     print()
     
+    # Cargar frecuencias una sola vez en el proceso principal
+    obtener_tablas()
+    
+    # Reanudar una búsqueda interrumpida sin pasar por el menú
+    if '--resume' in sys.argv:
+        total_omega, archivo = encontrar_todas_combinaciones_omega(reanudar=True)
+        print(f"\n🎉 Proceso completado. Resultados en: {archivo}")
+        return
+    
     while True:
         print("OPCIONES DISPONIBLES:")
         print("1. 📊 Estimar tiempo de procesamiento completo")
         print("2. 🚀 Ejecutar búsqueda completa (TODAS las combinaciones)")
         print("3. 🧪 Prueba rápida (100,000 combinaciones)")
-        print("4. ❌ Salir")
+        print("4. 🗂️  Tabla precalculada del universo (consultas instantáneas)")
+        print("5. ❌ Salir")
         print()
         
-        opcion = input("Selecciona una opción (1-4): ").strip()
+        opcion = input("Selecciona una opción (1-5): ").strip()
         
         if opcion == '1':
             estimar_tiempo_completo()
@@ -409,7 +539,7 @@ def main():
             confirmacion = input("\n⚠️  ADVERTENCIA: Este proceso puede tomar varias horas.\n"
                                "¿Estás seguro de continuar? (s/N): ").strip().lower()
             if confirmacion in ['s', 'si', 'sí', 'y', 'yes']:
-                omega_encontradas, archivo = encontrar_todas_combinaciones_omega()
+                total_omega, archivo = encontrar_todas_combinaciones_omega()
                 print(f"\n🎉 Proceso completado. Resultados en: {archivo}")
                 break
             else:
@@ -418,7 +548,7 @@ def main():
         elif opcion == '3':
             print("\n🧪 Ejecutando prueba rápida con 100,000 combinaciones...")
             # Implementar prueba rápida aquí
-            combinaciones_prueba = list(combinations(range(MIN_NUM, MAX_NUM + 1), NUMS_POR_COMBINACION))[:100000]
+            combinaciones_prueba = iterar_desde_rank(0, 100000, NUMS_POR_COMBINACION, MAX_NUM)
             omega_prueba = []
             
             inicio = time.time()
@@ -438,11 +568,14 @@ def main():
             print(f"🎯 Omega encontradas: {len(omega_prueba)} de 100,000 ({(len(omega_prueba)/100000)*100:.3f}%)")
             
         elif opcion == '4':
+            consultar_tabla_universo()
+            
+        elif opcion == '5':
             print("👋 ¡Hasta luego!")
             break
             
         else:
-            print("❌ Opción inválida. Por favor selecciona 1-4.")
+            print("❌ Opción inválida. Por favor selecciona 1-5.")
         
         print("\n" + "-" * 50 + "\n")
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+PLANIFICADOR DINÁMICO DE BLOQUES DE RANKS
+=========================================
+
+En lugar de repartir el universo en un rango fijo por proceso, el
+coordinador entrega bloques pequeños de ranks [inicio, fin) conforme los
+trabajadores se desocupan. Quien termina antes simplemente toma el siguiente
+bloque, así que ningún proceso queda ocioso mientras quede trabajo.
+
+El tamaño de cada bloque se ajusta con el rendimiento medido:
+- se estima la velocidad de un trabajador (comb/seg) con un promedio
+  exponencial de los bloques terminados
+- el bloque se dimensiona para durar unos `segundos_objetivo`
+- cerca del final se reduce a una fracción de lo que resta por trabajador
+  (planificación guiada), de modo que todos terminan casi al mismo tiempo
+
+El trabajo puede ser una lista de rangos pendientes (p. ej. lo que falta al
+reanudar desde un punto de control) y los bloques que fallan se devuelven
+para reintentarlos antes que el resto.
+
+Autor: Proyecto Omega Point
+"""
+
+from collections import deque
+
+from combinatoria import TOTAL_COMBINACIONES
+
+# Peso de la última medición en el promedio exponencial de velocidad
+FACTOR_SUAVIZADO = 0.3
+
+
+class PlanificadorBloques:
+    """Reparte [inicio, fin) (o una lista de rangos) en bloques de tamaño adaptativo"""
+
+    def __init__(self, num_procesos, inicio=0, fin=TOTAL_COMBINACIONES,
+                 tamano_inicial=20000, tamano_minimo=2000, tamano_maximo=500000,
+                 segundos_objetivo=1.0, rangos=None):
+        self.num_procesos = num_procesos
+        # Rangos [inicio, fin) aún no entregados, en orden
+        if rangos is None:
+            rangos = [(inicio, fin)]
+        self.pendientes = deque((a, b) for a, b in rangos if a < b)
+        self.restantes = sum(b - a for a, b in self.pendientes)
+        self.tamano_inicial = tamano_inicial
+        self.tamano_minimo = tamano_minimo
+        self.tamano_maximo = tamano_maximo
+        self.segundos_objetivo = segundos_objetivo
+
+        # Velocidad estimada de un trabajador (None hasta el primer bloque)
+        self.velocidad = None
+        self.bloques_entregados = 0
+        self.bloques_completados = 0
+
+    def hay_trabajo(self):
+        """True mientras queden ranks por entregar"""
+        return bool(self.pendientes)
+
+    def tamano_siguiente(self):
+        """Tamaño del próximo bloque según la velocidad medida y lo que resta"""
+        if self.velocidad is None:
+            tamano = self.tamano_inicial
+        else:
+            tamano = int(self.velocidad * self.segundos_objetivo)
+
+        # Planificación guiada: nunca más de la mitad de la parte justa restante
+        tamano = min(tamano, self.restantes // (2 * self.num_procesos))
+        return max(self.tamano_minimo, min(tamano, self.tamano_maximo))
+
+    def siguiente_bloque(self):
+        """Retorna el próximo rango (inicio, fin) o None si ya no hay trabajo"""
+        if not self.hay_trabajo():
+            return None
+
+        inicio, fin_rango = self.pendientes.popleft()
+        fin = min(inicio + self.tamano_siguiente(), fin_rango)
+        if fin < fin_rango:
+            self.pendientes.appendleft((fin, fin_rango))
+        self.restantes -= fin - inicio
+        self.bloques_entregados += 1
+        return inicio, fin
+
+    def devolver_bloque(self, inicio, fin):
+        """Regresa un bloque fallido al frente de la cola para reintentarlo"""
+        self.pendientes.appendleft((inicio, fin))
+        self.restantes += fin - inicio
+
+    def registrar_resultado(self, combinaciones, segundos):
+        """Actualiza la velocidad estimada con un bloque terminado"""
+        self.bloques_completados += 1
+        if combinaciones <= 0 or segundos <= 0:
+            return
+
+        velocidad = combinaciones / segundos
+        if self.velocidad is None:
+            self.velocidad = velocidad
+        else:
+            self.velocidad += FACTOR_SUAVIZADO * (velocidad - self.velocidad)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+PUNTOS DE CONTROL PARA BÚSQUEDAS DEL UNIVERSO COMPLETO
+======================================================
+
+Archivo de sólo agregado (JSON por línea) que registra cada bloque de ranks
+terminado, cuántas Omega aportó y cuántos registros tenía el almacén de
+resultados (almacen_omega.py) después de agregarlas:
+
+    {"tipo": "encabezado", "version": 2, "umbrales": [459, 74, 10], "digest": "..."}
+    {"tipo": "bloque", "inicio": 0, "fin": 20000, "omega": 431, "almacen": 431}
+
+Cada línea se escribe completa y se sincroniza a disco antes de continuar,
+así que si el proceso se interrumpe sólo puede perderse la última línea a
+medio escribir (se descarta al reanudar). Con --resume se cargan los bloques
+terminados, el almacén se recorta a los registros confirmados y sólo se
+procesan los rangos faltantes.
+
+El encabezado guarda los umbrales y el digest de las tablas de frecuencia:
+no se reanuda una búsqueda hecha con otros criterios.
+
+Autor: Proyecto Omega Point
+"""
+
+import json
+import os
+
+from combinatoria import TOTAL_COMBINACIONES
+
+VERSION = 2
+
+
+def rangos_pendientes(completados, inicio=0, fin=TOTAL_COMBINACIONES):
+    """Complemento de los rangos completados dentro de [inicio, fin), en orden"""
+    pendientes = []
+    actual = inicio
+    for a, b in sorted(completados):
+        if a > actual:
+            pendientes.append((actual, min(a, fin)))
+        actual = max(actual, b)
+        if actual >= fin:
+            break
+    if actual < fin:
+        pendientes.append((actual, fin))
+    return [(a, b) for a, b in pendientes if a < b]
+
+
+class PuntoControl:
+    """Registro de sólo agregado de los bloques terminados de una búsqueda"""
+
+    def __init__(self, ruta, umbrales, digest):
+        self.ruta = ruta
+        self.umbrales = list(umbrales)
+        self.digest = digest
+        self.archivo = None
+
+        # Estado recuperado al reanudar
+        self.rangos_completados = []
+        self.omega_encontradas = 0
+        self.registros_almacen = 0
+
+    @property
+    def combinaciones_completadas(self):
+        """Combinaciones cubiertas por los bloques ya registrados"""
+        return sum(fin - inicio for inicio, fin in self.rangos_completados)
+
+    def abrir(self, reanudar=False):
+        """
+        Abre el punto de control. Con reanudar=True carga los bloques ya
+        terminados (y cuántas Omega y registros del almacén confirman) y
+        continúa agregando; si no, empieza un archivo nuevo.
+        Lanza ValueError si el archivo existente es de otra búsqueda.
+        """
+        if reanudar and os.path.exists(self.ruta):
+            self._cargar()
+            self.archivo = open(self.ruta, 'a')
+        else:
+            self.archivo = open(self.ruta, 'w')
+            self._escribir({'tipo': 'encabezado', 'version': VERSION,
+                            'umbrales': self.umbrales, 'digest': self.digest})
+        return self
+
+    def _cargar(self):
+        """Lee los bloques completos y descarta una última línea truncada"""
+        valido = 0
+        with open(self.ruta, 'rb') as f:
+            lineas = f.readlines()
+
+        for numero, linea in enumerate(lineas):
+            try:
+                if not linea.endswith(b'\n'):
+                    raise ValueError("línea incompleta")
+                entrada = json.loads(linea)
+            except ValueError:
+                if numero == len(lineas) - 1:
+                    break  # Escritura interrumpida: se descarta
+                raise ValueError(f"Punto de control dañado en la línea {numero + 1}: {self.ruta}")
+
+            if numero == 0:
+                if (entrada.get('tipo') != 'encabezado' or entrada.get('version') != VERSION
+                        or entrada.get('umbrales') != self.umbrales
+                        or entrada.get('digest') != self.digest):
+                    raise ValueError(f"El punto de control es de otra búsqueda "
+                                     f"(umbrales o frecuencias distintos): {self.ruta}")
+            elif entrada.get('tipo') == 'bloque':
+                self.rangos_completados.append((entrada['inicio'], entrada['fin']))
+                self.omega_encontradas += entrada['omega']
+                self.registros_almacen = max(self.registros_almacen, entrada['almacen'])
+            valido += len(linea)
+
+        if valido == 0:
+            raise ValueError(f"Punto de control sin encabezado: {self.ruta}")
+
+        # Quitar la cola truncada para que lo nuevo se agregue tras una línea completa
+        if valido < sum(len(linea) for linea in lineas):
+            with open(self.ruta, 'r+b') as f:
+                f.truncate(valido)
+
+    def _escribir(self, entrada):
+        """Agrega una línea JSON y la sincroniza a disco"""
+        self.archivo.write(json.dumps(entrada, separators=(',', ':')) + '\n')
+        self.archivo.flush()
+        os.fsync(self.archivo.fileno())
+
+    def registrar_bloque(self, inicio, fin, omega_encontradas, registros_almacen):
+        """
+        Confirma un bloque terminado (queda en disco al retornar). Sus Omega ya
+        deben estar sincronizadas en el almacén, que tiene `registros_almacen`
+        registros en total.
+        """
+        self._escribir({'tipo': 'bloque', 'inicio': inicio, 'fin': fin,
+                        'omega': omega_encontradas, 'almacen': registros_almacen})
+
+    def pendientes(self, inicio=0, fin=TOTAL_COMBINACIONES):
+        """Rangos de [inicio, fin) que aún no tienen bloque registrado"""
+        return rangos_pendientes(self.rangos_completados, inicio, fin)
+
+    def cerrar(self):
+        """Cierra el archivo (lo registrado ya está en disco)"""
+        if self.archivo is not None:
+            self.archivo.close()
+            self.archivo = None
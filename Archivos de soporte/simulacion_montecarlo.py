@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+SIMULACIÓN MONTE CARLO DE BOLETOS ALEATORIOS
+============================================
+
+Contrasta la frecuencia histórica de combinaciones que cumplen los criterios
+Omega (cada umbral por separado y los tres a la vez, es decir, Clase Omega)
+con la proporción natural que se obtiene al sortear boletos 6 de 39 al azar.
+
+La Clase Omega no es el "Grand Slam" del README (~38.3% del universo): con
+los umbrales 459 / 74 / 10 es el 2.41% del universo (78,722 de 3,262,623) y
+cerca del 60% del historial, así que este reporte no reproduce aquella cifra.
+
+Generación vectorizada: se sortean filas de 6 enteros 1..39, se ordenan y se
+vuelven a sortear sólo las que tienen números repetidos, lo que equivale a
+muestrear combinaciones uniformes sin reemplazo. Cada lote se puntúa con las
+tablas densas (afinidad de pares, tercias y cuartetos completas).
+
+Reproducibilidad: la semilla raíz se divide con SeedSequence.spawn en un flujo
+independiente por lote (no por proceso). El lote i siempre usa el flujo i y
+los conteos se suman, así que el resultado es idéntico con 1 o con N procesos.
+
+Se reportan tasas con intervalo de confianza de Wilson para la simulación y
+para el historial, y una prueba z de la tasa histórica contra la simulada.
+Nota: las tablas de frecuencia incluyen los propios sorteos históricos, así
+que el historial puntuado con ellas no es una muestra independiente.
+
+Uso:
+    python simulacion_montecarlo.py [--boletos N] [--semilla S] [--procesos P]
+                                    [--tamano-lote L] [--confianza 0.95]
+
+Autor: Proyecto Omega Point
+"""
+
+import argparse
+import math
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from combinatoria import MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION
+from frecuencias_historial import ARCHIVO_DB, cargar_sorteos_db
+from tablas_frecuencia import (UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS, TablasFrecuencia,
+                               liberar_memoria_compartida)
+
+SEMILLA_DEFECTO = 20250109
+TAMANO_LOTE = 1_000_000
+# Eventos que se cuentan por boleto (los tres criterios por separado y juntos)
+EVENTOS = ('cumple_pares', 'cumple_tercias', 'cumple_cuartetos', 'omega')
+
+# Tablas y umbrales del proceso trabajador
+TABLAS_TRABAJADOR = None
+UMBRALES_TRABAJADOR = None
+
+
+# ============================================================================
+# GENERACIÓN Y CONTEO
+# ============================================================================
+
+def generar_boletos(generador, n):
+    """Arreglo (n, 6) uint8 de combinaciones uniformes, ascendentes y sin repetidos"""
+    boletos = np.empty((n, NUMS_POR_COMBINACION), dtype=np.uint8)
+    pendientes = np.arange(n)
+    while len(pendientes):
+        filas = np.sort(generador.integers(MIN_NUM, MAX_NUM + 1, size=(len(pendientes), NUMS_POR_COMBINACION),
+                                           dtype=np.uint8), axis=1)
+        validas = (np.diff(filas, axis=1) != 0).all(axis=1)
+        boletos[pendientes[validas]] = filas[validas]
+        pendientes = pendientes[~validas]
+    return boletos
+
+
+def contar_eventos(tablas, combinaciones, umbral_pares=UMBRAL_PARES, umbral_tercias=UMBRAL_TERCIAS,
+                   umbral_cuartetos=UMBRAL_CUARTETOS):
+    """Conteo de cada evento de EVENTOS en un arreglo (N, 6) de combinaciones ascendentes"""
+    cumple_pares = tablas.afinidad_pares_lote(combinaciones) >= umbral_pares
+    cumple_tercias = tablas.afinidad_tercias_lote(combinaciones) >= umbral_tercias
+    cumple_cuartetos = tablas.afinidad_cuartetos_lote(combinaciones) >= umbral_cuartetos
+    omega = cumple_pares & cumple_tercias & cumple_cuartetos
+    return np.array([np.count_nonzero(evento)
+                     for evento in (cumple_pares, cumple_tercias, cumple_cuartetos, omega)], dtype=np.int64)
+
+
+def simular_lote(tablas, semilla, n, umbrales=(UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)):
+    """Sortea y puntúa n boletos con el flujo `semilla` (SeedSequence)"""
+    generador = np.random.default_rng(semilla)
+    return contar_eventos(tablas, generar_boletos(generador, n), *umbrales)
+
+
+def _inicializar_trabajador(descriptor_tablas, umbrales):
+    global TABLAS_TRABAJADOR, UMBRALES_TRABAJADOR
+    TABLAS_TRABAJADOR = TablasFrecuencia.desde_memoria_compartida(descriptor_tablas)
+    UMBRALES_TRABAJADOR = umbrales
+
+
+def _simular_lote_trabajador(semilla, n):
+    return simular_lote(TABLAS_TRABAJADOR, semilla, n, UMBRALES_TRABAJADOR)
+
+
+def simular(tablas, boletos, semilla=SEMILLA_DEFECTO, num_procesos=1, tamano_lote=TAMANO_LOTE,
+            umbrales=(UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)):
+    """
+    Simula `boletos` boletos aleatorios y retorna un diccionario evento -> conteo.
+    El resultado depende sólo de (boletos, semilla, tamano_lote), no de num_procesos.
+    """
+    tamanos = [tamano_lote] * (boletos // tamano_lote)
+    if boletos % tamano_lote:
+        tamanos.append(boletos % tamano_lote)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+
+    conteos = np.zeros(len(EVENTOS), dtype=np.int64)
+    if num_procesos <= 1:
+        for semilla_lote, n in zip(semillas, tamanos):
+            conteos += simular_lote(tablas, semilla_lote, n, umbrales)
+    else:
+        bloques_compartidos, descriptor_tablas = tablas.a_memoria_compartida()
+        try:
+            with ProcessPoolExecutor(max_workers=num_procesos, mp_context=mp.get_context('spawn'),
+                                     initializer=_inicializar_trabajador,
+                                     initargs=(descriptor_tablas, umbrales)) as executor:
+                for conteo in executor.map(_simular_lote_trabajador, semillas, tamanos):
+                    conteos += conteo
+        finally:
+            liberar_memoria_compartida(bloques_compartidos)
+
+    return dict(zip(EVENTOS, conteos.tolist()))
+
+
+# ============================================================================
+# ESTADÍSTICA
+# ============================================================================
+
+def intervalo_wilson(exitos, n, confianza=0.95):
+    """Intervalo de confianza de Wilson para una proporción binomial"""
+    if n == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    p = exitos / n
+    denominador = 1 + z * z / n
+    centro = (p + z * z / (2 * n)) / denominador
+    margen = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denominador
+    return max(centro - margen, 0.0), min(centro + margen, 1.0)
+
+
+def comparar_proporciones(exitos_a, n_a, exitos_b, n_b):
+    """Prueba z de dos proporciones: retorna (z, p-valor bilateral)"""
+    p_comun = (exitos_a + exitos_b) / (n_a + n_b)
+    error = math.sqrt(p_comun * (1 - p_comun) * (1 / n_a + 1 / n_b))
+    if error == 0:
+        return 0.0, 1.0
+    z = (exitos_a / n_a - exitos_b / n_b) / error
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+
+def conteos_historial(tablas, ruta_db=ARCHIVO_DB, umbrales=(UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS)):
+    """(conteos por evento, número de sorteos) del historial puntuado con las tablas"""
+    sorteos = cargar_sorteos_db(ruta_db)
+    conteos = contar_eventos(tablas, sorteos, *umbrales)
+    return dict(zip(EVENTOS, conteos.tolist())), len(sorteos)
+
+
+def reporte_simulacion(simulados, boletos, historicos, sorteos, confianza=0.95):
+    """Tasas, intervalos y comparación historial vs simulación por evento"""
+    reporte = {}
+    for evento in EVENTOS:
+        z, p_valor = comparar_proporciones(historicos[evento], sorteos, simulados[evento], boletos)
+        reporte[evento] = {
+            'simulado': simulados[evento] / boletos,
+            'intervalo_simulado': intervalo_wilson(simulados[evento], boletos, confianza),
+            'historico': historicos[evento] / sorteos if sorteos else 0.0,
+            'intervalo_historico': intervalo_wilson(historicos[evento], sorteos, confianza),
+            'z': z,
+            'p_valor': p_valor,
+        }
+    return reporte
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulación Monte Carlo de boletos 6 de 39")
+    parser.add_argument('--boletos', type=int, default=10_000_000)
+    parser.add_argument('--semilla', type=int, default=SEMILLA_DEFECTO)
+    parser.add_argument('--procesos', type=int, default=mp.cpu_count())
+    parser.add_argument('--tamano-lote', type=int, default=TAMANO_LOTE)
+    parser.add_argument('--confianza', type=float, default=0.95)
+    parser.add_argument('--db', default=ARCHIVO_DB, help="base SQLite con el historial")
+    args = parser.parse_args()
+
+    tablas = TablasFrecuencia.desde_archivo()
+    inicio = time.perf_counter()
+    simulados = simular(tablas, args.boletos, args.semilla, args.procesos, args.tamano_lote)
+    segundos = time.perf_counter() - inicio
+    historicos, sorteos = conteos_historial(tablas, args.db)
+
+    print(f"🎲 {args.boletos:,} boletos en {segundos:.1f} segundos "
+          f"({args.boletos / segundos:,.0f} boletos/seg, semilla {args.semilla})")
+    print(f"📜 Historial: {sorteos:,} sorteos")
+    print(f"{'Evento':<18} {'Simulado':>9} {'IC ' + format(args.confianza, '.0%'):>21} "
+          f"{'Histórico':>10} {'IC ' + format(args.confianza, '.0%'):>21} {'p-valor':>9}")
+    for evento, fila in reporte_simulacion(simulados, args.boletos, historicos, sorteos, args.confianza).items():
+        bajo, alto = fila['intervalo_simulado']
+        bajo_h, alto_h = fila['intervalo_historico']
+        print(f"{evento:<18} {fila['simulado']:>9.4%} [{bajo:>8.4%}, {alto:>8.4%}] "
+              f"{fila['historico']:>10.2%} [{bajo_h:>8.2%}, {alto_h:>8.2%}] {fila['p_valor']:>9.2g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+TABLA PRECALCULADA DEL UNIVERSO (MEMORY-MAPPED)
+===============================================
+
+Puntúa una sola vez las 3,262,623 combinaciones y las guarda en un archivo
+binario compacto direccionado por rank (ver combinatoria.py):
+
+    encabezado (64 bytes):
+        magic 'OMEGAUNI' | versión | total de combinaciones |
+        umbrales (pares, tercias, cuartetos) | digest SHA-256 de las tablas
+    registros (6 bytes por combinación, en orden de rank):
+        pares uint16 | tercias uint16 | cuartetos uint8 | banderas uint8
+
+La bandera BANDERA_OMEGA indica si la combinación cumple los umbrales del
+encabezado. El archivo se abre con np.memmap: consultar una combinación es
+O(1) y contar las Omega es un solo recorrido O(N), sin volver a puntuar.
+
+Los campos acotan la afinidad (cuartetos <= 255, pares y tercias <= 65,535):
+con historiales mucho más largos que el actual la construcción falla con
+ValueError en lugar de truncar.
+
+El digest de las tablas de frecuencia con las que se construyó permite
+detectar un archivo desactualizado.
+
+Autor: Proyecto Omega Point
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from combinatoria import TOTAL_COMBINACIONES, rank_combinacion
+from enumeracion_prefijos import EnumeradorPrefijos
+from tablas_frecuencia import UMBRAL_PARES, UMBRAL_TERCIAS, UMBRAL_CUARTETOS
+
+MAGIC = b'OMEGAUNI'
+VERSION = 1
+FORMATO_ENCABEZADO = '<8sII3H32s'
+TAMANO_ENCABEZADO = 64
+
+BANDERA_OMEGA = 0x01
+
+DTYPE_REGISTRO = np.dtype([
+    ('pares', '<u2'),
+    ('tercias', '<u2'),
+    ('cuartetos', 'u1'),
+    ('banderas', 'u1'),
+])
+
+
+def verificar_rango_registros(pares, tercias, cuartetos, dtype=DTYPE_REGISTRO):
+    """ValueError si alguna afinidad no cabe en su campo de dtype (DTYPE_REGISTRO por omisión)"""
+    for campo, valores in (('pares', pares), ('tercias', tercias), ('cuartetos', cuartetos)):
+        maximo = np.iinfo(dtype[campo]).max
+        if len(valores) and int(np.max(valores)) > maximo:
+            raise ValueError(f"Afinidad de {campo} fuera de rango del registro "
+                             f"({int(np.max(valores))} > {maximo})")
+
+
+def _escribir_encabezado(archivo, umbrales, digest):
+    encabezado = struct.pack(FORMATO_ENCABEZADO, MAGIC, VERSION, TOTAL_COMBINACIONES,
+                             *umbrales, bytes.fromhex(digest))
+    archivo.write(encabezado.ljust(TAMANO_ENCABEZADO, b'\0'))
+
+
+def actualizar_digest(ruta, digest):
+    """Reescribe el digest del encabezado conservando umbrales y registros"""
+    umbrales, _ = leer_encabezado(ruta)
+    with open(ruta, 'r+b') as f:
+        _escribir_encabezado(f, umbrales, digest)
+
+
+def leer_encabezado(ruta):
+    """Retorna (umbrales, digest) del encabezado; ValueError si el archivo no es válido"""
+    with open(ruta, 'rb') as f:
+        datos = f.read(TAMANO_ENCABEZADO)
+    if len(datos) < TAMANO_ENCABEZADO:
+        raise ValueError(f"Archivo de universo truncado: {ruta}")
+
+    magic, version, total, up, ut, uc, digest = struct.unpack_from(FORMATO_ENCABEZADO, datos)
+    if magic != MAGIC or version != VERSION or total != TOTAL_COMBINACIONES:
+        raise ValueError(f"Archivo de universo inválido o de otra versión: {ruta}")
+    return (up, ut, uc), digest.hex()
+
+
+def construir_tabla_universo(tablas, ruta, umbral_pares=UMBRAL_PARES,
+                             umbral_tercias=UMBRAL_TERCIAS, umbral_cuartetos=UMBRAL_CUARTETOS):
+    """
+    Puntúa todo el universo con la enumeración por prefijos y escribe el archivo.
+    Se escribe primero a un temporal para no dejar un archivo a medias.
+    """
+    umbrales = (umbral_pares, umbral_tercias, umbral_cuartetos)
+    temporal = f"{ruta}.tmp"
+
+    with open(temporal, 'wb') as f:
+        _escribir_encabezado(f, umbrales, tablas.digest())
+
+    registros = np.memmap(temporal, dtype=DTYPE_REGISTRO, mode='r+',
+                          offset=TAMANO_ENCABEZADO, shape=(TOTAL_COMBINACIONES,))
+    for bloque in EnumeradorPrefijos(tablas).recorrer():
+        verificar_rango_registros(bloque.pares, bloque.tercias, bloque.cuartetos)
+        destino = registros[bloque.rank:bloque.rank + len(bloque)]
+        destino['pares'] = bloque.pares
+        destino['tercias'] = bloque.tercias
+        destino['cuartetos'] = bloque.cuartetos
+        destino['banderas'] = np.where((bloque.pares >= umbral_pares)
+                                       & (bloque.tercias >= umbral_tercias)
+                                       & (bloque.cuartetos >= umbral_cuartetos),
+                                       BANDERA_OMEGA, 0)
+    registros.flush()
+    del registros
+
+    os.replace(temporal, ruta)
+
+
+class TablaUniverso:
+    """Puntuaciones precalculadas de todo el universo, abiertas con np.memmap"""
+
+    def __init__(self, ruta, tablas=None):
+        """
+        Abre el archivo en modo sólo lectura. Si se pasan las tablas de frecuencia
+        vigentes, verifica que el archivo se haya construido con ellas.
+        """
+        self.ruta = ruta
+        self.umbrales, self.digest = leer_encabezado(ruta)
+        if tablas is not None and tablas.digest() != self.digest:
+            raise ValueError(f"Tabla del universo desactualizada (otras frecuencias): {ruta}")
+
+        self.registros = np.memmap(ruta, dtype=DTYPE_REGISTRO, mode='r',
+                                   offset=TAMANO_ENCABEZADO, shape=(TOTAL_COMBINACIONES,))
+
+    def puntuacion(self, combinacion):
+        """Retorna (pares, tercias, cuartetos) de una combinación en O(1)"""
+        registro = self.registros[rank_combinacion(sorted(combinacion))]
+        return int(registro['pares']), int(registro['tercias']), int(registro['cuartetos'])
+
+    def es_omega(self, combinacion):
+        """True si la combinación es Clase Omega según los umbrales del archivo"""
+        return bool(self.registros[rank_combinacion(sorted(combinacion))]['banderas'] & BANDERA_OMEGA)
+
+    def mascara_omega(self):
+        """Arreglo booleano por rank con la bandera Omega"""
+        return (self.registros['banderas'] & BANDERA_OMEGA).astype(bool)
+
+    def contar_omega(self):
+        """Número total de combinaciones Omega del universo"""
+        return int(np.count_nonzero(self.registros['banderas'] & BANDERA_OMEGA))
+
+    def ranks_omega(self):
+        """Ranks de todas las combinaciones Omega en orden lexicográfico"""
+        return np.flatnonzero(self.registros['banderas'] & BANDERA_OMEGA)
+
+
+def obtener_tabla_universo(tablas, ruta, umbral_pares=UMBRAL_PARES,
+                           umbral_tercias=UMBRAL_TERCIAS, umbral_cuartetos=UMBRAL_CUARTETOS):
+    """
+    Abre la tabla del universo; la (re)construye si no existe, si fue hecha con
+    otras frecuencias o con otros umbrales
+    """
+    umbrales = (umbral_pares, umbral_tercias, umbral_cuartetos)
+    if os.path.exists(ruta):
+        try:
+            tabla = TablaUniverso(ruta, tablas)
+            if tabla.umbrales == umbrales:
+                return tabla
+            print(f"⚠️  Tabla del universo con otros umbrales {tabla.umbrales}, reconstruyendo...")
+        except ValueError as e:
+            print(f"⚠️  {e}, reconstruyendo...")
+
+    print(f"🔄 Construyendo tabla precalculada del universo en {ruta}...")
+    construir_tabla_universo(tablas, ruta, *umbrales)
+    return TablaUniverso(ruta, tablas)
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+TABLAS DE FRECUENCIA DENSAS (NUMPY)
+===================================
+
+Reemplaza las búsquedas dict.get(tuple(sorted([...]))) por indexación directa
+en arreglos NumPy:
+- pares:     arreglo 40 x 40
+- tercias:   arreglo 40 x 40 x 40
+- cuartetos: arreglo 40 x 40 x 40 x 40
+Las tablas son uint8 mientras todas las frecuencias quepan (historial de
+unos miles de sorteos) y uint16 cuando alguna pasa de 255.
+
+Los números se usan directamente como índices (1..39) y sólo se llenan las
+posiciones en orden ascendente, por lo que no es necesario ordenar: las
+combinaciones del universo ya vienen ordenadas.
+
+Las tablas se pueden publicar en bloques de multiprocessing.shared_memory
+para que los procesos trabajadores se adjunten a ellas sin copiarlas ni
+volver a leer los pickles (a_memoria_compartida / desde_memoria_compartida).
+
+Formato canónico en disco (frecuencias_omega.npy): un solo vector .npy
+con las frecuencias indexadas por el rank lexicográfico de cada sub-combinación
+de 1..39, primero los 741 pares, luego las 9,139 tercias y al final los
+82,251 cuartetos. La versión del formato es el dtype del vector: 1 = uint8
+(92,131 bytes), 2 = uint16 para historiales con alguna frecuencia mayor a 255
+(a partir de unos 8,000 sorteos). Se guarda siempre en el formato más chico
+que alcanza, así que el digest de tablas que caben en uint8 no cambia. Se abre
+con mmap y se expande a las tablas densas en milisegundos (desde_archivo).
+Para generarlo desde las fuentes
+anteriores (pickles con claves tupla u Old/omega_data.py con claves texto):
+    python tablas_frecuencia.py pickles <directorio> [salida.npy]
+    python tablas_frecuencia.py omega_data [salida.npy]
+    python tablas_frecuencia.py verificar [archivo.npy]
+
+Autor: Proyecto Omega Point
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import time
+from functools import lru_cache
+from itertools import combinations
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from combinatoria import MIN_NUM, MAX_NUM, NUMS_POR_COMBINACION, rank_combinacion, total_combinaciones
+
+# Criterios Omega
+UMBRAL_PARES = 459
+UMBRAL_TERCIAS = 74
+UMBRAL_CUARTETOS = 10
+
+# Los números 1..39 se usan directamente como índice
+DIMENSION = MAX_NUM + 1
+
+# Índices fijos de las posiciones que forman cada sub-combinación (15 pares,
+# 20 tercias y 15 cuartetos) para la evaluación por bloques
+IDX_PARES = np.array(list(combinations(range(NUMS_POR_COMBINACION), 2)), dtype=np.intp)
+IDX_TERCIAS = np.array(list(combinations(range(NUMS_POR_COMBINACION), 3)), dtype=np.intp)
+IDX_CUARTETOS = np.array(list(combinations(range(NUMS_POR_COMBINACION), 4)), dtype=np.intp)
+
+# Formato canónico: vector indexado por rank de sub-combinación; versión -> dtype
+FORMATOS_VECTOR = {1: np.dtype(np.uint8), 2: np.dtype('<u2')}
+ARCHIVO_FRECUENCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frecuencias_omega.npy')
+ORDENES = (2, 3, 4)
+TAMANOS_ORDEN = tuple(total_combinaciones(k) for k in ORDENES)
+DESPLAZAMIENTOS_ORDEN = tuple(sum(TAMANOS_ORDEN[:i]) for i in range(len(ORDENES)))
+TAMANO_VECTOR = sum(TAMANOS_ORDEN)
+
+
+def dtype_frecuencias(maximo):
+    """dtype más chico del formato canónico para una frecuencia máxima (ValueError si no cabe)"""
+    for dtype in FORMATOS_VECTOR.values():
+        if maximo <= np.iinfo(dtype).max:
+            return dtype
+    raise ValueError(f"Frecuencia fuera de rango uint16: {maximo}")
+
+
+def _normalizar_clave(clave):
+    """Acepta claves tupla (1, 2) o texto "(1,2)" y retorna una tupla ordenada"""
+    if isinstance(clave, str):
+        clave = tuple(int(x) for x in clave.strip("()").split(","))
+    return tuple(sorted(clave))
+
+
+def _arreglo_desde_diccionario(frecuencias, orden):
+    """Construye el arreglo denso de `orden` dimensiones a partir de un diccionario"""
+    arreglo = np.zeros((DIMENSION,) * orden, dtype=FORMATOS_VECTOR[2])
+    for clave, frecuencia in frecuencias.items():
+        indices = _normalizar_clave(clave)
+        if len(indices) != orden:
+            raise ValueError(f"Clave inválida para orden {orden}: {clave!r}")
+        if not 0 <= frecuencia <= np.iinfo(arreglo.dtype).max:
+            raise ValueError(f"Frecuencia fuera de rango uint16 en {clave!r}: {frecuencia}")
+        arreglo[indices] = frecuencia
+    return arreglo
+
+
+@lru_cache(maxsize=None)
+def _mascara_ascendente(orden):
+    """
+    Máscara de las posiciones (a < b < ...) con a >= 1 de una tabla densa de
+    `orden` dimensiones. En orden C sus posiciones verdaderas recorren las
+    sub-combinaciones en orden lexicográfico, es decir, por rank.
+    """
+    ejes = np.ogrid[(slice(0, DIMENSION),) * orden]
+    mascara = ejes[0] >= MIN_NUM
+    for menor, mayor in zip(ejes, ejes[1:]):
+        mascara = mascara & (menor < mayor)
+    return mascara
+
+
+def indice_vector(subcombinacion):
+    """Posición de una sub-combinación ascendente (2 a 4 números) en el vector canónico"""
+    orden = len(subcombinacion)
+    return DESPLAZAMIENTOS_ORDEN[orden - ORDENES[0]] + rank_combinacion(subcombinacion)
+
+
+def version_vector(vector):
+    """Versión del formato canónico de un vector (según su dtype); None si no es válido"""
+    for version, dtype in FORMATOS_VECTOR.items():
+        if vector.dtype == dtype:
+            return version
+    return None
+
+
+def leer_vector(ruta=ARCHIVO_FRECUENCIAS):
+    """
+    Abre el vector canónico (versión 1 uint8 o 2 uint16) con mmap, sólo
+    lectura. ValueError si no es válido.
+    """
+    vector = np.load(ruta, mmap_mode='r', allow_pickle=False)
+    if version_vector(vector) is None or vector.shape != (TAMANO_VECTOR,):
+        raise ValueError(f"Archivo de frecuencias inválido: {ruta} "
+                         f"(se esperaba uint8 o uint16 de {TAMANO_VECTOR:,}, hay {vector.dtype} {vector.shape})")
+    return vector
+
+
+def omega_score(pares, tercias, cuartetos, es_omega, umbral_pares=UMBRAL_PARES,
+                umbral_tercias=UMBRAL_TERCIAS, umbral_cuartetos=UMBRAL_CUARTETOS):
+    """Afinidad ponderada sobre los umbrales (0.2, 0.3, 0.5) menos 1; 0 si no es Omega"""
+    score = (0.2 * np.asarray(pares) / umbral_pares + 0.3 * np.asarray(tercias) / umbral_tercias
+             + 0.5 * np.asarray(cuartetos) / umbral_cuartetos - 1)
+    return np.where(es_omega, score, 0.0)
+
+
+def liberar_memoria_compartida(bloques):
+    """Cierra y elimina los bloques creados por TablasFrecuencia.a_memoria_compartida()"""
+    for bloque in bloques:
+        bloque.close()
+        bloque.unlink()
+
+
+class TablasFrecuencia:
+    """Frecuencias de pares, tercias y cuartetos en arreglos densos"""
+
+    def __init__(self, pares, tercias, cuartetos):
+        self.pares = pares
+        self.tercias = tercias
+        self.cuartetos = cuartetos
+        # Sumas de 15-20 frecuencias: uint16 basta con tablas uint8
+        anchas = any(tabla.dtype.itemsize > 1 for tabla in (pares, tercias, cuartetos))
+        self.dtype_afinidad = np.dtype(np.uint32 if anchas else np.uint16)
+
+        # Bloques de memoria compartida a los que está adjunta la instancia (si aplica)
+        self._bloques_compartidos = []
+
+        # Vistas en listas anidadas para la evaluación escalar (una tupla a la vez):
+        # indexar listas de Python es mucho más rápido que indexar escalares NumPy
+        self._pares_lista = pares.tolist()
+        self._tercias_lista = tercias.tolist()
+        self._cuartetos_lista = None
+
+    @classmethod
+    def desde_diccionarios(cls, freq_pares, freq_tercias, freq_cuartetos):
+        """Construye las tablas desde diccionarios con claves tupla o texto"""
+        tablas = cls(
+            _arreglo_desde_diccionario(freq_pares, 2),
+            _arreglo_desde_diccionario(freq_tercias, 3),
+            _arreglo_desde_diccionario(freq_cuartetos, 4),
+        )
+        return cls.desde_vector(tablas.a_vector())
+
+    @classmethod
+    def desde_pickles(cls, archivo_pares, archivo_tercias, archivo_cuartetos):
+        """Construye las tablas desde los pickles frecuencias_reales_*.pkl"""
+        diccionarios = []
+        for archivo in (archivo_pares, archivo_tercias, archivo_cuartetos):
+            with open(archivo, 'rb') as f:
+                diccionarios.append(pickle.load(f))
+        return cls.desde_diccionarios(*diccionarios)
+
+    @classmethod
+    def desde_vector(cls, vector):
+        """
+        Construye las tablas densas desde un vector indexado por rank, con el
+        dtype más chico en el que caben sus frecuencias
+        """
+        dtype = dtype_frecuencias(int(vector.max()) if len(vector) else 0)
+        tablas = []
+        for orden, desplazamiento, tamano in zip(ORDENES, DESPLAZAMIENTOS_ORDEN, TAMANOS_ORDEN):
+            tabla = np.zeros((DIMENSION,) * orden, dtype=dtype)
+            tabla[_mascara_ascendente(orden)] = vector[desplazamiento:desplazamiento + tamano]
+            tablas.append(tabla)
+        return cls(*tablas)
+
+    @classmethod
+    def desde_archivo(cls, ruta=ARCHIVO_FRECUENCIAS):
+        """Carga las tablas desde el archivo canónico .npy (mmap, sin pickles)"""
+        return cls.desde_vector(leer_vector(ruta))
+
+    @classmethod
+    def desde_memoria_compartida(cls, descriptor):
+        """
+        Adjunta las tablas publicadas por a_memoria_compartida() en otro proceso.
+        Los arreglos son vistas directas sobre la memoria compartida (sin copia).
+        """
+        bloques = []
+        arreglos = []
+        for nombre, forma, dtype in descriptor:
+            bloque = shared_memory.SharedMemory(name=nombre)
+            bloques.append(bloque)
+            arreglos.append(np.ndarray(forma, dtype=dtype, buffer=bloque.buf))
+        tablas = cls(*arreglos)
+        tablas._bloques_compartidos = bloques
+        return tablas
+
+    def a_memoria_compartida(self):
+        """
+        Copia las tres tablas a bloques de memoria compartida.
+        Retorna (bloques, descriptor): el descriptor es pequeño y serializable,
+        apto para initargs de un pool. Quien llama debe liberar los bloques con
+        liberar_memoria_compartida() al terminar.
+        """
+        bloques = []
+        descriptor = []
+        for tabla in (self.pares, self.tercias, self.cuartetos):
+            bloque = shared_memory.SharedMemory(create=True, size=tabla.nbytes)
+            np.ndarray(tabla.shape, dtype=tabla.dtype, buffer=bloque.buf)[...] = tabla
+            bloques.append(bloque)
+            descriptor.append((bloque.name, tabla.shape, tabla.dtype.str))
+        return bloques, tuple(descriptor)
+
+    def a_vector(self):
+        """
+        Vector canónico (pares, tercias, cuartetos por rank de sub-combinación)
+        en el dtype más chico que alcanza: uint8 (versión 1) o uint16 (versión 2)
+        """
+        vector = np.concatenate([tabla[_mascara_ascendente(orden)].astype(FORMATOS_VECTOR[2])
+                                 for orden, tabla in zip(ORDENES, (self.pares, self.tercias, self.cuartetos))])
+        return vector.astype(dtype_frecuencias(int(vector.max())))
+
+    def guardar(self, ruta=ARCHIVO_FRECUENCIAS):
+        """
+        Escribe las tablas en el formato canónico .npy. Se escribe primero a un
+        temporal para no dejar un archivo a medias.
+        """
+        temporal = f"{ruta}.tmp"
+        with open(temporal, 'wb') as f:
+            np.save(f, self.a_vector(), allow_pickle=False)
+        os.replace(temporal, ruta)
+
+    def digest(self):
+        """
+        Huella SHA-256 del contenido de las tres tablas (detecta tablas distintas).
+        Se calcula sobre el dtype más chico que alcanza, así que no depende de
+        si las tablas están en memoria como uint8 o uint16.
+        """
+        dtype = dtype_frecuencias(max(int(tabla.max()) for tabla in (self.pares, self.tercias, self.cuartetos)))
+        huella = hashlib.sha256()
+        for tabla in (self.pares, self.tercias, self.cuartetos):
+            huella.update(np.ascontiguousarray(tabla, dtype=dtype).tobytes())
+        return huella.hexdigest()
+
+    def conteos(self):
+        """Número de entradas no nulas por tabla (pares, tercias, cuartetos)"""
+        return (int(np.count_nonzero(self.pares)),
+                int(np.count_nonzero(self.tercias)),
+                int(np.count_nonzero(self.cuartetos)))
+
+    # ------------------------------------------------------------------------
+    # Evaluación escalar (combinación ordenada ascendentemente)
+    # ------------------------------------------------------------------------
+
+    def afinidad_pares(self, combinacion):
+        """Suma de frecuencias de los 15 pares de la combinación"""
+        tabla = self._pares_lista
+        n = len(combinacion)
+        afinidad = 0
+        for i in range(n - 1):
+            fila = tabla[combinacion[i]]
+            for j in range(i + 1, n):
+                afinidad += fila[combinacion[j]]
+        return afinidad
+
+    def afinidad_tercias(self, combinacion):
+        """Suma de frecuencias de las 20 tercias de la combinación"""
+        tabla = self._tercias_lista
+        n = len(combinacion)
+        afinidad = 0
+        for i in range(n - 2):
+            plano = tabla[combinacion[i]]
+            for j in range(i + 1, n - 1):
+                fila = plano[combinacion[j]]
+                for k in range(j + 1, n):
+                    afinidad += fila[combinacion[k]]
+        return afinidad
+
+    def afinidad_cuartetos(self, combinacion):
+        """Suma de frecuencias de los 15 cuartetos de la combinación"""
+        if self._cuartetos_lista is None:
+            self._cuartetos_lista = self.cuartetos.tolist()
+        tabla = self._cuartetos_lista
+        n = len(combinacion)
+        afinidad = 0
+        for i in range(n - 3):
+            cubo = tabla[combinacion[i]]
+            for j in range(i + 1, n - 2):
+                plano = cubo[combinacion[j]]
+                for k in range(j + 1, n - 1):
+                    fila = plano[combinacion[k]]
+                    for l in range(k + 1, n):
+                        afinidad += fila[combinacion[l]]
+        return afinidad
+
+    # ------------------------------------------------------------------------
+    # Evaluación por bloques: arreglos (N, 6) de combinaciones ascendentes
+    # ------------------------------------------------------------------------
+
+    def afinidad_pares_lote(self, combinaciones):
+        """Afinidad de pares de cada fila de un arreglo (N, 6)"""
+        columnas = combinaciones[:, IDX_PARES]
+        return self.pares[columnas[..., 0], columnas[..., 1]].sum(axis=1, dtype=self.dtype_afinidad)
+
+    def afinidad_tercias_lote(self, combinaciones):
+        """Afinidad de tercias de cada fila de un arreglo (N, 6)"""
+        columnas = combinaciones[:, IDX_TERCIAS]
+        return self.tercias[columnas[..., 0], columnas[..., 1],
+                            columnas[..., 2]].sum(axis=1, dtype=self.dtype_afinidad)
+
+    def afinidad_cuartetos_lote(self, combinaciones):
+        """Afinidad de cuartetos de cada fila de un arreglo (N, 6)"""
+        columnas = combinaciones[:, IDX_CUARTETOS]
+        return self.cuartetos[columnas[..., 0], columnas[..., 1],
+                              columnas[..., 2], columnas[..., 3]].sum(axis=1, dtype=self.dtype_afinidad)
+
+    def evaluar_lote(self, combinaciones, umbral_pares=UMBRAL_PARES,
+                     umbral_tercias=UMBRAL_TERCIAS, umbral_cuartetos=UMBRAL_CUARTETOS):
+        """
+        Evaluación Omega de un bloque (N, 6) con terminación temprana en cascada:
+        las tercias sólo se calculan para las filas que alcanzan el umbral de
+        pares y los cuartetos sólo para las que alcanzan el de tercias.
+
+        Retorna (pares, tercias, cuartetos, es_omega). Igual que en la evaluación
+        escalar, las etapas no evaluadas quedan en 0.
+        """
+        n = len(combinaciones)
+        tercias = np.zeros(n, dtype=self.dtype_afinidad)
+        cuartetos = np.zeros(n, dtype=self.dtype_afinidad)
+        es_omega = np.zeros(n, dtype=bool)
+
+        pares = self.afinidad_pares_lote(combinaciones)
+
+        # Compactar a las filas sobrevivientes de cada etapa
+        sobrevivientes = np.flatnonzero(pares >= umbral_pares)
+        tercias[sobrevivientes] = self.afinidad_tercias_lote(combinaciones[sobrevivientes])
+
+        sobrevivientes = sobrevivientes[tercias[sobrevivientes] >= umbral_tercias]
+        cuartetos[sobrevivientes] = self.afinidad_cuartetos_lote(combinaciones[sobrevivientes])
+
+        sobrevivientes = sobrevivientes[cuartetos[sobrevivientes] >= umbral_cuartetos]
+        es_omega[sobrevivientes] = True
+
+        return pares, tercias, cuartetos, es_omega
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    if not argumentos or argumentos[0] not in ('pickles', 'omega_data', 'verificar') \
+            or (argumentos[0] == 'pickles' and len(argumentos) < 2):
+        print("Uso: python tablas_frecuencia.py pickles <directorio> [salida.npy]")
+        print("     python tablas_frecuencia.py omega_data [salida.npy]")
+        print("     python tablas_frecuencia.py verificar [archivo.npy]")
+        sys.exit(1)
+
+    comando = argumentos[0]
+    if comando == 'verificar':
+        ruta = argumentos[1] if len(argumentos) > 1 else ARCHIVO_FRECUENCIAS
+        inicio = time.perf_counter()
+        tablas = TablasFrecuencia.desde_archivo(ruta)
+        milisegundos = (time.perf_counter() - inicio) * 1000
+        print(f"✅ {ruta}: pares/tercias/cuartetos no nulos = {tablas.conteos()}")
+        print(f"   🔑 Digest: {tablas.digest()}")
+        print(f"   ⏱️  Carga en frío: {milisegundos:.1f} ms")
+        sys.exit(0)
+
+    if comando == 'pickles':
+        directorio = argumentos[1]
+        salida = argumentos[2] if len(argumentos) > 2 else ARCHIVO_FRECUENCIAS
+        tablas = TablasFrecuencia.desde_pickles(
+            *(os.path.join(directorio, f'frecuencias_reales_{nombre}.pkl')
+              for nombre in ('pares', 'tercias', 'cuartetos')))
+    else:
+        salida = argumentos[1] if len(argumentos) > 1 else ARCHIVO_FRECUENCIAS
+        from Old.omega_data import FREQ_PARES, FREQ_TERCIAS, FREQ_CUARTETOS
+        tablas = TablasFrecuencia.desde_diccionarios(FREQ_PARES, FREQ_TERCIAS, FREQ_CUARTETOS)
+
+    tablas.guardar(salida)
+    print(f"✅ Frecuencias guardadas en {salida}: no nulos = {tablas.conteos()}")
+    print(f"   🔑 Digest: {tablas.digest()}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+TELEMETRÍA DE PROGRESO ENTRE TRABAJADORES Y COORDINADOR
+=======================================================
+
+Cada proceso trabajador acumula sus contadores localmente y, a lo más una
+vez por intervalo, los publica en su propia ranura de un arreglo de memoria
+compartida (multiprocessing.RawArray). El coordinador lee todas las ranuras
+cuando quiere y calcula:
+- combinaciones por segundo agregadas
+- un ETA con promedio móvil exponencial (EWMA) de la velocidad
+- una sola línea de progreso consolidada para consola y archivo
+
+Contadores por trabajador (acumulados desde que inició el proceso):
+    procesadas, omega, descartadas_pares, descartadas_tercias, descartadas_cuartetos
+Una combinación descartada en una etapa es la que no alcanza ese umbral
+habiendo pasado los anteriores (terminación temprana por etapa).
+
+Autor: Proyecto Omega Point
+"""
+
+import multiprocessing as mp
+import time
+
+CAMPOS = ('procesadas', 'omega', 'descartadas_pares', 'descartadas_tercias', 'descartadas_cuartetos')
+
+
+class TelemetriaCompartida:
+    """Contadores en memoria compartida: una ranura por proceso trabajador"""
+
+    def __init__(self, num_procesos):
+        self.num_procesos = num_procesos
+        self.contadores = mp.RawArray('q', num_procesos * len(CAMPOS))
+        self.siguiente_ranura = mp.Value('i', 0)
+        # Contadores de trabajadores de un pool anterior (ver reiniciar_ranuras)
+        self.previos = [0] * len(CAMPOS)
+
+    def argumentos_trabajador(self):
+        """Objetos compartidos que se pasan en initargs del pool"""
+        return self.contadores, self.siguiente_ranura
+
+    def totales(self):
+        """Suma de los contadores publicados por todos los trabajadores"""
+        valores = self.contadores[:]
+        n = len(CAMPOS)
+        return {campo: self.previos[i] + sum(valores[i::n]) for i, campo in enumerate(CAMPOS)}
+
+    def reiniciar_ranuras(self):
+        """
+        Libera las ranuras para los trabajadores de un pool nuevo (tras perder
+        el anterior) conservando lo que publicaron los trabajadores previos
+        """
+        totales = self.totales()
+        self.previos = [totales[campo] for campo in CAMPOS]
+        self.contadores[:] = [0] * len(self.contadores)
+        with self.siguiente_ranura.get_lock():
+            self.siguiente_ranura.value = 0
+
+
+class ReportadorTrabajador:
+    """Lado del trabajador: acumula localmente y publica con límite de frecuencia"""
+
+    def __init__(self, contadores, siguiente_ranura, intervalo=0.5):
+        with siguiente_ranura.get_lock():
+            ranura = siguiente_ranura.value
+            siguiente_ranura.value += 1
+
+        self.contadores = contadores
+        self.inicio = ranura * len(CAMPOS)
+        self.intervalo = intervalo
+        self.locales = [0] * len(CAMPOS)
+        self.ultima_publicacion = time.monotonic()
+
+    def acumular(self, procesadas, omega, descartadas_pares, descartadas_tercias, descartadas_cuartetos):
+        """Suma un lote de contadores y publica si ya pasó el intervalo"""
+        locales = self.locales
+        locales[0] += procesadas
+        locales[1] += omega
+        locales[2] += descartadas_pares
+        locales[3] += descartadas_tercias
+        locales[4] += descartadas_cuartetos
+
+        ahora = time.monotonic()
+        if ahora - self.ultima_publicacion >= self.intervalo:
+            self.publicar()
+            self.ultima_publicacion = ahora
+
+    def publicar(self):
+        """Copia los contadores locales a la ranura compartida de este proceso"""
+        self.contadores[self.inicio:self.inicio + len(CAMPOS)] = self.locales
+
+
+class MonitorProgreso:
+    """Lado del coordinador: velocidad agregada y ETA con promedio exponencial"""
+
+    def __init__(self, total, procesadas_previas=0, alfa=0.3):
+        self.total = total
+        self.procesadas_previas = procesadas_previas
+        self.alfa = alfa
+        self.inicio = time.monotonic()
+        self.ultimo_tiempo = self.inicio
+        self.ultimas_procesadas = 0
+        self.velocidad_ewma = None
+
+    def muestrear(self, procesadas):
+        """
+        Registra las combinaciones procesadas en esta ejecución (sin contar las
+        previas) y retorna (velocidad promedio, velocidad EWMA, segundos restantes)
+        """
+        ahora = time.monotonic()
+        intervalo = ahora - self.ultimo_tiempo
+        if intervalo > 0:
+            instantanea = (procesadas - self.ultimas_procesadas) / intervalo
+            if self.velocidad_ewma is None:
+                self.velocidad_ewma = instantanea
+            else:
+                self.velocidad_ewma += self.alfa * (instantanea - self.velocidad_ewma)
+            self.ultimo_tiempo = ahora
+            self.ultimas_procesadas = procesadas
+
+        transcurrido = ahora - self.inicio
+        promedio = procesadas / transcurrido if transcurrido > 0 else 0
+        restantes = max(self.total - self.procesadas_previas - procesadas, 0)
+        eta = restantes / self.velocidad_ewma if self.velocidad_ewma else None
+        return promedio, self.velocidad_ewma or 0, eta